@@ -1,34 +1,45 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from app.database import get_db
 from app.models.estudiante import Estudiante
 from app.schemas.auth import TokenData
-import os
-from dotenv import load_dotenv
+from app.exceptions import InsufficientPermissionsError, InvalidTokenError, map_exception_to_http
+from app.metrics import metrics
+from app.config.settings import get_settings
+import hmac
+import time
 
-load_dotenv()
+settings = get_settings()
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+# Secreto de los endpoints de administración; sin él quedan deshabilitados
+ADMIN_TOKEN = settings.admin_token
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 bearer_scheme = HTTPBearer()
 
+# bcrypt es deliberadamente lento: su costo por login/alta se mide aparte
+_bcrypt_verify_time = metrics.histogram("auth_bcrypt_seconds", help="Duración de las operaciones bcrypt", operation="verify")
+_bcrypt_hash_time = metrics.histogram("auth_bcrypt_seconds", help="Duración de las operaciones bcrypt", operation="hash")
+
 def verify_password(plain_password, hashed_password):
     try:
         import bcrypt
-        # Usar bcrypt directamente para evitar problemas con passlib
+        # bcrypt directamente (sin passlib)
         password_bytes = plain_password.encode('utf-8')
         if len(password_bytes) > 72:
             password_bytes = password_bytes[:72]
         
-        return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
+        start = time.perf_counter()
+        try:
+            return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
+        finally:
+            _bcrypt_verify_time.observe(time.perf_counter() - start)
     except Exception as e:
         print(f"Error verificando contraseña: {e}")
         return False
@@ -36,13 +47,15 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     try:
         import bcrypt
-        # Usar bcrypt directamente para evitar problemas con passlib
+        # bcrypt directamente (sin passlib)
         password_bytes = password.encode('utf-8')
         if len(password_bytes) > 72:
             password_bytes = password_bytes[:72]
         
+        start = time.perf_counter()
         salt = bcrypt.gensalt()
         hashed = bcrypt.hashpw(password_bytes, salt)
+        _bcrypt_hash_time.observe(time.perf_counter() - start)
         return hashed.decode('utf-8')
     except Exception as e:
         print(f"Error hasheando contraseña: {e}")
@@ -53,7 +66,10 @@ def get_password_hash(password):
 
 def authenticate_user(db: Session, registro_academico: str, password: str):
     try:
-        user = db.query(Estudiante).filter(Estudiante.registro_academico == registro_academico).first()
+        # contrasena es diferida en el modelo: es el único lugar donde se necesita
+        user = db.query(Estudiante).options(undefer(Estudiante.contrasena)).filter(
+            Estudiante.registro_academico == registro_academico
+        ).first()
         if not user:
             return False
         if not user.contrasena:
@@ -76,7 +92,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+    # Síncrona a propósito: la consulta a la base bloquearía el loop de eventos
+    # dentro de un async def; como def, FastAPI la ejecuta en el threadpool
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -96,4 +114,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
     user = db.query(Estudiante).filter(Estudiante.registro_academico == token_data.registro_academico).first()
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return user
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Dependencia de los endpoints de administración: exige el header X-Admin-Token.
+    
+    Raises:
+        HTTPException: 403 si ADMIN_TOKEN no está configurado, 401 si el token no coincide
+    """
+    if not ADMIN_TOKEN:
+        raise map_exception_to_http(InsufficientPermissionsError("administrar el servicio (ADMIN_TOKEN no configurado)"))
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise map_exception_to_http(InvalidTokenError())
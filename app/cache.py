@@ -0,0 +1,446 @@
+"""
+Cache de registros en dos niveles para las búsquedas por clave primaria.
+
+- L1: LRU en memoria, propio de cada worker, con TTL corto.
+- L2: servidor compatible con el protocolo Redis, compartido entre workers (opcional).
+
+Cada escritura invalida la entrada en ambos niveles y publica la invalidación
+por pub/sub para que el resto de los workers descarten su copia en L1.
+
+Un lector puede cargar la fila anterior a una escritura y guardarla después
+de la invalidación. Para que ese valor viejo no vuelva a la cache, la
+invalidación deja una marca (tombstone) por CACHE_TOMBSTONE_TTL segundos que
+impide repoblar la entrada, y ningún nivel reemplaza un valor por otro de
+menor ``version`` (en L2, con una transacción WATCH/MULTI).
+
+Sin L2 no hay invalidación entre workers, así que la cache solo se activa
+con CACHE_L2_URL, salvo que CACHE_L1_ENABLED=true la fuerce (un solo worker).
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class LRUCache:
+    """LRU en memoria con TTL, seguro para uso desde varios hilos."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStats:
+    """Contadores de aciertos y fallos por entidad."""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, entity: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(
+                entity, {"l1_hits": 0, "l2_hits": 0, "misses": 0, "invalidations": 0, "stale_sets": 0, "l2_errors": 0}
+            )
+            counters[counter] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for entity, counters in self._counters.items():
+                lookups = counters["l1_hits"] + counters["l2_hits"] + counters["misses"]
+                hits = counters["l1_hits"] + counters["l2_hits"]
+                result[entity] = {
+                    **counters,
+                    "lookups": lookups,
+                    "l1_hit_ratio": round(counters["l1_hits"] / lookups, 4) if lookups else 0.0,
+                    "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                }
+            return result
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__decimal__" in value:
+            return Decimal(value["__decimal__"])
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+    return value
+
+
+class RecordCache:
+    """
+    Cache read-through de registros por entidad y clave primaria.
+
+    Los valores son diccionarios con las columnas cacheadas de la fila; nunca
+    se guardan instancias ORM ni columnas sensibles como la contraseña.
+    """
+
+    def __init__(
+        self,
+        l1: LRUCache,
+        l2_client=None,
+        l2_ttl: int = 300,
+        channel: str = "microservicio_estudiantil:cache:invalidate",
+        prefix: str = "microservicio_estudiantil:cache:",
+        enabled: bool = True,
+        tombstone_ttl: float = 5.0
+    ):
+        self.l1 = l1
+        self.l2 = l2_client
+        self.l2_ttl = l2_ttl
+        self.channel = channel
+        self.prefix = prefix
+        self.enabled = enabled
+        self.tombstone_ttl = tombstone_ttl
+        self.stats = CacheStats()
+        self._tombstones: Dict[str, float] = {}  # clave -> vencimiento (monotonic)
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls) -> "RecordCache":
+        """Construye la cache a partir de las variables de entorno CACHE_*."""
+        settings = get_settings()
+        l2_client = None
+        if settings.cache_l2_url:
+            # redis se importa solo si hay L2: su importación cuesta más que el resto de la cache
+            try:
+                import redis
+            except ImportError:  # pragma: no cover - dependencia opcional
+                logger.warning("CACHE_L2_URL configurado pero el paquete redis no está instalado; se usa solo L1")
+            else:
+                l2_client = redis.Redis.from_url(settings.cache_l2_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+        # Sin L2, cada worker tendría su propia copia sin enterarse de las escrituras de los demás
+        l1_enabled = settings.cache_l1_enabled if settings.cache_l1_enabled is not None else l2_client is not None
+        if settings.cache_enabled and not l1_enabled:
+            logger.info("Cache de registros desactivada: requiere CACHE_L2_URL (o CACHE_L1_ENABLED=true con un solo worker)")
+
+        return cls(
+            l1=LRUCache(
+                max_entries=settings.cache_l1_max_entries,
+                ttl=settings.cache_l1_ttl
+            ),
+            l2_client=l2_client,
+            l2_ttl=settings.cache_l2_ttl,
+            enabled=settings.cache_enabled and l1_enabled,
+            tombstone_ttl=settings.cache_tombstone_ttl
+        )
+
+    def _key(self, entity: str, key: str) -> str:
+        return f"{entity}:{key}"
+
+    def _tombstone_key(self, cache_key: str) -> str:
+        return f"{self.prefix}tombstone:{cache_key}"
+
+    def _add_tombstone(self, cache_key: str) -> None:
+        """Descarta la entrada de L1 e impide repoblarla durante tombstone_ttl."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._tombstones) >= self.l1.max_entries:
+                self._tombstones = {k: v for k, v in self._tombstones.items() if v > now}
+            self._tombstones[cache_key] = now + self.tombstone_ttl
+            self.l1.delete(cache_key)
+
+    def _l1_set_if_newer(self, cache_key: str, value: Dict[str, Any]) -> bool:
+        """Guarda en L1 salvo que la entrada esté invalidada o tenga una versión posterior."""
+        with self._lock:
+            expires_at = self._tombstones.get(cache_key)
+            if expires_at is not None:
+                if expires_at > time.monotonic():
+                    return False
+                del self._tombstones[cache_key]
+            current = self.l1.get(cache_key)
+            if current is not None and current.get("version", 0) > value.get("version", 0):
+                return False
+            self.l1.set(cache_key, value)
+            return True
+
+    def _l2_set_if_newer(self, cache_key: str, value: Dict[str, Any]) -> bool:
+        """
+        Guarda en L2 salvo que haya un tombstone o un valor con versión igual o
+        posterior. Si otro proceso modifica la clave durante la transacción, se
+        desiste: el próximo lector la vuelve a cargar.
+        """
+        from redis.exceptions import WatchError
+
+        redis_key = self.prefix + cache_key
+        tombstone_key = self._tombstone_key(cache_key)
+        payload = json.dumps({k: _encode_value(v) for k, v in value.items()})
+        with self.l2.pipeline() as pipe:
+            try:
+                pipe.watch(redis_key, tombstone_key)
+                if pipe.exists(tombstone_key):
+                    return False
+                current = pipe.get(redis_key)
+                if current is not None and json.loads(current).get("version", 0) >= value.get("version", 0):
+                    return False
+                pipe.multi()
+                pipe.set(redis_key, payload, ex=self.l2_ttl)
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def get(self, entity: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca un registro en L1 y luego en L2.
+
+        Args:
+            entity: Nombre de la entidad (estudiante, pago, bloqueo)
+            key: Clave primaria del registro
+
+        Returns:
+            Diccionario con las columnas cacheadas o None si no está en cache
+        """
+        if not self.enabled:
+            return None
+
+        cache_key = self._key(entity, key)
+        value = self.l1.get(cache_key)
+        if value is not None:
+            self.stats.incr(entity, "l1_hits")
+            return value
+
+        if self.l2 is not None:
+            try:
+                raw = self.l2.get(self.prefix + cache_key)
+            except Exception as e:
+                self.stats.incr(entity, "l2_errors")
+                logger.warning(f"Error leyendo cache L2 para {cache_key}: {str(e)}")
+                raw = None
+            if raw is not None:
+                value = {k: _decode_value(v) for k, v in json.loads(raw).items()}
+                self._l1_set_if_newer(cache_key, value)
+                self.stats.incr(entity, "l2_hits")
+                return value
+
+        self.stats.incr(entity, "misses")
+        return None
+
+    def set(self, entity: str, key: str, value: Dict[str, Any]) -> None:
+        """
+        Guarda un registro en L1 y L2, salvo que la entrada se haya invalidado
+        hace menos de tombstone_ttl o la cache ya tenga una versión posterior
+        (el lector cargó la fila antes de una escritura concurrente).
+
+        Args:
+            entity: Nombre de la entidad
+            key: Clave primaria del registro
+            value: Columnas a cachear (incluida version)
+        """
+        if not self.enabled:
+            return
+
+        cache_key = self._key(entity, key)
+        # L2 primero: su tombstone es el único que ve una invalidación de otro worker
+        # cuyo mensaje de pub/sub todavía no llegó
+        if self.l2 is not None:
+            try:
+                if not self._l2_set_if_newer(cache_key, value):
+                    self.stats.incr(entity, "stale_sets")
+                    return
+            except Exception as e:
+                self.stats.incr(entity, "l2_errors")
+                logger.warning(f"Error escribiendo cache L2 para {cache_key}: {str(e)}")
+        if not self._l1_set_if_newer(cache_key, value):
+            self.stats.incr(entity, "stale_sets")
+
+    def invalidate(self, entity: str, key: str) -> None:
+        """
+        Descarta un registro en ambos niveles y avisa al resto de los workers.
+
+        Args:
+            entity: Nombre de la entidad
+            key: Clave primaria del registro
+        """
+        if not self.enabled:
+            return
+
+        cache_key = self._key(entity, key)
+        self._add_tombstone(cache_key)
+        self.stats.incr(entity, "invalidations")
+        if self.l2 is not None:
+            try:
+                pipe = self.l2.pipeline()
+                pipe.set(self._tombstone_key(cache_key), 1, px=int(self.tombstone_ttl * 1000))
+                pipe.delete(self.prefix + cache_key)
+                pipe.publish(self.channel, cache_key)
+                pipe.execute()
+            except Exception as e:
+                self.stats.incr(entity, "l2_errors")
+                logger.warning(f"Error invalidando cache L2 para {cache_key}: {str(e)}")
+
+    def start(self) -> None:
+        """Inicia el hilo que recibe invalidaciones de otros workers (si hay L2)."""
+        if not self.enabled or self.l2 is None or self._listener is not None:
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._listener.start()
+        logger.info(f"Escuchando invalidaciones de cache en el canal {self.channel}")
+
+    def stop(self) -> None:
+        """Detiene el hilo de invalidaciones."""
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2)
+            self._listener = None
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.l2.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 0.5
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        data = message["data"]
+                        self._add_tombstone(data.decode("utf-8") if isinstance(data, bytes) else data)
+            except Exception as e:
+                logger.warning(f"Error en el canal de invalidación de cache: {str(e)}")
+                # Sin el canal no hay forma de saber qué se invalidó mientras tanto
+                self.l1.clear()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estadísticas de la cache por entidad."""
+        return {
+            "enabled": self.enabled,
+            "l2_enabled": self.l2 is not None,
+            "l1_entries": len(self.l1),
+            "entities": self.stats.snapshot(),
+        }
+
+
+record_cache = RecordCache.from_env()
+
+
+def _cache_samples():
+    """Contadores de la cache de registros, leídos al consultar /metrics."""
+    samples = []
+    for entity, counters in record_cache.stats.snapshot().items():
+        for counter, result in (("l1_hits", "l1_hit"), ("l2_hits", "l2_hit"), ("misses", "miss")):
+            samples.append((
+                "cache_lookups_total", "counter", "Búsquedas en la cache de registros por resultado",
+                {"entity": entity, "result": result}, counters[counter]
+            ))
+        samples.append((
+            "cache_invalidations_total", "counter", "Invalidaciones de la cache de registros",
+            {"entity": entity}, counters["invalidations"]
+        ))
+        samples.append((
+            "cache_stale_sets_total", "counter", "Escrituras en cache descartadas por invalidación reciente o versión posterior",
+            {"entity": entity}, counters["stale_sets"]
+        ))
+        samples.append((
+            "cache_l2_errors_total", "counter", "Errores al usar la cache L2",
+            {"entity": entity}, counters["l2_errors"]
+        ))
+    samples.append(("cache_l1_entries", "gauge", "Entradas en la cache L1 de este worker", {}, len(record_cache.l1)))
+    return samples
+
+
+metrics.register_collector(_cache_samples)
+
+
+def cache_columns(instance, columns: Sequence) -> Dict[str, Any]:
+    """
+    Extrae de una instancia ORM las columnas a cachear.
+
+    Args:
+        instance: Instancia ORM cargada
+        columns: Columnas a extraer
+
+    Returns:
+        Diccionario columna -> valor
+    """
+    return {column.key: getattr(instance, column.key) for column in columns}
+
+
+def load_cached(db: Session, model, value: Dict[str, Any]):
+    """
+    Reconstruye una instancia ORM persistente a partir de un registro cacheado.
+
+    La instancia se incorpora a la sesión sin emitir SQL; las columnas que no
+    están en cache (por ejemplo contrasena) se cargan de forma diferida si se acceden.
+
+    Args:
+        db: Sesión de base de datos
+        model: Modelo SQLAlchemy
+        value: Columnas cacheadas
+
+    Returns:
+        Instancia asociada a la sesión
+    """
+    instance = model(**value)
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
@@ -0,0 +1,209 @@
+"""
+Control en caliente de niveles y muestreo de logging.
+
+Los cambios se guardan en un archivo de control compartido (LOG_CONTROL_FILE)
+que cada worker vigila desde un hilo, de modo que un cambio recibido por
+cualquier worker llega a todos sin reiniciar. Cada cambio vence: al vencer,
+el logger vuelve a su nivel original y deja de muestrearse.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.config.logging import (
+    get_configured_level,
+    get_logger,
+    sampling_filter,
+    set_handler_floor
+)
+from app.config.settings import get_settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - solo en plataformas sin flock
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+class LogControl:
+    """Cambios temporales de nivel y muestreo por logger, compartidos entre workers."""
+
+    def __init__(self, path: str, poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        # Nivel propio de cada logger antes de su primer cambio
+        self._baseline: Dict[str, int] = {}
+        self._file_id = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_override(
+        self,
+        name: str,
+        level: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        ttl: int = 900
+    ) -> Dict[str, Any]:
+        """
+        Cambia el nivel y/o el muestreo de un logger durante `ttl` segundos.
+
+        Args:
+            name: Nombre del logger (ej: app.crud, sqlalchemy.engine)
+            level: Nivel temporal, o None para mantener el actual
+            sample_rate: Fracción de registros (< WARNING) que se escriben, o None para no muestrear
+            ttl: Segundos hasta revertir el cambio
+
+        Returns:
+            El cambio aplicado, con su vencimiento
+        """
+        entry = {"level": level, "sample_rate": sample_rate, "expires_at": time.time() + ttl}
+        overrides = self._update_file(lambda current: current.__setitem__(name, entry))
+        self._apply(overrides)
+        logger.warning(
+            f"Logging ajustado en caliente: {name} nivel={level or '-'} "
+            f"muestreo={sample_rate if sample_rate is not None else '-'} durante {ttl}s"
+        )
+        return entry
+
+    def clear_override(self, name: str) -> bool:
+        """
+        Revierte de inmediato el cambio de un logger.
+
+        Returns:
+            True si el logger tenía un cambio activo
+        """
+        existed = name in self._overrides
+        overrides = self._update_file(lambda current: current.pop(name, None))
+        self._apply(overrides)
+        if existed:
+            logger.warning(f"Logging restaurado manualmente: {name}")
+        return existed
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Cambios activos en este worker y nivel efectivo de cada logger afectado.
+        """
+        now = time.time()
+        with self._lock:
+            overrides = dict(self._overrides)
+        return {
+            "configured_level": logging.getLevelName(get_configured_level()),
+            "overrides": {
+                name: {
+                    "level": entry.get("level"),
+                    "effective_level": logging.getLevelName(logging.getLogger(name).getEffectiveLevel()),
+                    "sample_rate": entry.get("sample_rate"),
+                    "expires_in": max(0, round(entry["expires_at"] - now)),
+                }
+                for name, entry in sorted(overrides.items())
+            },
+        }
+
+    def refresh(self) -> None:
+        """Aplica el archivo de control si cambió y revierte los cambios vencidos."""
+        file_id = self._stat()
+        if file_id != self._file_id:
+            self._file_id = file_id
+            self._apply(self._read_file())
+        elif any(entry["expires_at"] <= time.time() for entry in self._overrides.values()):
+            self._apply(self._overrides)
+
+    def start(self) -> None:
+        """Aplica el estado actual del archivo y arranca el hilo que lo vigila."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="log-control", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error aplicando el control de logging: {str(e)}", exc_info=True)
+
+    def _apply(self, overrides: Dict[str, Dict[str, Any]]) -> None:
+        now = time.time()
+        active = {name: entry for name, entry in overrides.items() if entry["expires_at"] > now}
+        with self._lock:
+            leveled = {name for name, entry in active.items() if entry.get("level")}
+            for name in list(self._baseline):
+                if name not in leveled:
+                    logging.getLogger(name).setLevel(self._baseline.pop(name))
+                    logger.info(f"Nivel de logger restaurado: {name}")
+
+            ratios = {}
+            for name, entry in active.items():
+                if entry.get("level"):
+                    target = logging.getLogger(name)
+                    self._baseline.setdefault(name, target.level)
+                    target.setLevel(entry["level"])
+                if entry.get("sample_rate") is not None:
+                    ratios[name] = entry["sample_rate"]
+            sampling_filter.set_ratios(ratios)
+
+            # Consola y app.log deben dejar pasar el nivel más bajo pedido
+            levels = [logging.getLogger(name).getEffectiveLevel() for name in self._baseline]
+            set_handler_floor(min(levels + [get_configured_level()]))
+            self._overrides = active
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # El archivo se reemplaza en cada escritura: el inodo cambia siempre
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("overrides", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Archivo de control de logging ilegible ({self.path}): {str(e)}")
+            return dict(self._overrides)
+
+    def _update_file(self, mutate: Callable[[Dict[str, Dict[str, Any]]], Any]) -> Dict[str, Dict[str, Any]]:
+        """Lee, modifica y reemplaza el archivo de control bajo un lock entre procesos."""
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                overrides = self._read_file()
+                mutate(overrides)
+                now = time.time()
+                overrides = {name: entry for name, entry in overrides.items() if entry["expires_at"] > now}
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"overrides": overrides}, f)
+                os.replace(temp_path, self.path)
+                self._file_id = self._stat()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return overrides
+
+
+log_control = LogControl(
+    path=get_settings().log_control_file,
+    poll_interval=get_settings().log_control_poll_interval
+)
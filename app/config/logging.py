@@ -2,13 +2,26 @@
 Configuración centralizada de logging para el microservicio estudiantil.
 """
 
+import atexit
+import copy
+import functools
+import gzip
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import random
+import shutil
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from app.config.settings import get_settings
+from app.metrics import metrics
 
 
 class ColoredFormatter(logging.Formatter):
@@ -57,20 +70,267 @@ class RequestFormatter(logging.Formatter):
         return super().format(record)
 
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloquea al hilo que loggea.
+
+    Cada instancia reemplaza a los handlers de un logger y recuerda cuáles eran
+    (``targets``); el listener entrega el registro solo a esos handlers. Si la
+    cola está llena el registro se descarta y se cuenta por nivel.
+    """
+
+    def __init__(self, log_queue: queue.Queue, targets: List[logging.Handler]):
+        super().__init__(log_queue)
+        self.targets = tuple(targets)
+        self.dropped: Dict[str, int] = {}
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Solo se interpola el mensaje (los args podrían cambiar después); el
+        # formato completo, traceback incluido, lo hace cada handler en el listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.targets = self.targets
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class DispatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener que entrega cada registro a los handlers de su logger de origen."""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in record.targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        # La cola puede estar llena: se espera lugar en vez de fallar al detener
+        self.queue.put(self._sentinel)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros de los loggers con muestreo.
+
+    Las fracciones se asignan por nombre de logger y aplican a sus hijos
+    (``app.crud`` cubre ``app.crud.estudiante``). WARNING o superior pasa siempre.
+    La decisión se guarda en el registro para que todos los handlers que lo
+    reciben coincidan.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # (fracciones por logger, cache de resolución por nombre), reemplazados juntos
+        self._state = ({}, {})
+
+    def set_ratios(self, ratios: Dict[str, float]) -> None:
+        self._state = (dict(ratios), {})
+
+    def get_ratios(self) -> Dict[str, float]:
+        return dict(self._state[0])
+
+    def _resolve(self, name: str) -> Optional[float]:
+        ratios, resolved = self._state
+        try:
+            return resolved[name]
+        except KeyError:
+            pass
+        current = name
+        ratio = None
+        while True:
+            if current in ratios:
+                ratio = ratios[current]
+                break
+            if "." not in current:
+                break
+            current = current.rsplit(".", 1)[0]
+        resolved[name] = ratio
+        return ratio
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self._state[0] or record.levelno >= logging.WARNING:
+            return True
+        sampled = getattr(record, "sampled", None)
+        if sampled is None:
+            ratio = self._resolve(record.name)
+            sampled = ratio is None or random.random() < ratio
+            record.sampled = sampled
+        return sampled
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """
+    Comprime un archivo de log rotado.
+
+    Se ejecuta en el hilo del listener (nunca en el de un request); mientras
+    comprime, los registros nuevos esperan en la cola.
+    """
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+# Estado del pipeline de logging asíncrono
+_queue_handlers: List[BoundedQueueHandler] = []
+_listener: Optional[DispatchingQueueListener] = None
+_log_queue: Optional[queue.Queue] = None
+
+# Fracción de llamadas CRUD exitosas que se registran en el log (ver instrument)
+_sample_rate = 0.01
+
+# Muestreo por logger, ajustable en caliente (ver app.config.log_control)
+sampling_filter = SamplingFilter()
+
+# Handlers generales cuyo nivel acompaña a LOG_LEVEL (los de errores,
+# requests y base de datos mantienen su nivel fijo)
+_LEVEL_HANDLER_NAMES = ('console', 'file_app')
+_level_handlers: List[logging.Handler] = []
+_configured_level = logging.INFO
+
+
+def _start_listener() -> None:
+    global _listener
+    handlers = {handler for queue_handler in _queue_handlers for handler in queue_handler.targets}
+    _listener = DispatchingQueueListener(_log_queue, *handlers)
+    _listener.start()
+
+
+def stop_logging_listener() -> None:
+    """Detiene el hilo de logging después de escribir los registros pendientes."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    # El hilo del listener no sobrevive al fork: el proceso hijo arranca uno propio
+    global _listener, _log_queue
+    if _log_queue is None:
+        return
+    _log_queue = queue.Queue(maxsize=_log_queue.maxsize)
+    for queue_handler in _queue_handlers:
+        queue_handler.queue = _log_queue
+        queue_handler._dropped_lock = threading.Lock()
+    _start_listener()
+
+
+def _install_queue_handlers(logger_names: List[str], queue_size: int) -> None:
+    """
+    Reemplaza los handlers de cada logger por un BoundedQueueHandler y arranca el listener.
+
+    Args:
+        logger_names: Loggers configurados
+        queue_size: Máximo de registros pendientes en la cola
+    """
+    global _log_queue
+    stop_logging_listener()
+    _queue_handlers.clear()
+    _log_queue = queue.Queue(maxsize=queue_size)
+
+    for name in logger_names:
+        target_logger = logging.getLogger(name or None)
+        if not target_logger.handlers:
+            continue
+        queue_handler = BoundedQueueHandler(_log_queue, target_logger.handlers)
+        target_logger.handlers = [queue_handler]
+        _queue_handlers.append(queue_handler)
+
+    _start_listener()
+
+
+def get_configured_level() -> int:
+    """
+    Nivel de logging configurado al iniciar (LOG_LEVEL).
+    """
+    return _configured_level
+
+
+def set_handler_floor(level: int) -> None:
+    """
+    Ajusta el nivel de los handlers generales (consola y app.log).
+    
+    Un logger bajado a DEBUG en caliente no escribiría nada si estos handlers
+    siguieran en LOG_LEVEL; el control de logging los baja mientras dure el cambio.
+    
+    Args:
+        level: Nivel mínimo que deben dejar pasar
+    """
+    for handler in _level_handlers:
+        handler.setLevel(level)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    Estado de la cola de logging.
+
+    Returns:
+        Tamaño actual y máximo de la cola y registros descartados por nivel
+    """
+    dropped: Dict[str, int] = {}
+    for queue_handler in _queue_handlers:
+        for level, count in queue_handler.dropped.items():
+            dropped[level] = dropped.get(level, 0) + count
+    return {
+        "queue_enabled": _log_queue is not None,
+        "queue_size": _log_queue.qsize() if _log_queue is not None else 0,
+        "queue_max": _log_queue.maxsize if _log_queue is not None else 0,
+        "dropped": dropped,
+    }
+
+
+def _logging_samples():
+    """Registros descartados y ocupación de la cola, leídos al consultar /metrics."""
+    stats = get_logging_stats()
+    samples = [
+        ("log_records_dropped_total", "counter", "Registros de log descartados por cola llena", {"level": level}, count)
+        for level, count in stats["dropped"].items()
+    ]
+    samples.append(("log_queue_size", "gauge", "Registros pendientes en la cola de logging", {}, stats["queue_size"]))
+    return samples
+
+
+metrics.register_collector(_logging_samples)
+
+
 def setup_logging(
     log_level: str = "INFO",
     log_dir: str = "logs",
     console_output: bool = True,
-    file_output: bool = True
+    file_output: bool = True,
+    queue_size: int = 10000,
+    rotation: str = "external"
 ) -> None:
     """
     Configura el sistema de logging.
     
+    Con queue_size > 0 la escritura a consola y archivos ocurre en un hilo de
+    fondo: los loggers solo encolan registros (sin bloquear).
+    
+    Los archivos se comparten entre todos los workers del lanzador, así que
+    por defecto la rotación es externa (logrotate o similar): cada proceso
+    escribe con WatchedFileHandler y reabre el archivo cuando lo renombran.
+    Con rotation="size" cada proceso rota por tamaño y comprime con gzip; solo
+    es seguro con un único proceso escribiendo (uvicorn de desarrollo).
+    
     Args:
         log_level: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_dir: Directorio donde guardar los logs
         console_output: Si mostrar logs en consola
         file_output: Si guardar logs en archivo
+        queue_size: Máximo de registros pendientes; 0 escribe de forma síncrona
+        rotation: "external" (WatchedFileHandler) o "size" (RotatingFileHandler + gzip)
     """
     
     # Crear directorio de logs si no existe
@@ -204,6 +464,19 @@ def setup_logging(
             'encoding': 'utf-8'
         }
         
+        file_handlers = ('file_app', 'file_error', 'file_requests', 'file_database')
+        if rotation == 'size':
+            # Los archivos rotados se comprimen (app.log.1.gz, ...)
+            if queue_size > 0:
+                for handler_name in file_handlers:
+                    config['handlers'][handler_name]['.'] = {'namer': _gzip_namer, 'rotator': _gzip_rotator}
+        else:
+            # Varios procesos escriben en O_APPEND sobre el mismo archivo; ninguno lo rota
+            for handler_name in file_handlers:
+                handler_config = config['handlers'][handler_name]
+                handler_config['class'] = 'logging.handlers.WatchedFileHandler'
+                del handler_config['maxBytes'], handler_config['backupCount']
+        
         # Agregar handlers de archivo a los loggers correspondientes
         config['loggers']['']['handlers'].extend(['file_app', 'file_error'])
         config['loggers']['app']['handlers'].extend(['file_app', 'file_error'])
@@ -213,6 +486,25 @@ def setup_logging(
     # Aplicar configuración
     logging.config.dictConfig(config)
     
+    global _configured_level
+    _configured_level = logging.getLevelName(log_level)
+    configured_handlers = {
+        handler
+        for name in config['loggers']
+        for handler in logging.getLogger(name or None).handlers
+    }
+    _level_handlers[:] = [h for h in configured_handlers if h.get_name() in _LEVEL_HANDLER_NAMES]
+    
+    # Escritura en segundo plano: los loggers solo encolan registros
+    if queue_size > 0:
+        _install_queue_handlers(list(config['loggers']), queue_size)
+        # El muestreo se decide antes de copiar el registro y encolarlo
+        for queue_handler in _queue_handlers:
+            queue_handler.addFilter(sampling_filter)
+    else:
+        for handler in configured_handlers:
+            handler.addFilter(sampling_filter)
+    
     # Log inicial
     logger = logging.getLogger('app.config.logging')
     logger.info(f"Sistema de logging configurado - Nivel: {log_level}")
@@ -231,34 +523,33 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
-def log_function_call(func):
+def get_sample_rate() -> float:
     """
-    Decorador para loggear llamadas a funciones.
+    Fracción de llamadas exitosas que `instrument` registra en el log.
+    """
+    return _sample_rate
+
+
+def set_sample_rate(rate: float) -> None:
+    """
+    Ajusta la fracción de llamadas exitosas que `instrument` registra en el log.
     
     Args:
-        func: Función a decorar
-        
-    Returns:
-        Función decorada
+        rate: Valor entre 0 (ninguna) y 1 (todas)
     """
-    def wrapper(*args, **kwargs):
-        logger = get_logger(func.__module__)
-        logger.debug(f"Llamando a {func.__name__} con args={args}, kwargs={kwargs}")
-        
-        try:
-            result = func(*args, **kwargs)
-            logger.debug(f"{func.__name__} completado exitosamente")
-            return result
-        except Exception as e:
-            logger.error(f"Error en {func.__name__}: {str(e)}", exc_info=True)
-            raise
-    
-    return wrapper
+    global _sample_rate
+    _sample_rate = min(max(float(rate), 0.0), 1.0)
 
 
-def log_execution_time(func):
+def instrument(func):
     """
-    Decorador para loggear tiempo de ejecución de funciones.
+    Decorador de instrumentación para las operaciones CRUD.
+    
+    - La duración de cada llamada se registra en el histograma
+      `crud_duration_seconds` (etiqueta `function`), sin escribir en el log.
+    - Las llamadas exitosas se loggean solo para una muestra (CRUD_LOG_SAMPLE_RATE)
+      y solo si el nivel está habilitado; los argumentos se formatean únicamente en DEBUG.
+    - Los errores se loggean siempre, con la traza completa.
     
     Args:
         func: Función a decorar
@@ -266,33 +557,57 @@ def log_execution_time(func):
     Returns:
         Función decorada
     """
+    logger = get_logger(func.__module__)
+    name = func.__name__
+    histogram = metrics.histogram(
+        "crud_duration_seconds",
+        help="Duración de las operaciones CRUD",
+        function=f"{func.__module__.rsplit('.', 1)[-1]}.{name}"
+    )
+    
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        import time
-        logger = get_logger(func.__module__)
-        
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            logger.info(f"{func.__name__} ejecutado en {execution_time:.4f} segundos")
-            return result
         except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"{func.__name__} falló después de {execution_time:.4f} segundos: {str(e)}")
+            execution_time = time.perf_counter() - start_time
+            histogram.observe(execution_time)
+            logger.error(
+                f"{name} falló después de {execution_time:.4f} segundos: {str(e)}",
+                exc_info=True
+            )
             raise
+        execution_time = time.perf_counter() - start_time
+        histogram.observe(execution_time)
+        
+        if _sample_rate and random.random() < _sample_rate:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"{name} ejecutado en {execution_time:.4f} segundos "
+                    f"(args={args[1:]}, kwargs={kwargs})"
+                )
+            elif logger.isEnabledFor(logging.INFO):
+                logger.info(f"{name} ejecutado en {execution_time:.4f} segundos")
+        return result
     
     return wrapper
 
 
 # Configurar logging al importar el módulo
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-log_dir = os.getenv('LOG_DIR', 'logs')
-console_output = os.getenv('LOG_CONSOLE', 'true').lower() == 'true'
-file_output = os.getenv('LOG_FILE', 'true').lower() == 'true'
+_settings = get_settings()
+set_sample_rate(_settings.crud_log_sample_rate)
 
 setup_logging(
-    log_level=log_level,
-    log_dir=log_dir,
-    console_output=console_output,
-    file_output=file_output
-)
\ No newline at end of file
+    log_level=_settings.log_level,
+    log_dir=_settings.log_dir,
+    console_output=_settings.log_console,
+    file_output=_settings.log_file,
+    queue_size=_settings.log_queue_size,
+    rotation=_settings.log_rotation
+)
+
+# Vaciar la cola al terminar el proceso y relanzar el listener en procesos hijos
+atexit.register(stop_logging_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Configuración del microservicio.
+
+Todas las variables de entorno se leen acá, una sola vez: ``get_settings()``
+construye la configuración en la primera llamada (variables de entorno y,
+para las que no estén definidas, el archivo ``.env`` de la raíz del proyecto)
+y después devuelve siempre el mismo objeto. Los tipos se validan al arrancar:
+un valor inválido detiene el proceso en lugar de fallar en el primer request.
+
+Los nombres de los campos son los de las variables de entorno en minúsculas
+(``database_url`` se lee de DATABASE_URL).
+"""
+
+import os
+from functools import lru_cache
+from typing import Literal, Optional
+
+from pydantic import BaseSettings, validator
+
+# .env de la raíz del proyecto, como lo encontraba load_dotenv() desde app/
+ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env")
+
+
+class Settings(BaseSettings):
+    """Configuración leída del entorno; ver .env.example para la descripción de cada variable."""
+
+    # Base de datos
+    database_url: str
+    db_auto_migrate: bool = False
+
+    # Autenticación
+    secret_key: Optional[str] = None
+    algorithm: Optional[str] = None
+    access_token_expire_minutes: int = 30
+    admin_token: Optional[str] = None
+
+    # Logging
+    log_level: str = "INFO"
+    log_dir: str = "logs"
+    log_console: bool = True
+    log_file: bool = True
+    log_queue_size: int = 10000
+    # external: WatchedFileHandler y rotación con logrotate; size: rotación propia, un solo proceso
+    log_rotation: Literal["external", "size"] = "external"
+    crud_log_sample_rate: float = 0.01
+    log_control_file: Optional[str] = None
+    log_control_poll_interval: float = 2.0
+
+    # Consultas
+    slow_query_threshold_ms: float = 200
+    slow_query_max_shapes: int = 500
+    slow_query_explain: bool = True
+    query_repeat_warn_threshold: int = 10
+
+    # Cache de registros
+    cache_enabled: bool = True
+    # Sin definir: L1 solo con L2 (sin L2 no hay invalidación entre workers)
+    cache_l1_enabled: Optional[bool] = None
+    cache_l1_max_entries: int = 1024
+    cache_l1_ttl: float = 30
+    cache_l2_url: Optional[str] = None
+    cache_l2_ttl: int = 300
+    cache_tombstone_ttl: float = 5.0
+
+    # Compresión de respuestas
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_cache_max_entries: int = 256
+    compression_cache_ttl: float = 300
+
+    # Métricas
+    metrics_multiproc_dir: Optional[str] = None
+    metrics_write_interval: float = 5.0
+
+    # Perfilado
+    profiling_enabled: bool = True
+    profile_sample_interval_ms: float = 2
+    profile_dir: Optional[str] = None
+    profile_max_files: int = 50
+    continuous_profiling_enabled: bool = False
+    continuous_profile_dir: Optional[str] = None
+    continuous_profile_interval_ms: float = 20
+    continuous_profile_flush_interval: float = 300
+    continuous_profile_max_files: int = 288
+
+    # Memoria y loop de eventos
+    memory_sample_interval: float = 60
+    memory_history_size: int = 1440
+    memory_trace_frames: int = 30
+    memory_max_snapshots: int = 5
+    loop_monitor_enabled: bool = True
+    loop_lag_interval_ms: float = 100
+    loop_block_threshold_ms: float = 250
+
+    # Grabación de tráfico
+    traffic_record_file: Optional[str] = None
+    traffic_record_sample_rate: float = 1.0
+    traffic_record_raw_path: bool = False
+
+    # Servidor (python -m app.server)
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_concurrency: Optional[int] = None
+    server_backlog: int = 2048
+    server_keepalive_timeout: int = 65
+    server_graceful_timeout: int = 30
+
+    class Config:
+        env_file = ENV_FILE
+        env_file_encoding = "utf-8"
+
+    @validator("log_level")
+    def _upper_log_level(cls, value: str) -> str:
+        return value.upper()
+
+    @validator("web_concurrency", pre=True)
+    def _empty_web_concurrency(cls, value):
+        # WEB_CONCURRENCY= (vacía) equivale a no definirla
+        return value or None
+
+    @validator("log_control_file", always=True)
+    def _default_log_control_file(cls, value: Optional[str], values: dict) -> str:
+        return value or os.path.join(values.get("log_dir", "logs"), "log_control.json")
+
+    @validator("profile_dir", always=True)
+    def _default_profile_dir(cls, value: Optional[str], values: dict) -> str:
+        return value or os.path.join(values.get("log_dir", "logs"), "profiles")
+
+    @validator("continuous_profile_dir", always=True)
+    def _default_continuous_profile_dir(cls, value: Optional[str], values: dict) -> str:
+        return value or os.path.join(values["profile_dir"], "continuous")
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    Configuración del proceso, construida en la primera llamada.
+
+    Para releer el entorno después de modificarlo (lanzador, benchmarks),
+    llamar antes a ``get_settings.cache_clear()``.
+    """
+    return Settings()
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.models.bloqueo import Bloqueo
 from app.models.estudiante import Estudiante
@@ -6,15 +7,29 @@ from app.schemas.bloqueo import BloqueoCreate, BloqueoUpdate
 from app.exceptions import (
     BloqueoNotFoundError,
     EstudianteNotFoundError,
+    VersionConflictError,
     DatabaseError,
     ValidationError
 )
-from app.config.logging import get_logger, log_function_call, log_execution_time
+from app.config.logging import get_logger, instrument
+from app.crud.versioning import versioned_update, get_current_version
+from app.cache import record_cache, cache_columns, load_cached
 
 logger = get_logger(__name__)
 
-@log_function_call
-@log_execution_time
+# Columnas expuestas por BloqueoResponse, en el orden del esquema
+SCHEMA_COLUMNS = (
+    Bloqueo.registro_academico,
+    Bloqueo.descripcion,
+    Bloqueo.codigo_bloqueo,
+)
+
+SCHEMA_KEYS = tuple(column.key for column in SCHEMA_COLUMNS)
+
+# Columnas de la respuesta más la versión de la fila
+RESPONSE_COLUMNS = SCHEMA_COLUMNS + (Bloqueo.version,)
+
+@instrument
 def generate_codigo_bloqueo(db: Session):
     """
     Genera un código único para el bloqueo.
@@ -53,15 +68,15 @@ def generate_codigo_bloqueo(db: Session):
         raise DatabaseError(f"Error inesperado al generar código de bloqueo: {str(e)}")
 
 
-@log_function_call
-@log_execution_time
-def get_bloqueo(db: Session, codigo_bloqueo: str):
+@instrument
+def get_bloqueo(db: Session, codigo_bloqueo: str, fields: Optional[Sequence[str]] = None):
     """
     Obtiene un bloqueo por su código.
     
     Args:
         db: Sesión de base de datos
         codigo_bloqueo: Código del bloqueo
+        fields: Campos a cargar (load_only), o None para cargar todas las columnas no diferidas
         
     Returns:
         Bloqueo encontrado o None
@@ -77,10 +92,22 @@ def get_bloqueo(db: Session, codigo_bloqueo: str):
             logger.warning("Se proporcionó un código de bloqueo vacío o nulo")
             raise ValidationError("El código de bloqueo es requerido")
         
-        bloqueo = db.query(Bloqueo).filter(Bloqueo.codigo_bloqueo == codigo_bloqueo).first()
+        cached = record_cache.get("bloqueo", codigo_bloqueo)
+        if cached is not None:
+            logger.info(f"Bloqueo encontrado en cache: {codigo_bloqueo}")
+            return load_cached(db, Bloqueo, cached)
+        
+        query = db.query(Bloqueo).filter(Bloqueo.codigo_bloqueo == codigo_bloqueo)
+        if fields:
+            # Solo las columnas pedidas (más la versión para el ETag)
+            query = query.options(load_only(*fields, "version"))
+        bloqueo = query.first()
         
         if bloqueo:
             logger.info(f"Bloqueo encontrado: {codigo_bloqueo}")
+            # Una instancia parcial no se guarda en cache
+            if not fields:
+                record_cache.set("bloqueo", codigo_bloqueo, cache_columns(bloqueo, RESPONSE_COLUMNS))
         else:
             logger.info(f"No se encontró bloqueo con código: {codigo_bloqueo}")
             
@@ -96,8 +123,46 @@ def get_bloqueo(db: Session, codigo_bloqueo: str):
         raise DatabaseError(f"Error inesperado al buscar bloqueo: {str(e)}")
 
 
-@log_function_call
-@log_execution_time
+@instrument
+def get_bloqueo_version(db: Session, codigo_bloqueo: str):
+    """
+    Obtiene la versión actual de un bloqueo sin cargar la entidad completa.
+    
+    Args:
+        db: Sesión de base de datos
+        codigo_bloqueo: Código del bloqueo
+        
+    Returns:
+        Versión de la fila o None si el bloqueo no existe
+        
+    Raises:
+        DatabaseError: Si ocurre un error de base de datos
+        ValidationError: Si el código de bloqueo es inválido
+    """
+    try:
+        logger.debug(f"Consultando versión del bloqueo: {codigo_bloqueo}")
+        
+        if not codigo_bloqueo or not codigo_bloqueo.strip():
+            logger.warning("Se proporcionó un código de bloqueo vacío o nulo")
+            raise ValidationError("El código de bloqueo es requerido")
+        
+        cached = record_cache.get("bloqueo", codigo_bloqueo)
+        if cached is not None:
+            return cached["version"]
+        
+        return get_current_version(db, Bloqueo, Bloqueo.codigo_bloqueo, codigo_bloqueo)
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error de base de datos al consultar versión del bloqueo {codigo_bloqueo}: {str(e)}")
+        raise DatabaseError(f"Error al consultar versión del bloqueo: {str(e)}")
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al consultar versión del bloqueo {codigo_bloqueo}: {str(e)}")
+        raise DatabaseError(f"Error inesperado al consultar versión del bloqueo: {str(e)}")
+
+
+@instrument
 def get_bloqueos_by_estudiante(db: Session, registro_academico: str):
     """
     Obtiene todos los bloqueos de un estudiante.
@@ -135,8 +200,7 @@ def get_bloqueos_by_estudiante(db: Session, registro_academico: str):
         raise DatabaseError(f"Error inesperado al obtener bloqueos del estudiante: {str(e)}")
 
 
-@log_function_call
-@log_execution_time
+@instrument
 def get_bloqueos(db: Session, skip: int = 0, limit: int = 100):
     """
     Obtiene una lista paginada de bloqueos.
@@ -179,8 +243,60 @@ def get_bloqueos(db: Session, skip: int = 0, limit: int = 100):
         raise DatabaseError(f"Error inesperado al obtener bloqueos: {str(e)}")
 
 
-@log_function_call
-@log_execution_time
+@instrument
+def get_bloqueos_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None
+):
+    """
+    Obtiene una lista paginada de bloqueos como tuplas con las columnas de la respuesta.
+    
+    No hidrata instancias ORM ni carga columnas que la respuesta no expone;
+    pensada para serializarse directamente con render_rows.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Máximo número de registros a retornar
+        fields: Campos a seleccionar (en el orden de SCHEMA_KEYS), o None para todos
+        
+    Returns:
+        Lista de filas con las columnas de fields, o de SCHEMA_COLUMNS si no se indicó
+        
+    Raises:
+        DatabaseError: Si ocurre un error de base de datos
+        ValidationError: Si los parámetros de paginación son inválidos
+    """
+    try:
+        logger.info(f"Obteniendo filas de bloqueos con skip={skip}, limit={limit}")
+        
+        if skip < 0:
+            logger.warning(f"Valor de skip inválido: {skip}")
+            raise ValidationError("El valor de skip debe ser mayor o igual a 0")
+            
+        if limit < 1 or limit > 1000:
+            logger.warning(f"Valor de limit inválido: {limit}")
+            raise ValidationError("El valor de limit debe estar entre 1 y 1000")
+        
+        columns = [column for column in SCHEMA_COLUMNS if column.key in fields] if fields else SCHEMA_COLUMNS
+        rows = db.query(*columns).offset(skip).limit(limit).all()
+        
+        logger.info(f"Se obtuvieron {len(rows)} filas de bloqueos")
+        return rows
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error de base de datos al obtener filas de bloqueos: {str(e)}")
+        raise DatabaseError(f"Error al obtener bloqueos: {str(e)}")
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al obtener filas de bloqueos: {str(e)}")
+        raise DatabaseError(f"Error inesperado al obtener bloqueos: {str(e)}")
+
+
+@instrument
 def create_bloqueo(db: Session, bloqueo: BloqueoCreate):
     """
     Crea un nuevo bloqueo.
@@ -214,6 +330,7 @@ def create_bloqueo(db: Session, bloqueo: BloqueoCreate):
         db.add(db_bloqueo)
         db.commit()
         db.refresh(db_bloqueo)
+        record_cache.invalidate("bloqueo", db_bloqueo.codigo_bloqueo)
         
         logger.info(f"Bloqueo creado exitosamente: {db_bloqueo.codigo_bloqueo}")
         return db_bloqueo
@@ -235,44 +352,62 @@ def create_bloqueo(db: Session, bloqueo: BloqueoCreate):
         raise DatabaseError(f"Error inesperado al crear bloqueo: {str(e)}")
 
 
-@log_function_call
-@log_execution_time
-def update_bloqueo(db: Session, codigo_bloqueo: str, bloqueo_update: BloqueoUpdate):
+@instrument
+def update_bloqueo(
+    db: Session,
+    codigo_bloqueo: str,
+    bloqueo_update: BloqueoUpdate,
+    expected_version: Optional[int] = None
+):
     """
     Actualiza un bloqueo existente.
     
+    La actualización se hace con una sola sentencia UPDATE ... RETURNING que
+    incrementa la versión de la fila; si se indica expected_version, solo se
+    aplica cuando la versión actual coincide (concurrencia optimista).
+    
     Args:
         db: Sesión de base de datos
         codigo_bloqueo: Código del bloqueo a actualizar
         bloqueo_update: Datos a actualizar
+        expected_version: Versión conocida por el cliente (If-Match) o None
         
     Returns:
-        Bloqueo actualizado
+        Fila actualizada con las columnas de la respuesta y la nueva versión
         
     Raises:
         BloqueoNotFoundError: Si no se encuentra el bloqueo
+        VersionConflictError: Si el bloqueo fue modificado por otra petición
         DatabaseError: Si ocurre un error de base de datos
     """
     try:
         logger.info(f"Actualizando bloqueo con código: {codigo_bloqueo}")
         
-        db_bloqueo = db.query(Bloqueo).filter(Bloqueo.codigo_bloqueo == codigo_bloqueo).first()
-        if not db_bloqueo:
-            logger.warning(f"No se encontró bloqueo para actualizar: {codigo_bloqueo}")
-            raise BloqueoNotFoundError(bloqueo_id=None)
-        
         update_data = bloqueo_update.dict(exclude_unset=True)
         
-        for field, value in update_data.items():
-            setattr(db_bloqueo, field, value)
+        db_bloqueo = versioned_update(
+            db, Bloqueo, Bloqueo.codigo_bloqueo, codigo_bloqueo,
+            update_data, expected_version, RESPONSE_COLUMNS
+        )
+        if db_bloqueo is None:
+            current_version = get_current_version(db, Bloqueo, Bloqueo.codigo_bloqueo, codigo_bloqueo)
+            db.rollback()
+            if current_version is None:
+                logger.warning(f"No se encontró bloqueo para actualizar: {codigo_bloqueo}")
+                raise BloqueoNotFoundError(bloqueo_id=None)
+            logger.warning(
+                f"Conflicto de versión al actualizar bloqueo {codigo_bloqueo}: "
+                f"esperada={expected_version}, actual={current_version}"
+            )
+            raise VersionConflictError("bloqueo", codigo_bloqueo, expected_version, current_version)
         
         db.commit()
-        db.refresh(db_bloqueo)
+        record_cache.invalidate("bloqueo", codigo_bloqueo)
         
-        logger.info(f"Bloqueo actualizado exitosamente: {codigo_bloqueo}")
+        logger.info(f"Bloqueo actualizado exitosamente: {codigo_bloqueo} (versión {db_bloqueo.version})")
         return db_bloqueo
         
-    except BloqueoNotFoundError:
+    except (BloqueoNotFoundError, VersionConflictError):
         raise
     except IntegrityError as e:
         db.rollback()
@@ -285,4 +420,4 @@ def update_bloqueo(db: Session, codigo_bloqueo: str, bloqueo_update: BloqueoUpda
     except Exception as e:
         db.rollback()
         logger.error(f"Error inesperado al actualizar bloqueo: {str(e)}")
-        raise DatabaseError(f"Error inesperado al actualizar bloqueo: {str(e)}")
\ No newline at end of file
+        raise DatabaseError(f"Error inesperado al actualizar bloqueo: {str(e)}")
@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.models.estudiante import Estudiante
 from app.schemas.estudiante import EstudianteCreate, EstudianteUpdate
@@ -6,22 +8,43 @@ from app.auth import get_password_hash
 from app.exceptions import (
     EstudianteNotFoundError,
     EstudianteAlreadyExistsError,
+    VersionConflictError,
     DatabaseError,
     ValidationError
 )
-from app.config.logging import get_logger, log_function_call, log_execution_time
+from app.config.logging import get_logger, instrument
+from app.crud.versioning import versioned_update, get_current_version
+from app.cache import record_cache, cache_columns, load_cached
 
 logger = get_logger(__name__)
 
-@log_function_call
-@log_execution_time
-def get_estudiante(db: Session, registro_academico: str):
+# Columnas expuestas por EstudianteResponse, en el orden del esquema
+SCHEMA_COLUMNS = (
+    Estudiante.codigo_carrera,
+    Estudiante.registro_academico,
+    Estudiante.nombre,
+    Estudiante.apellido,
+    Estudiante.ci,
+    Estudiante.correo,
+    Estudiante.telefono,
+    Estudiante.direccion,
+    Estudiante.estado_academico,
+)
+
+SCHEMA_KEYS = tuple(column.key for column in SCHEMA_COLUMNS)
+
+# Columnas de la respuesta más la versión de la fila
+RESPONSE_COLUMNS = SCHEMA_COLUMNS + (Estudiante.version,)
+
+@instrument
+def get_estudiante(db: Session, registro_academico: str, fields: Optional[Sequence[str]] = None):
     """
     Obtiene un estudiante por su registro académico.
     
     Args:
         db: Sesión de base de datos
         registro_academico: Registro académico del estudiante
+        fields: Campos a cargar (load_only), o None para cargar todas las columnas no diferidas
         
     Returns:
         Estudiante encontrado o None
@@ -36,10 +59,22 @@ def get_estudiante(db: Session, registro_academico: str):
             logger.warning("Se proporcionó un registro académico vacío o nulo")
             raise ValidationError("El registro académico es requerido")
         
-        estudiante = db.query(Estudiante).filter(Estudiante.registro_academico == registro_academico).first()
+        cached = record_cache.get("estudiante", registro_academico)
+        if cached is not None:
+            logger.info(f"Estudiante encontrado en cache: {registro_academico}")
+            return load_cached(db, Estudiante, cached)
+        
+        query = db.query(Estudiante).filter(Estudiante.registro_academico == registro_academico)
+        if fields:
+            # Solo las columnas pedidas (más la versión para el ETag)
+            query = query.options(load_only(*fields, "version"))
+        estudiante = query.first()
         
         if estudiante:
             logger.info(f"Estudiante encontrado: {registro_academico}")
+            # Una instancia parcial no se guarda en cache
+            if not fields:
+                record_cache.set("estudiante", registro_academico, cache_columns(estudiante, RESPONSE_COLUMNS))
         else:
             logger.info(f"No se encontró estudiante con registro académico: {registro_academico}")
             
@@ -54,8 +89,45 @@ def get_estudiante(db: Session, registro_academico: str):
         logger.error(f"Error inesperado al buscar estudiante {registro_academico}: {str(e)}")
         raise DatabaseError(f"Error inesperado al buscar estudiante: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
+def get_estudiante_version(db: Session, registro_academico: str):
+    """
+    Obtiene la versión actual de un estudiante sin cargar la entidad completa.
+    
+    Args:
+        db: Sesión de base de datos
+        registro_academico: Registro académico del estudiante
+        
+    Returns:
+        Versión de la fila o None si el estudiante no existe
+        
+    Raises:
+        DatabaseError: Si ocurre un error de base de datos
+        ValidationError: Si el registro académico es inválido
+    """
+    try:
+        logger.debug(f"Consultando versión del estudiante: {registro_academico}")
+        
+        if not registro_academico or not registro_academico.strip():
+            logger.warning("Se proporcionó un registro académico vacío o nulo")
+            raise ValidationError("El registro académico es requerido")
+        
+        cached = record_cache.get("estudiante", registro_academico)
+        if cached is not None:
+            return cached["version"]
+        
+        return get_current_version(db, Estudiante, Estudiante.registro_academico, registro_academico)
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error de base de datos al consultar versión del estudiante {registro_academico}: {str(e)}")
+        raise DatabaseError(f"Error al consultar versión del estudiante: {str(e)}")
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al consultar versión del estudiante {registro_academico}: {str(e)}")
+        raise DatabaseError(f"Error inesperado al consultar versión del estudiante: {str(e)}")
+
+@instrument
 def get_estudiante_by_ci(db: Session, ci: str):
     """
     Obtiene un estudiante por su CI.
@@ -96,8 +168,7 @@ def get_estudiante_by_ci(db: Session, ci: str):
         logger.error(f"Error inesperado al buscar estudiante por CI {ci}: {str(e)}")
         raise DatabaseError(f"Error inesperado al buscar estudiante por CI: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
 def get_estudiantes(db: Session, skip: int = 0, limit: int = 100):
     """
     Obtiene una lista paginada de estudiantes.
@@ -139,8 +210,59 @@ def get_estudiantes(db: Session, skip: int = 0, limit: int = 100):
         logger.error(f"Error inesperado al obtener estudiantes: {str(e)}")
         raise DatabaseError(f"Error inesperado al obtener estudiantes: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
+def get_estudiantes_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None
+):
+    """
+    Obtiene una lista paginada de estudiantes como tuplas con las columnas de la respuesta.
+    
+    No hidrata instancias ORM ni carga columnas que la respuesta no expone;
+    pensada para serializarse directamente con render_rows.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Máximo número de registros a retornar
+        fields: Campos a seleccionar (en el orden de SCHEMA_KEYS), o None para todos
+        
+    Returns:
+        Lista de filas con las columnas de fields, o de SCHEMA_COLUMNS si no se indicó
+        
+    Raises:
+        DatabaseError: Si ocurre un error de base de datos
+        ValidationError: Si los parámetros de paginación son inválidos
+    """
+    try:
+        logger.info(f"Obteniendo filas de estudiantes con skip={skip}, limit={limit}")
+        
+        if skip < 0:
+            logger.warning(f"Valor de skip inválido: {skip}")
+            raise ValidationError("El valor de skip debe ser mayor o igual a 0")
+            
+        if limit < 1 or limit > 1000:
+            logger.warning(f"Valor de limit inválido: {limit}")
+            raise ValidationError("El valor de limit debe estar entre 1 y 1000")
+        
+        columns = [column for column in SCHEMA_COLUMNS if column.key in fields] if fields else SCHEMA_COLUMNS
+        rows = db.query(*columns).offset(skip).limit(limit).all()
+        
+        logger.info(f"Se obtuvieron {len(rows)} filas de estudiantes")
+        return rows
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error de base de datos al obtener filas de estudiantes: {str(e)}")
+        raise DatabaseError(f"Error al obtener estudiantes: {str(e)}")
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al obtener filas de estudiantes: {str(e)}")
+        raise DatabaseError(f"Error inesperado al obtener estudiantes: {str(e)}")
+
+@instrument
 def create_estudiante(db: Session, estudiante: EstudianteCreate):
     """
     Crea un nuevo estudiante.
@@ -181,6 +303,7 @@ def create_estudiante(db: Session, estudiante: EstudianteCreate):
         db.add(db_estudiante)
         db.commit()
         db.refresh(db_estudiante)
+        record_cache.invalidate("estudiante", estudiante.registro_academico)
         
         logger.info(f"Estudiante creado exitosamente: {estudiante.registro_academico}")
         return db_estudiante
@@ -206,38 +329,43 @@ def create_estudiante(db: Session, estudiante: EstudianteCreate):
         logger.error(f"Error inesperado al crear estudiante: {str(e)}")
         raise DatabaseError(f"Error inesperado al crear estudiante: {str(e)}")
 
-@log_function_call
-@log_execution_time
-def update_estudiante(db: Session, registro_academico: str, estudiante_update: EstudianteUpdate):
+@instrument
+def update_estudiante(
+    db: Session,
+    registro_academico: str,
+    estudiante_update: EstudianteUpdate,
+    expected_version: Optional[int] = None
+):
     """
     Actualiza un estudiante existente.
     
+    La actualización se hace con una sola sentencia UPDATE ... RETURNING que
+    incrementa la versión de la fila; si se indica expected_version, solo se
+    aplica cuando la versión actual coincide (concurrencia optimista).
+    
     Args:
         db: Sesión de base de datos
         registro_academico: Registro académico del estudiante a actualizar
         estudiante_update: Datos a actualizar
+        expected_version: Versión conocida por el cliente (If-Match) o None
         
     Returns:
-        Estudiante actualizado
+        Fila actualizada con las columnas de la respuesta y la nueva versión
         
     Raises:
         EstudianteNotFoundError: Si no se encuentra el estudiante
         EstudianteAlreadyExistsError: Si se intenta cambiar a un CI que ya existe
+        VersionConflictError: Si el estudiante fue modificado por otra petición
         DatabaseError: Si ocurre un error de base de datos
     """
     try:
         logger.info(f"Actualizando estudiante con registro académico: {registro_academico}")
         
-        db_estudiante = db.query(Estudiante).filter(Estudiante.registro_academico == registro_academico).first()
-        if not db_estudiante:
-            logger.warning(f"No se encontró estudiante para actualizar: {registro_academico}")
-            raise EstudianteNotFoundError(registro_academico=registro_academico)
-        
         update_data = estudiante_update.dict(exclude_unset=True)
         
         # Si se está actualizando el CI, verificar que no exista
         if "ci" in update_data and update_data["ci"]:
-            existing_ci = db.query(Estudiante).filter(
+            existing_ci = db.query(Estudiante.registro_academico).filter(
                 Estudiante.ci == update_data["ci"],
                 Estudiante.registro_academico != registro_academico
             ).first()
@@ -249,16 +377,29 @@ def update_estudiante(db: Session, registro_academico: str, estudiante_update: E
         if "contrasena" in update_data:
             update_data["contrasena"] = get_password_hash(update_data["contrasena"])
         
-        for field, value in update_data.items():
-            setattr(db_estudiante, field, value)
+        db_estudiante = versioned_update(
+            db, Estudiante, Estudiante.registro_academico, registro_academico,
+            update_data, expected_version, RESPONSE_COLUMNS
+        )
+        if db_estudiante is None:
+            current_version = get_current_version(db, Estudiante, Estudiante.registro_academico, registro_academico)
+            db.rollback()
+            if current_version is None:
+                logger.warning(f"No se encontró estudiante para actualizar: {registro_academico}")
+                raise EstudianteNotFoundError(registro_academico=registro_academico)
+            logger.warning(
+                f"Conflicto de versión al actualizar estudiante {registro_academico}: "
+                f"esperada={expected_version}, actual={current_version}"
+            )
+            raise VersionConflictError("estudiante", registro_academico, expected_version, current_version)
         
         db.commit()
-        db.refresh(db_estudiante)
+        record_cache.invalidate("estudiante", registro_academico)
         
-        logger.info(f"Estudiante actualizado exitosamente: {registro_academico}")
+        logger.info(f"Estudiante actualizado exitosamente: {registro_academico} (versión {db_estudiante.version})")
         return db_estudiante
         
-    except EstudianteNotFoundError:
+    except (EstudianteNotFoundError, VersionConflictError):
         raise
     except EstudianteAlreadyExistsError:
         db.rollback()
@@ -279,8 +420,7 @@ def update_estudiante(db: Session, registro_academico: str, estudiante_update: E
         logger.error(f"Error inesperado al actualizar estudiante: {str(e)}")
         raise DatabaseError(f"Error inesperado al actualizar estudiante: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
 def delete_estudiante(db: Session, registro_academico: str):
     """
     Elimina un estudiante.
@@ -294,6 +434,7 @@ def delete_estudiante(db: Session, registro_academico: str):
         
     Raises:
         EstudianteNotFoundError: Si no se encuentra el estudiante
+        VersionConflictError: Si el estudiante fue modificado durante la eliminación
         DatabaseError: Si ocurre un error de base de datos
     """
     try:
@@ -306,12 +447,17 @@ def delete_estudiante(db: Session, registro_academico: str):
         
         db.delete(db_estudiante)
         db.commit()
+        record_cache.invalidate("estudiante", registro_academico)
         
         logger.info(f"Estudiante eliminado exitosamente: {registro_academico}")
         return db_estudiante
         
     except EstudianteNotFoundError:
         raise
+    except StaleDataError:
+        db.rollback()
+        logger.warning(f"Estudiante modificado concurrentemente durante la eliminación: {registro_academico}")
+        raise VersionConflictError("estudiante", registro_academico)
     except SQLAlchemyError as e:
         db.rollback()
         logger.error(f"Error de base de datos al eliminar estudiante: {str(e)}")
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.models.pago import Pago
 from app.models.estudiante import Estudiante
@@ -9,12 +10,26 @@ from app.exceptions import (
     DatabaseError,
     ValidationError
 )
-from app.config.logging import get_logger, log_function_call, log_execution_time
+from app.config.logging import get_logger, instrument
+from app.cache import record_cache, cache_columns, load_cached
 
 logger = get_logger(__name__)
 
-@log_function_call
-@log_execution_time
+# Columnas expuestas por PagoResponse, en el orden del esquema
+SCHEMA_COLUMNS = (
+    Pago.registro_academico,
+    Pago.descripcion,
+    Pago.monto,
+    Pago.fecha_pago,
+    Pago.codigo_pago,
+)
+
+SCHEMA_KEYS = tuple(column.key for column in SCHEMA_COLUMNS)
+
+# Columnas de la respuesta más la versión de la fila
+RESPONSE_COLUMNS = SCHEMA_COLUMNS + (Pago.version,)
+
+@instrument
 def generate_codigo_pago(db: Session):
     """
     Genera un código único para el pago.
@@ -52,15 +67,15 @@ def generate_codigo_pago(db: Session):
         logger.error(f"Error inesperado al generar código de pago: {str(e)}")
         raise DatabaseError(f"Error inesperado al generar código de pago: {str(e)}")
 
-@log_function_call
-@log_execution_time
-def get_pago(db: Session, codigo_pago: str):
+@instrument
+def get_pago(db: Session, codigo_pago: str, fields: Optional[Sequence[str]] = None):
     """
     Obtiene un pago por su código.
     
     Args:
         db: Sesión de base de datos
         codigo_pago: Código del pago
+        fields: Campos a cargar (load_only), o None para cargar todas las columnas no diferidas
         
     Returns:
         Pago encontrado o None
@@ -76,10 +91,22 @@ def get_pago(db: Session, codigo_pago: str):
             logger.warning("Se proporcionó un código de pago vacío o nulo")
             raise ValidationError("El código de pago es requerido")
         
-        pago = db.query(Pago).filter(Pago.codigo_pago == codigo_pago).first()
+        cached = record_cache.get("pago", codigo_pago)
+        if cached is not None:
+            logger.info(f"Pago encontrado en cache: {codigo_pago}")
+            return load_cached(db, Pago, cached)
+        
+        query = db.query(Pago).filter(Pago.codigo_pago == codigo_pago)
+        if fields:
+            # Solo las columnas pedidas (más el estudiante dueño y la versión, necesarios para permisos y ETag)
+            query = query.options(load_only(*fields, "registro_academico", "version"))
+        pago = query.first()
         
         if pago:
             logger.info(f"Pago encontrado: {codigo_pago}")
+            # Una instancia parcial no se guarda en cache
+            if not fields:
+                record_cache.set("pago", codigo_pago, cache_columns(pago, RESPONSE_COLUMNS))
         else:
             logger.info(f"No se encontró pago con código: {codigo_pago}")
             
@@ -94,8 +121,49 @@ def get_pago(db: Session, codigo_pago: str):
         logger.error(f"Error inesperado al buscar pago {codigo_pago}: {str(e)}")
         raise DatabaseError(f"Error inesperado al buscar pago: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
+def get_pago_version(db: Session, codigo_pago: str):
+    """
+    Obtiene el propietario y la versión actual de un pago sin cargar la entidad completa.
+    
+    Args:
+        db: Sesión de base de datos
+        codigo_pago: Código del pago
+        
+    Returns:
+        Tupla (registro_academico, versión) o None si el pago no existe
+        
+    Raises:
+        DatabaseError: Si ocurre un error de base de datos
+        ValidationError: Si el código de pago es inválido
+    """
+    try:
+        logger.debug(f"Consultando versión del pago: {codigo_pago}")
+        
+        if not codigo_pago or not codigo_pago.strip():
+            logger.warning("Se proporcionó un código de pago vacío o nulo")
+            raise ValidationError("El código de pago es requerido")
+        
+        cached = record_cache.get("pago", codigo_pago)
+        if cached is not None:
+            return cached["registro_academico"], cached["version"]
+        
+        row = db.query(Pago.registro_academico, Pago.version).filter(Pago.codigo_pago == codigo_pago).first()
+        if row is None:
+            return None
+        
+        return row.registro_academico, row.version
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error de base de datos al consultar versión del pago {codigo_pago}: {str(e)}")
+        raise DatabaseError(f"Error al consultar versión del pago: {str(e)}")
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al consultar versión del pago {codigo_pago}: {str(e)}")
+        raise DatabaseError(f"Error inesperado al consultar versión del pago: {str(e)}")
+
+@instrument
 def get_pagos_by_estudiante(db: Session, registro_academico: str):
     """
     Obtiene todos los pagos de un estudiante.
@@ -132,8 +200,7 @@ def get_pagos_by_estudiante(db: Session, registro_academico: str):
         logger.error(f"Error inesperado al obtener pagos del estudiante {registro_academico}: {str(e)}")
         raise DatabaseError(f"Error inesperado al obtener pagos del estudiante: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
 def get_pagos(db: Session, skip: int = 0, limit: int = 100):
     """
     Obtiene una lista paginada de pagos.
@@ -175,8 +242,59 @@ def get_pagos(db: Session, skip: int = 0, limit: int = 100):
         logger.error(f"Error inesperado al obtener pagos: {str(e)}")
         raise DatabaseError(f"Error inesperado al obtener pagos: {str(e)}")
 
-@log_function_call
-@log_execution_time
+@instrument
+def get_pagos_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None
+):
+    """
+    Obtiene una lista paginada de pagos como tuplas con las columnas de la respuesta.
+    
+    No hidrata instancias ORM ni carga columnas que la respuesta no expone;
+    pensada para serializarse directamente con render_rows.
+    
+    Args:
+        db: Sesión de base de datos
+        skip: Número de registros a omitir
+        limit: Máximo número de registros a retornar
+        fields: Campos a seleccionar (en el orden de SCHEMA_KEYS), o None para todos
+        
+    Returns:
+        Lista de filas con las columnas de fields, o de SCHEMA_COLUMNS si no se indicó
+        
+    Raises:
+        DatabaseError: Si ocurre un error de base de datos
+        ValidationError: Si los parámetros de paginación son inválidos
+    """
+    try:
+        logger.info(f"Obteniendo filas de pagos con skip={skip}, limit={limit}")
+        
+        if skip < 0:
+            logger.warning(f"Valor de skip inválido: {skip}")
+            raise ValidationError("El valor de skip debe ser mayor o igual a 0")
+            
+        if limit < 1 or limit > 1000:
+            logger.warning(f"Valor de limit inválido: {limit}")
+            raise ValidationError("El valor de limit debe estar entre 1 y 1000")
+        
+        columns = [column for column in SCHEMA_COLUMNS if column.key in fields] if fields else SCHEMA_COLUMNS
+        rows = db.query(*columns).offset(skip).limit(limit).all()
+        
+        logger.info(f"Se obtuvieron {len(rows)} filas de pagos")
+        return rows
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error de base de datos al obtener filas de pagos: {str(e)}")
+        raise DatabaseError(f"Error al obtener pagos: {str(e)}")
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado al obtener filas de pagos: {str(e)}")
+        raise DatabaseError(f"Error inesperado al obtener pagos: {str(e)}")
+
+@instrument
 def create_pago(db: Session, pago: PagoCreate):
     """
     Crea un nuevo pago.
@@ -210,6 +328,7 @@ def create_pago(db: Session, pago: PagoCreate):
         db.add(db_pago)
         db.commit()
         db.refresh(db_pago)
+        record_cache.invalidate("pago", db_pago.codigo_pago)
         
         logger.info(f"Pago creado exitosamente: {db_pago.codigo_pago}")
         return db_pago
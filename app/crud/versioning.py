@@ -0,0 +1,67 @@
+"""
+Actualizaciones con control de concurrencia optimista basado en la columna version.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy.orm import Session
+
+
+def versioned_update(
+    db: Session,
+    model,
+    key_column,
+    key: str,
+    values: Dict[str, Any],
+    expected_version: Optional[int],
+    columns: Sequence
+):
+    """
+    Actualiza una fila con una sola sentencia e incrementa su versión.
+
+    Ejecuta ``UPDATE ... SET version = version + 1 WHERE key = :key
+    [AND version = :expected] RETURNING columns`` sin cargar la entidad.
+
+    Args:
+        db: Sesión de base de datos
+        model: Modelo SQLAlchemy con columna version
+        key_column: Columna de la clave primaria
+        key: Valor de la clave primaria
+        values: Columnas a actualizar
+        expected_version: Versión esperada (If-Match) o None para no verificarla
+        columns: Columnas a retornar
+
+    Returns:
+        Fila actualizada, o None si ninguna fila cumplió la condición
+    """
+    stmt = (
+        model.__table__.update()
+        .where(key_column == key)
+        .values(**values, version=model.version + 1)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(model.version == expected_version)
+
+    if db.get_bind().dialect.full_returning:
+        return db.execute(stmt.returning(*columns)).first()
+
+    # Motores sin UPDATE ... RETURNING (por ejemplo SQLite con SQLAlchemy 1.4)
+    result = db.execute(stmt)
+    if not result.rowcount:
+        return None
+    return db.query(*columns).filter(key_column == key).first()
+
+
+def get_current_version(db: Session, model, key_column, key: str) -> Optional[int]:
+    """
+    Obtiene la versión actual de una fila.
+
+    Args:
+        db: Sesión de base de datos
+        model: Modelo SQLAlchemy con columna version
+        key_column: Columna de la clave primaria
+        key: Valor de la clave primaria
+
+    Returns:
+        Versión actual o None si la fila no existe
+    """
+    return db.query(model.version).filter(key_column == key).scalar()
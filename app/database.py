@@ -1,20 +1,75 @@
 from sqlalchemy import create_engine, Column, String, Integer, DateTime, DECIMAL, Boolean, Date
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from sqlalchemy.pool import QueuePool
+import time
+from app.config.settings import get_settings
+from app.metrics import metrics
+from app.query_stats import instrument_engine
+from app.slow_queries import slow_query_recorder
 
-load_dotenv()
+DATABASE_URL = get_settings().database_url
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+_checkout_wait = metrics.histogram(
+    "db_pool_checkout_seconds",
+    help="Espera para obtener una conexión del pool (incluye abrir conexiones nuevas)"
+)
+_checkout_timeouts = metrics.counter(
+    "db_pool_checkout_timeouts_total",
+    help="Esperas de conexión que superaron pool_timeout"
+)
 
-engine = create_engine(DATABASE_URL)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que registra cuánto espera cada checkout."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            _checkout_timeouts.inc()
+            raise
+        finally:
+            _checkout_wait.observe(time.perf_counter() - start)
+
+
+def _engine_options(url: str) -> dict:
+    # SQLite usa sus propios pools (SingletonThreadPool / NullPool)
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {"poolclass": InstrumentedQueuePool}
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+# Conteo y tiempo de sentencias por request (Server-Timing, advertencia de N+1)
+instrument_engine(engine)
+# Consultas lentas a database.log, con EXPLAIN en PostgreSQL
+slow_query_recorder.attach(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def _pool_samples():
+    """Estado del pool, leído al consultar /metrics."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return []
+    return [
+        ("db_pool_size", "gauge", "Tamaño configurado del pool", {}, pool.size()),
+        ("db_pool_connections", "gauge", "Conexiones del pool por estado", {"state": "checked_out"}, pool.checkedout()),
+        ("db_pool_connections", "gauge", "Conexiones del pool por estado", {"state": "idle"}, pool.checkedin()),
+        ("db_pool_overflow", "gauge", "Conexiones abiertas por encima del tamaño del pool", {}, max(pool.overflow(), 0)),
+    ]
+
+
+metrics.register_collector(_pool_samples)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,120 @@
+"""
+Utilidades para peticiones condicionales (ETag / If-None-Match).
+"""
+
+import hashlib
+from typing import Optional, Sequence
+from fastapi import Response, status
+from app.exceptions import PreconditionFailedError
+
+# Las respuestas se pueden guardar, pero el cliente debe revalidarlas con el ETag
+CACHE_CONTROL_PUBLIC = "no-cache"
+# Recursos del usuario autenticado: no deben guardarse en caches compartidas
+CACHE_CONTROL_PRIVATE = "private, no-cache"
+
+
+def make_etag(version: int, fields: Optional[Sequence[str]] = None) -> str:
+    """
+    Construye el valor del header ETag para una versión de fila.
+
+    Cuando la respuesta es un subconjunto de campos (``?fields=``) el ETag
+    incluye un resumen de esos campos, ya que cada subconjunto es una
+    representación distinta del mismo recurso.
+
+    Args:
+        version: Valor de la columna version de la fila
+        fields: Campos incluidos en la respuesta, o None para la representación completa
+
+    Returns:
+        ETag fuerte entre comillas
+    """
+    if fields:
+        digest = hashlib.blake2b(",".join(fields).encode("utf-8"), digest_size=4).hexdigest()
+        return f'"{version}-{digest}"'
+    return f'"{version}"'
+
+
+def etag_matches(header_value: Optional[str], etag: str) -> bool:
+    """
+    Compara un header If-None-Match con el ETag actual (comparación débil).
+
+    Args:
+        header_value: Valor del header enviado por el cliente
+        etag: ETag actual del recurso
+
+    Returns:
+        True si alguno de los ETags del header coincide
+    """
+    if not header_value:
+        return False
+    if header_value.strip() == "*":
+        return True
+
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def parse_if_match(header_value: Optional[str]) -> Optional[int]:
+    """
+    Obtiene la versión esperada a partir de un header If-Match.
+
+    Args:
+        header_value: Valor del header enviado por el cliente
+
+    Returns:
+        Versión esperada, o None si no se envió el header o se envió "*"
+
+    Raises:
+        PreconditionFailedError: Si el header no corresponde a un ETag de versión
+    """
+    if header_value is None or header_value.strip() == "*":
+        return None
+
+    value = header_value.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        # La versión es la parte previa al resumen de campos, si lo hay
+        return int(value.strip('"').split("-", 1)[0])
+    except ValueError:
+        raise PreconditionFailedError(
+            message="El header If-Match no corresponde a una versión válida",
+            error_code="INVALID_IF_MATCH",
+            details={"if_match": header_value}
+        )
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    """
+    Agrega los headers ETag y Cache-Control a una respuesta.
+
+    Args:
+        response: Respuesta a modificar
+        etag: ETag del recurso
+        cache_control: Valor del header Cache-Control
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """
+    Construye una respuesta 304 sin cuerpo.
+
+    Args:
+        etag: ETag del recurso
+        cache_control: Valor del header Cache-Control
+
+    Returns:
+        Respuesta 304 Not Modified
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
@@ -51,6 +51,11 @@ class DatabaseError(BaseCustomException):
     pass
 
 
+class PreconditionFailedError(BaseCustomException):
+    """Excepción para precondiciones HTTP no cumplidas (If-Match)."""
+    pass
+
+
 # Excepciones específicas del dominio
 
 class EstudianteNotFoundError(NotFoundError):
@@ -134,6 +139,23 @@ class BloqueoNotFoundError(NotFoundError):
         )
 
 
+class VersionConflictError(PreconditionFailedError):
+    """Excepción cuando el recurso fue modificado por otra petición."""
+    
+    def __init__(self, resource: str, identifier: str, expected_version: Optional[int] = None, current_version: Optional[int] = None):
+        message = f"El recurso {resource} {identifier} fue modificado por otra petición"
+        super().__init__(
+            message=message,
+            error_code="VERSION_CONFLICT",
+            details={
+                "resource": resource,
+                "id": identifier,
+                "expected_version": expected_version,
+                "current_version": current_version
+            }
+        )
+
+
 class InsufficientPermissionsError(AuthorizationError):
     """Excepción para permisos insuficientes."""
     
@@ -179,6 +201,21 @@ class InvalidTokenError(AuthenticationError):
         )
 
 
+class SchemaVersionError(DatabaseError):
+    """Excepción cuando la base no tiene todas las migraciones que requiere el código."""
+
+    def __init__(self, current_version: int, required_version: int):
+        message = (
+            f"La base está en la versión de esquema {current_version} y este código requiere la "
+            f"{required_version}: ejecute python -m app.migrations upgrade"
+        )
+        super().__init__(
+            message=message,
+            error_code="SCHEMA_OUTDATED",
+            details={"current_version": current_version, "required_version": required_version}
+        )
+
+
 def map_exception_to_http(exception: BaseCustomException) -> HTTPException:
     """
     Mapea excepciones personalizadas a HTTPException de FastAPI.
@@ -196,6 +233,7 @@ def map_exception_to_http(exception: BaseCustomException) -> HTTPException:
         AuthenticationError: status.HTTP_401_UNAUTHORIZED,
         AuthorizationError: status.HTTP_403_FORBIDDEN,
         DatabaseError: status.HTTP_500_INTERNAL_SERVER_ERROR,
+        PreconditionFailedError: status.HTTP_412_PRECONDITION_FAILED,
         
         # Excepciones específicas del dominio
         EstudianteNotFoundError: status.HTTP_404_NOT_FOUND,
@@ -203,6 +241,7 @@ def map_exception_to_http(exception: BaseCustomException) -> HTTPException:
         PagoNotFoundError: status.HTTP_404_NOT_FOUND,
         PagoAlreadyExistsError: status.HTTP_409_CONFLICT,
         BloqueoNotFoundError: status.HTTP_404_NOT_FOUND,
+        VersionConflictError: status.HTTP_412_PRECONDITION_FAILED,
         InsufficientPermissionsError: status.HTTP_403_FORBIDDEN,
         InvalidCredentialsError: status.HTTP_401_UNAUTHORIZED,
         TokenExpiredError: status.HTTP_401_UNAUTHORIZED,
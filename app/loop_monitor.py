@@ -0,0 +1,146 @@
+"""
+Monitor del loop de eventos.
+
+Una tarea del loop duerme LOOP_LAG_INTERVAL_MS y mide cuánto tarde despierta:
+ese retraso (lag) va al histograma ``event_loop_lag_seconds``. Un hilo
+vigilante revisa el último latido de la tarea; si el loop lleva más de
+LOOP_BLOCK_THRESHOLD_MS sin atenderla, toma la pila del hilo del loop en ese
+momento (el código que lo está bloqueando, típicamente trabajo síncrono en un
+``async def``) y la escribe como WARNING.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.metrics import metrics
+
+logger = get_logger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_STACK_FRAMES = 40
+
+
+class LoopMonitor:
+    """
+    Mide el lag del loop de eventos y captura la pila cuando se bloquea.
+
+    Args:
+        interval: Segundos entre latidos de la tarea de medición
+        threshold: Segundos sin latido a partir de los cuales el loop se considera bloqueado
+        max_events: Bloqueos recientes que se conservan
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, max_events: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._current_event: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._lag = metrics.histogram(
+            "event_loop_lag_seconds", buckets=LAG_BUCKETS,
+            help="Retraso del loop de eventos en atender una tarea programada"
+        )
+        self._blocked_total = metrics.counter(
+            "event_loop_blocked_total", help="Veces que el loop estuvo bloqueado más de LOOP_BLOCK_THRESHOLD_MS"
+        )
+
+    def start(self) -> None:
+        """Inicia la medición; debe llamarse desde el loop (por ejemplo, en el evento startup)."""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Detiene la medición; se puede llamar desde cualquier hilo."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.get_loop().call_soon_threadsafe(self._task.cancel)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._lag.observe(lag)
+            self._heartbeat = now
+
+            event = self._current_event
+            if event is not None:
+                # El bloqueo que detectó el vigilante terminó: registrar su duración total
+                self._current_event = None
+                event["duration_ms"] = round(lag * 1000, 1)
+                logger.warning(f"Loop de eventos desbloqueado tras {lag * 1000:.0f} ms")
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.threshold / 2)
+        reported_heartbeat = None
+        while not self._stop.wait(check_every):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self._report(blocked_for)
+
+    def _report(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-MAX_STACK_FRAMES:] if frame is not None else []
+        event = {
+            "detected_at": time.time(),
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "duration_ms": None,
+            "stack": [line.rstrip() for line in stack],
+        }
+        self.events.append(event)
+        self._current_event = event
+        self._blocked_total.inc()
+        logger.warning(
+            f"Loop de eventos bloqueado hace {blocked_for * 1000:.0f} ms; pila del hilo del loop:\n{''.join(stack)}"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Lag del loop (percentiles del histograma) y bloqueos recientes."""
+        return {
+            "pid": os.getpid(),
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "lag_p50_ms": _ms(self._lag.quantile(0.5)),
+            "lag_p99_ms": _ms(self._lag.quantile(0.99)),
+            "blocked_total": int(self._blocked_total.value),
+            "recent_blocks": list(self.events),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+loop_monitor = (
+    LoopMonitor(
+        interval=get_settings().loop_lag_interval_ms / 1000,
+        threshold=get_settings().loop_block_threshold_ms / 1000
+    )
+    if get_settings().loop_monitor_enabled else None
+)
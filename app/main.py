@@ -1,15 +1,31 @@
+import os
+import time
+
+# Inicio de la importación de la aplicación (ver app_startup_seconds)
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
 from fastapi.exceptions import RequestValidationError
-from app.routers import auth, estudiantes, pagos, bloqueos
-from app.database import engine, Base
+from app.routers import auth, estudiantes, pagos, bloqueos, admin
+from app.database import engine
 from app.middleware import (
     configure_middleware,
     validation_exception_handler,
     http_exception_handler
 )
 from app.config.logging import get_logger
+from app.config.log_control import log_control
+from app.cache import record_cache
+from app.metrics import metrics, multiprocess_store, render_metrics
+from app.profiling import continuous_profiler
+from app.memory import memory_profiler
+from app.loop_monitor import loop_monitor
+from app.migrations import check_schema_version, upgrade
+from app.config.settings import get_settings
 import logging
 
 # Import all models to ensure they are registered with SQLAlchemy
@@ -18,14 +34,18 @@ from app.models import estudiante, pago, bloqueo
 # Configurar logging antes de hacer cualquier cosa
 logger = get_logger(__name__)
 
-# Crear las tablas en la base de datos (solo las que no existen)
-try:
-    logger.info("Creando tablas de base de datos...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Tablas de base de datos creadas exitosamente")
-except Exception as e:
-    logger.error(f"Error al crear tablas de base de datos: {str(e)}", exc_info=True)
-    raise
+# Las tablas las crean las migraciones (python -m app.migrations upgrade), no cada
+# worker al importar; al arrancar solo se verifica la versión del esquema
+AUTO_MIGRATE = get_settings().db_auto_migrate
+
+_startup_seconds = {
+    phase: metrics.histogram(
+        "app_startup_seconds",
+        help="Duración del arranque de cada worker por fase (importación de la app y evento startup)",
+        phase=phase
+    )
+    for phase in ("import", "startup")
+}
 
 app = FastAPI(
     title="Microservicio Estudiantil",
@@ -60,6 +80,7 @@ app.include_router(auth.router)
 app.include_router(estudiantes.router)
 app.include_router(pagos.router)
 app.include_router(bloqueos.router)
+app.include_router(admin.router)
 
 logger.info("Routers incluidos exitosamente")
 
@@ -91,17 +112,87 @@ def health_check():
     }
 
 
-@app.on_event("startup")
-async def startup_event():
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics_endpoint():
     """
-    Evento que se ejecuta al iniciar la aplicación.
+    Métricas en formato de texto de Prometheus.
+    
+    Con METRICS_MULTIPROC_DIR configurado suma los valores de todos los workers.
+    
+    Returns:
+        Latencias y requests por ruta, requests en curso, tamaños de respuesta,
+        estado del pool de base de datos, tiempos de bcrypt, cache y logging
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def _prepare_worker() -> int:
+    """
+    Trabajo bloqueante del arranque: migraciones, verificación del esquema e
+    hilos de fondo. Corre en el threadpool, fuera del loop de eventos.
+
+    Returns:
+        Versión del esquema de la base
     """
+    if AUTO_MIGRATE:
+        applied = upgrade(engine)
+        if applied:
+            logger.info(f"Migraciones aplicadas al arrancar: {applied}")
+    # Si faltan migraciones el worker no arranca (SchemaVersionError)
+    schema_version = check_schema_version(engine)
     logger.info("=== MICROSERVICIO ESTUDIANTIL INICIADO ===")
     logger.info("Versión: 1.0.0")
     logger.info("Configuración de logging: ACTIVA")
     logger.info("Middleware de excepciones: ACTIVO")
     logger.info("Sistema de trazabilidad: ACTIVO")
+    logger.info(f"Cache de registros: {'ACTIVA' if record_cache.enabled else 'INACTIVA'} (L2: {'SI' if record_cache.l2 is not None else 'NO'})")
     logger.info("==========================================")
+    record_cache.start()
+    log_control.start()
+    if multiprocess_store is not None:
+        multiprocess_store.start()
+    if continuous_profiler is not None:
+        continuous_profiler.start()
+    memory_profiler.start()
+    return schema_version
+
+
+def _release_worker() -> None:
+    """Detiene los hilos de fondo (esperando a que terminen); corre en el threadpool."""
+    logger.info("=== MICROSERVICIO ESTUDIANTIL DETENIDO ===")
+    logger.info("Cerrando conexiones y limpiando recursos...")
+    record_cache.stop()
+    log_control.stop()
+    if multiprocess_store is not None:
+        multiprocess_store.stop()
+    if continuous_profiler is not None:
+        continuous_profiler.stop()
+    memory_profiler.stop()
+    if loop_monitor is not None:
+        loop_monitor.stop()
+    logger.info("===========================================")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Evento que se ejecuta al iniciar la aplicación.
+
+    Starlette ejecuta en el loop incluso los handlers síncronos: el trabajo
+    bloqueante va al threadpool, y el monitor del loop arranca antes para
+    medir también el arranque.
+    """
+    started = time.perf_counter()
+    if loop_monitor is not None:
+        loop_monitor.start()
+    schema_version = await run_in_threadpool(_prepare_worker)
+    startup_seconds = time.perf_counter() - started
+    _startup_seconds["import"].observe(_import_seconds)
+    _startup_seconds["startup"].observe(startup_seconds)
+    logger.info(
+        f"Worker {os.getpid()} listo: importación {_import_seconds * 1000:.0f} ms, "
+        f"arranque {startup_seconds * 1000:.0f} ms (esquema versión {schema_version})"
+    )
 
 
 @app.on_event("shutdown")
@@ -109,6 +200,8 @@ async def shutdown_event():
     """
     Evento que se ejecuta al cerrar la aplicación.
     """
-    logger.info("=== MICROSERVICIO ESTUDIANTIL DETENIDO ===")
-    logger.info("Cerrando conexiones y limpiando recursos...")
-    logger.info("===========================================")
\ No newline at end of file
+    await run_in_threadpool(_release_worker)
+
+
+# Con el lanzador (app/server.py) la importación ocurre una sola vez, antes del fork
+_import_seconds = time.perf_counter() - _import_started
@@ -0,0 +1,319 @@
+"""
+Diagnóstico de memoria por worker.
+
+- Un hilo de fondo registra cada MEMORY_SAMPLE_INTERVAL segundos el RSS del
+  proceso y las estadísticas del recolector de basura (colecciones, objetos
+  recolectados y pausas por generación), con un historial acotado.
+- ``tracemalloc`` se activa y desactiva en caliente; con él activo se toman
+  snapshots con nombre y se comparan, agrupando las diferencias por la línea
+  de ``app/`` más cercana a la asignación (así una asignación dentro de
+  SQLAlchemy o de logging se atribuye a la línea de la aplicación que la
+  provocó).
+
+Cada worker responde solo por sí mismo: con varios workers, los datos de
+``/admin/memory`` son los del worker que atendió el request (campo pid).
+"""
+
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.exceptions import NotFoundError, ValidationError
+from app.metrics import metrics
+
+logger = get_logger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+OUTSIDE_APP = "(fuera de app/)"
+
+
+def read_rss() -> int:
+    """RSS actual del proceso en bytes (en sistemas sin /proc, el máximo alcanzado)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _app_location(traceback: tracemalloc.Traceback) -> Tuple[str, int]:
+    """Línea de app/ más cercana a la asignación (los marcos van del más antiguo al más reciente)."""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(APP_DIR):
+            return frame.filename[len(PROJECT_DIR):], frame.lineno
+    return OUTSIDE_APP, 0
+
+
+class MemoryProfiler:
+    """
+    Historial de RSS y GC, y snapshots de tracemalloc con nombre.
+
+    Args:
+        frames: Marcos que guarda tracemalloc por asignación
+        max_snapshots: Snapshots que se conservan (se descarta el más antiguo)
+        history_size: Muestras de RSS/GC que se conservan
+        sample_interval: Segundos entre muestras de RSS/GC (0 = sin hilo de fondo)
+    """
+
+    def __init__(self, frames: int = 30, max_snapshots: int = 5, history_size: int = 1440, sample_interval: float = 60.0):
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self.sample_interval = sample_interval
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._snapshots: "OrderedDict[str, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Pausas del GC por generación: [segundos acumulados, máximo]
+        self._gc_pauses: List[List[float]] = [[0.0, 0.0] for _ in range(3)]
+        self._gc_started: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Empieza a medir las pausas del GC y a muestrear RSS/GC en segundo plano."""
+        if self._gc_callback not in gc.callbacks:
+            gc.callbacks.append(self._gc_callback)
+        if self.sample_interval <= 0:
+            return
+        self._stop.clear()
+        self.history.append(self.sample())
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            try:
+                self.history.append(self.sample())
+            except Exception as e:
+                logger.warning(f"No se pudo muestrear la memoria: {str(e)}")
+
+    def _gc_callback(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_started = None
+            totals = self._gc_pauses[info["generation"]]
+            totals[0] += pause
+            totals[1] = max(totals[1], pause)
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Estado actual de la memoria del worker.
+
+        Returns:
+            RSS, memoria trazada por tracemalloc (si está activo) y, por
+            generación del GC, objetos pendientes, colecciones, objetos
+            recolectados e incobrables, y pausas acumulada y máxima
+        """
+        stats = gc.get_stats()
+        counts = gc.get_count()
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        return {
+            "timestamp": time.time(),
+            "rss_bytes": read_rss(),
+            "traced_bytes": traced,
+            "gc": [
+                {
+                    "generation": generation,
+                    "pending": counts[generation],
+                    "collections": stats[generation]["collections"],
+                    "collected": stats[generation]["collected"],
+                    "uncollectable": stats[generation]["uncollectable"],
+                    "pause_total_ms": round(self._gc_pauses[generation][0] * 1000, 3),
+                    "pause_max_ms": round(self._gc_pauses[generation][1] * 1000, 3),
+                }
+                for generation in range(len(stats))
+            ],
+        }
+
+    def status(self, history: int = 60) -> Dict[str, Any]:
+        """
+        Estado de la memoria de este worker.
+
+        Args:
+            history: Cantidad de muestras recientes del historial a incluir
+        """
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "current": self.sample(),
+            "history": list(self.history)[-history:] if history > 0 else [],
+            "tracing": {
+                "enabled": tracing,
+                "frames": tracemalloc.get_traceback_limit() if tracing else None,
+                "traced_bytes": current,
+                "peak_bytes": peak,
+                "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            },
+            "snapshots": self.list_snapshots(),
+        }
+
+    def start_tracing(self, frames: Optional[int] = None) -> None:
+        """
+        Activa tracemalloc (si ya estaba activo no hace nada).
+
+        Args:
+            frames: Marcos por asignación; más marcos atribuyen mejor pero cuestan más
+        """
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(frames or self.frames)
+        logger.warning(f"tracemalloc activado en el worker {os.getpid()} ({frames or self.frames} marcos)")
+
+    def stop_tracing(self) -> None:
+        """Desactiva tracemalloc y descarta los snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.warning(f"tracemalloc desactivado en el worker {os.getpid()}")
+
+    def take_snapshot(self, name: str) -> Dict[str, Any]:
+        """
+        Toma un snapshot con nombre (reemplaza uno anterior con el mismo nombre).
+
+        Raises:
+            ValidationError: Si tracemalloc no está activo
+        """
+        if not tracemalloc.is_tracing():
+            raise ValidationError(
+                "tracemalloc no está activo en este worker",
+                error_code="TRACEMALLOC_NOT_RUNNING"
+            )
+        snapshot = tracemalloc.take_snapshot()
+        taken_at = time.time()
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = (taken_at, snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return self._snapshot_info(name, taken_at, snapshot)
+
+    def delete_snapshot(self, name: str) -> None:
+        """
+        Raises:
+            NotFoundError: Si el snapshot no existe
+        """
+        with self._lock:
+            if self._snapshots.pop(name, None) is None:
+                raise NotFoundError(f"Snapshot {name} no encontrado", error_code="SNAPSHOT_NOT_FOUND")
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._snapshots.items())
+        return [self._snapshot_info(name, taken_at, snapshot) for name, (taken_at, snapshot) in items]
+
+    @staticmethod
+    def _snapshot_info(name: str, taken_at: float, snapshot: tracemalloc.Snapshot) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "taken_at": taken_at,
+            "traces": len(snapshot.traces),
+            "size_bytes": sum(trace.size for trace in snapshot.traces),
+        }
+
+    def _get_snapshot(self, name: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self._snapshots.get(name)
+        if entry is None:
+            raise NotFoundError(f"Snapshot {name} no encontrado", error_code="SNAPSHOT_NOT_FOUND")
+        return entry[1]
+
+    def diff(self, base: str, target: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        Diferencias de asignaciones entre dos snapshots, agrupadas por línea de app/.
+
+        Args:
+            base: Snapshot de referencia
+            target: Snapshot a comparar (None = el estado actual, sin guardarlo)
+            limit: Cantidad de líneas a retornar, de mayor a menor crecimiento
+
+        Returns:
+            Crecimiento total y, por archivo:línea, diferencia de bytes y de
+            bloques junto con los valores actuales
+
+        Raises:
+            NotFoundError: Si algún snapshot no existe
+            ValidationError: Si se compara contra el estado actual sin tracemalloc activo
+        """
+        old = self._get_snapshot(base)
+        if target is not None:
+            new = self._get_snapshot(target)
+        elif tracemalloc.is_tracing():
+            new = tracemalloc.take_snapshot()
+        else:
+            raise ValidationError(
+                "tracemalloc no está activo en este worker",
+                error_code="TRACEMALLOC_NOT_RUNNING"
+            )
+
+        grouped: Dict[Tuple[str, int], List[int]] = {}
+        for stat in new.compare_to(old, "traceback"):
+            totals = grouped.setdefault(_app_location(stat.traceback), [0, 0, 0, 0])
+            totals[0] += stat.size_diff
+            totals[1] += stat.size
+            totals[2] += stat.count_diff
+            totals[3] += stat.count
+
+        lines = sorted(grouped.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "base": base,
+            "target": target or "actual",
+            "size_diff_bytes": sum(totals[0] for totals in grouped.values()),
+            "lines": [
+                {
+                    "file": filename,
+                    "line": lineno,
+                    "size_diff_bytes": size_diff,
+                    "size_bytes": size,
+                    "count_diff": count_diff,
+                    "count": count,
+                }
+                for (filename, lineno), (size_diff, size, count_diff, count) in lines[:limit]
+            ],
+        }
+
+
+memory_profiler = MemoryProfiler(
+    frames=get_settings().memory_trace_frames,
+    max_snapshots=get_settings().memory_max_snapshots,
+    history_size=get_settings().memory_history_size,
+    sample_interval=get_settings().memory_sample_interval
+)
+
+
+def _memory_samples():
+    """RSS y GC del worker, leídos al consultar /metrics."""
+    current = memory_profiler.sample()
+    samples = [("process_resident_memory_bytes", "gauge", "Memoria residente del proceso", {}, current["rss_bytes"])]
+    for generation in current["gc"]:
+        labels = {"generation": str(generation["generation"])}
+        samples.append((
+            "python_gc_collections_total", "counter", "Colecciones del GC por generación",
+            labels, generation["collections"]
+        ))
+        samples.append((
+            "python_gc_pause_seconds_total", "counter", "Tiempo en pausas del GC por generación",
+            labels, generation["pause_total_ms"] / 1000
+        ))
+    return samples
+
+
+metrics.register_collector(_memory_samples)
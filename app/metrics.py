@@ -0,0 +1,440 @@
+"""
+Métricas en memoria del microservicio estudiantil.
+
+Contadores, gauges e histogramas de buckets fijos, propios de cada worker,
+para registrar duraciones y volúmenes sin escribir una línea de log por
+evento. Cada observación es, como mucho, una búsqueda binaria sobre los
+límites y un incremento bajo un lock; todo lo demás (agregación entre
+workers, formato de texto de Prometheus) ocurre al consultar /metrics.
+
+Con METRICS_MULTIPROC_DIR cada worker vuelca periódicamente sus valores a
+un archivo JSON en ese directorio y /metrics suma los de todos los workers.
+"""
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config.settings import get_settings
+
+# app.config.logging importa este módulo (decorador instrument): se usa logging directamente
+logger = logging.getLogger(__name__)
+
+# Límites superiores (segundos) pensados para operaciones de base de datos
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Límites superiores (bytes) para tamaños de respuesta
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+Labels = Tuple[Tuple[str, str], ...]
+# Muestra producida por un collector: (nombre, tipo, ayuda, etiquetas, valor)
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+class Counter:
+    """Contador monótono, seguro para uso desde varios hilos."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Valor que sube y baja (requests en curso, conexiones en uso, ...)."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """Histograma de buckets fijos, seguro para uso desde varios hilos."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # Un contador por bucket más el de desborde (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def state(self) -> Dict[str, Any]:
+        """Conteos por bucket (no acumulados), suma y total."""
+        with self._lock:
+            return {"counts": list(self._counts), "sum": self._sum, "count": self._count}
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estima un cuantil interpolando linealmente dentro del bucket que lo contiene.
+
+        Args:
+            q: Cuantil entre 0 y 1
+
+        Returns:
+            Valor estimado, o None si no hay observaciones
+        """
+        return _quantile(self.buckets, self.state()["counts"], q)
+
+    def snapshot(self) -> Dict[str, object]:
+        state = self.state()
+        counts = state["counts"]
+        total = state["count"]
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+        return {
+            "count": total,
+            "sum": round(state["sum"], 6),
+            "avg": round(state["sum"] / total, 6) if total else None,
+            "p50": _quantile(self.buckets, counts, 0.5),
+            "p95": _quantile(self.buckets, counts, 0.95),
+            "p99": _quantile(self.buckets, counts, 0.99),
+            "buckets": buckets,
+        }
+
+
+def _quantile(buckets: Tuple[float, ...], counts: List[int], q: float) -> Optional[float]:
+    total = sum(counts)
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if count and cumulative + count >= rank:
+            if index == len(buckets):
+                # El desborde no tiene límite superior: se reporta el último límite
+                return buckets[-1]
+            lower = buckets[index - 1] if index > 0 else 0.0
+            upper = buckets[index]
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+    return buckets[-1]
+
+
+class MetricsRegistry:
+    """Registro de métricas por nombre y etiquetas."""
+
+    def __init__(self):
+        # nombre -> {"type", "help", "buckets"}
+        self._families: Dict[str, Dict[str, Any]] = {}
+        self._metrics: Dict[Tuple[str, Labels], Any] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, help: str, factory: Callable[[], Any], labels: Dict[str, str]):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                family = self._families.setdefault(name, {"type": kind, "help": help})
+                if family["type"] != kind:
+                    raise ValueError(f"La métrica {name} ya está registrada como {family['type']}")
+                if help and not family["help"]:
+                    family["help"] = help
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = factory()
+                    if kind == "histogram":
+                        family["buckets"] = metric.buckets
+        return metric
+
+    def counter(self, name: str, help: str = "", **labels: str) -> Counter:
+        """Obtiene (o crea) el contador de un nombre y conjunto de etiquetas."""
+        return self._get("counter", name, help, Counter, labels)
+
+    def gauge(self, name: str, help: str = "", **labels: str) -> Gauge:
+        """Obtiene (o crea) el gauge de un nombre y conjunto de etiquetas."""
+        return self._get("gauge", name, help, Gauge, labels)
+
+    def histogram(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS, help: str = "", **labels: str) -> Histogram:
+        """
+        Obtiene (o crea) el histograma de un nombre y conjunto de etiquetas.
+
+        Pensado para resolverse una vez (por ejemplo al decorar) y reutilizarse
+        en cada observación.
+        """
+        return self._get("histogram", name, help, lambda: Histogram(buckets), labels)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Registra una función que produce muestras al consultar las métricas.
+
+        Sirve para valores que ya existen en otro lado (estadísticas de la
+        cache, estado del pool) y no deben costar nada en el camino caliente.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self, name: str) -> Dict[str, Dict[str, object]]:
+        """
+        Resumen de todos los histogramas de un nombre, indexados por sus etiquetas.
+        """
+        with self._lock:
+            items = [(labels, metric) for (metric_name, labels), metric in self._metrics.items()
+                     if metric_name == name and isinstance(metric, Histogram)]
+        return {
+            ",".join(f"{key}={value}" for key, value in labels): metric.snapshot()
+            for labels, metric in sorted(items, key=lambda item: item[0])
+        }
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Valores actuales de todas las métricas, en un formato serializable a JSON.
+
+        Returns:
+            nombre -> {"type", "help", "buckets"?, "samples": [[etiquetas, valor], ...]}
+            (el valor de un histograma es {"counts", "sum", "count"})
+        """
+        with self._lock:
+            families = {name: dict(family) for name, family in self._families.items()}
+            items = list(self._metrics.items())
+            collectors = list(self._collectors)
+
+        result = {name: {**family, "samples": []} for name, family in families.items()}
+        for (name, labels), metric in items:
+            value = metric.state() if isinstance(metric, Histogram) else metric.value
+            result[name]["samples"].append([list(labels), value])
+
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.error(f"Error en collector de métricas: {str(e)}", exc_info=True)
+                continue
+            for name, kind, help, labels, value in samples:
+                family = result.setdefault(name, {"type": kind, "help": help, "samples": []})
+                family["samples"].append([sorted(labels.items()), value])
+        return result
+
+
+def merge_collections(collections: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Suma las métricas de varios workers muestra a muestra.
+
+    Args:
+        collections: Resultados de `MetricsRegistry.collect` de cada worker
+
+    Returns:
+        Una única colección con el mismo formato
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for collection in collections:
+        for name, family in collection.items():
+            target = merged.setdefault(name, {**{k: v for k, v in family.items() if k != "samples"}, "samples": {}})
+            for labels, value in family["samples"]:
+                key = tuple(tuple(pair) for pair in labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = (
+                        {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+                        if isinstance(value, dict) else value
+                    )
+                elif isinstance(value, dict):
+                    current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                else:
+                    target["samples"][key] = current + value
+    for family in merged.values():
+        family["samples"] = [[list(labels), value] for labels, value in family["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Sequence[str]], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [tuple(pair) for pair in labels]
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(collection: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Formatea una colección de métricas en el formato de texto de Prometheus (0.0.4).
+    """
+    lines: List[str] = []
+    for name in sorted(collection):
+        family = collection[name]
+        if family.get("help"):
+            lines.append(f"# HELP {name} {_escape(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for labels, value in sorted(family["samples"], key=lambda sample: [tuple(pair) for pair in sample[0]]):
+            if family["type"] == "histogram":
+                cumulative = 0
+                bounds = list(family["buckets"]) + [float("inf")]
+                for bound, count in zip(bounds, value["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessStore:
+    """
+    Volcado periódico de las métricas de cada worker a un directorio compartido.
+
+    Cada worker escribe ``metrics_<pid>.json``; quien atiende /metrics suma los
+    archivos de todos. Los contadores e histogramas de workers que ya no
+    existen se conservan (los totales no retroceden); sus gauges se descartan.
+    El directorio debe vaciarse al desplegar, antes de arrancar los workers.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float = 5.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> str:
+        # Se resuelve en cada escritura: después de un fork el pid cambia
+        return os.path.join(self.directory, f"metrics_{os.getpid()}.json")
+
+    def write(self) -> None:
+        """Escribe los valores actuales de este worker."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry.collect(), f)
+        os.replace(temp_path, path)
+
+    def read_all(self) -> List[Dict[str, Dict[str, Any]]]:
+        """Colecciones de todos los workers (sin los gauges de los que terminaron)."""
+        collections = []
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                continue
+            try:
+                pid = int(filename[len("metrics_"):-len(".json")])
+                with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+                    collection = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Archivo de métricas ilegible {filename}: {str(e)}")
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                collection = {name: family for name, family in collection.items() if family["type"] != "gauge"}
+            collections.append(collection)
+        return collections
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        try:
+            self.write()
+        except OSError as e:
+            logger.warning(f"No se pudieron volcar las métricas al cerrar: {str(e)}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except Exception as e:
+                logger.error(f"Error volcando métricas: {str(e)}", exc_info=True)
+
+
+metrics = MetricsRegistry()
+
+_multiproc_dir = get_settings().metrics_multiproc_dir
+multiprocess_store = (
+    MultiprocessStore(metrics, _multiproc_dir, get_settings().metrics_write_interval)
+    if _multiproc_dir else None
+)
+
+
+def enable_multiprocess(directory: str) -> None:
+    """
+    Activa el volcado a `directory` cuando se decide después de importar este
+    módulo (el lanzador, según la cantidad de workers). Debe llamarse antes de
+    importar app.main.
+    """
+    global multiprocess_store
+    if multiprocess_store is None:
+        multiprocess_store = MultiprocessStore(metrics, directory, get_settings().metrics_write_interval)
+
+
+def render_metrics() -> str:
+    """
+    Métricas en formato de texto de Prometheus, sumadas entre workers si
+    METRICS_MULTIPROC_DIR está configurado.
+    """
+    if multiprocess_store is None:
+        return render_prometheus(metrics.collect())
+    # Los valores propios se escriben antes de leer para no servirlos atrasados
+    multiprocess_store.write()
+    return render_prometheus(merge_collections(multiprocess_store.read_all()))
@@ -2,218 +2,491 @@
 Middleware para manejo de excepciones globales y logging de requests.
 """
 
+import gzip
+import hashlib
+import logging
 import time
 import uuid
-from typing import Callable
-from fastapi import Request, Response, HTTPException, status
+import zlib
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.exceptions import BaseCustomException, map_exception_to_http
 from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.cache import LRUCache
+from app.metrics import SIZE_BUCKETS, metrics
+from app.query_stats import REPEAT_WARN_THRESHOLD, QueryStats, query_stats_var
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
 
 logger = get_logger(__name__)
 
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
+# Headers de seguridad agregados a todas las respuestas, codificados una sola vez
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    # Content Security Policy para permitir Swagger UI
+    (b"content-security-policy", (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+        "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+        "img-src 'self' data: https:; "
+        "font-src 'self' https://cdn.jsdelivr.net; "
+        "connect-src 'self';"
+    ).encode("latin-1")),
+]
+
+# Métodos que modifican datos (se registran aparte a nivel DEBUG)
+WRITE_METHODS = frozenset({"POST", "PUT", "DELETE", "PATCH"})
+
+# Métodos que se usan como etiqueta de métricas; el resto se agrupa en OTHER
+METRIC_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "POST", "PUT", "DELETE", "PATCH"})
+
+# ID del request en curso, disponible para cualquier código que se ejecute dentro de él
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
     """
-    Middleware para manejo global de excepciones.
-    
-    Captura todas las excepciones no manejadas y las convierte en respuestas HTTP apropiadas.
-    También maneja el logging de excepciones con información contextual.
+    Obtiene el ID del request en curso.
+
+    Returns:
+        ID de 8 caracteres, o None fuera de un request HTTP
     """
-    
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        try:
-            response = await call_next(request)
-            return response
-            
-        except BaseCustomException as e:
-            # Excepciones personalizadas de la aplicación
-            logger.warning(
-                f"Excepción personalizada capturada: {e.__class__.__name__}: {e.message}",
-                extra={
-                    "error_code": e.error_code,
-                    "details": e.details,
-                    "path": request.url.path,
-                    "method": request.method,
-                    "client_ip": request.client.host if request.client else "unknown"
-                }
-            )
-            
-            http_exception = map_exception_to_http(e)
-            return JSONResponse(
-                status_code=http_exception.status_code,
-                content=http_exception.detail
-            )
-            
-        except HTTPException as e:
-            # Excepciones HTTP de FastAPI
-            logger.warning(
-                f"HTTPException capturada: {e.status_code}: {e.detail}",
-                extra={
-                    "path": request.url.path,
-                    "method": request.method,
-                    "client_ip": request.client.host if request.client else "unknown"
-                }
-            )
-            raise e
-            
-        except Exception as e:
-            # Excepciones no controladas
-            logger.error(
-                f"Excepción no controlada: {e.__class__.__name__}: {str(e)}",
-                exc_info=True,
-                extra={
-                    "path": request.url.path,
-                    "method": request.method,
-                    "client_ip": request.client.host if request.client else "unknown"
-                }
-            )
-            
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "message": "Error interno del servidor",
-                    "error_code": "INTERNAL_SERVER_ERROR",
-                    "details": {}
-                }
-            )
+    return request_id_var.get()
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestPipelineMiddleware:
     """
-    Middleware para logging de requests HTTP.
-    
-    Registra información de cada request incluyendo:
-    - URL, método, headers relevantes
-    - Tiempo de procesamiento
-    - Código de respuesta
-    - ID único de request para trazabilidad
+    Middleware ASGI único para todas las peticiones HTTP.
+
+    Reemplaza a las cuatro capas BaseHTTPMiddleware anteriores (logging de
+    requests, manejo de excepciones, logging de escrituras y headers de
+    seguridad) en una sola pasada, sin tareas ni streams intermedios:
+
+    - Genera un ID único por request (``X-Request-ID``) y lo publica en ``request_id_var``
+    - Mide el tiempo hasta el inicio de la respuesta (``X-Process-Time``)
+    - Convierte excepciones no manejadas en respuestas JSON apropiadas
+    - Agrega los headers de seguridad precalculados
+    - Registra métricas por ruta: duración, requests por status, tamaño de
+      respuesta y requests en curso (ver ``/metrics``)
+    - Cuenta las sentencias SQL del request (``Server-Timing: db``) y advierte
+      cuando una misma sentencia se repite más de QUERY_REPEAT_WARN_THRESHOLD veces
+    - Con TRAFFIC_RECORD_FILE, graba una línea por request (ver ``app/traffic.py``)
     """
-    
+
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Generar ID único para el request
-        request_id = str(uuid.uuid4())[:8]
-        start_time = time.time()
-        
-        # Obtener información del request
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Log del inicio del request
-        logger.info(
-            f"Request iniciado: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-                "query_params": dict(request.query_params),
-            }
-        )
-        
-        try:
-            # Procesar request
-            response = await call_next(request)
-            
-            # Calcular tiempo de procesamiento
-            process_time = time.time() - start_time
-            
-            # Log del final del request
+        self.app = app
+        self._in_flight = metrics.gauge("http_requests_in_flight", help="Requests HTTP en curso")
+        # endpoint -> plantilla de la ruta (/estudiantes/{registro_academico})
+        self._route_paths: Dict[Any, str] = {}
+        # (método, ruta, status) -> métricas ya resueltas, para no buscarlas en cada request
+        self._route_metrics: Dict[Tuple[str, str, int], tuple] = {}
+        # Importado aquí: app.traffic depende de app.slow_queries, que importa este módulo
+        from app.traffic import traffic_recorder
+        self._traffic = traffic_recorder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = uuid.uuid4().hex[:8]
+        token = request_id_var.set(request_id)
+        query_stats = QueryStats()
+        query_stats_token = query_stats_var.set(query_stats)
+        start_time = time.perf_counter()
+
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        response_started = False
+        response_size = 0
+        self._in_flight.inc()
+
+        if logger.isEnabledFor(logging.INFO):
+            headers = Headers(scope=scope)
             logger.info(
-                f"Request completado: {request.method} {request.url.path} - "
-                f"Status: {response.status_code} - Tiempo: {process_time:.4f}s",
+                f"Request iniciado: {method} {path}",
                 extra={
                     "request_id": request_id,
-                    "status_code": response.status_code,
-                    "process_time": process_time,
                     "client_ip": client_ip,
+                    "user_agent": headers.get("user-agent", "unknown"),
+                    "query_params": scope.get("query_string", b"").decode("latin-1"),
                 }
             )
-            
-            # Agregar headers de respuesta para debugging
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = f"{process_time:.4f}"
-            
-            return response
-            
+        if method in WRITE_METHODS:
+            logger.debug(
+                f"Operación de base de datos: {method} {path}",
+                extra={"operation_type": "database", "method": method, "path": path}
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started, response_size
+            if message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    *SECURITY_HEADERS,
+                    (b"x-request-id", request_id.encode("latin-1")),
+                    (b"x-process-time", f"{process_time:.4f}".encode("latin-1")),
+                    (b"server-timing", query_stats.server_timing().encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Log de errores durante el procesamiento
-            process_time = time.time() - start_time
-            
-            logger.error(
-                f"Request falló: {request.method} {request.url.path} - "
-                f"Error: {e.__class__.__name__}: {str(e)} - Tiempo: {process_time:.4f}s",
-                exc_info=True,
+            if response_started:
+                # La respuesta ya empezó a enviarse: no se puede reemplazar
+                logger.error(
+                    f"Request falló: {method} {path} - Error: {e.__class__.__name__}: {str(e)} - "
+                    f"Tiempo: {time.perf_counter() - start_time:.4f}s",
+                    exc_info=True,
+                    extra={"request_id": request_id, "client_ip": client_ip, "error_type": e.__class__.__name__}
+                )
+                raise
+            response = self._error_response(e, method, path, client_ip)
+            await response(scope, receive, send_wrapper)
+        finally:
+            process_time = time.perf_counter() - start_time
+            logger.info(
+                f"Request completado: {method} {path} - "
+                f"Status: {status_code} - Tiempo: {process_time:.4f}s - "
+                f"DB: {query_stats.count} queries en {query_stats.duration:.4f}s",
                 extra={
                     "request_id": request_id,
+                    "status_code": status_code,
                     "process_time": process_time,
                     "client_ip": client_ip,
-                    "error_type": e.__class__.__name__,
+                    "db_queries": query_stats.count,
+                    "db_time": query_stats.duration,
+                }
+            )
+            route = self._route_template(scope)
+            if REPEAT_WARN_THRESHOLD and query_stats.count > REPEAT_WARN_THRESHOLD:
+                for statement, count in query_stats.repeated(REPEAT_WARN_THRESHOLD):
+                    logger.warning(
+                        f"Posible N+1 en {method} {route}: sentencia ejecutada {count} veces: "
+                        f"{' '.join(statement.split())[:300]}",
+                        extra={"request_id": request_id, "repeat_count": count}
+                    )
+            duration, requests, size = self._metrics_for(method, route, status_code)
+            duration.observe(process_time)
+            requests.inc()
+            size.observe(response_size)
+            if self._traffic is not None:
+                self._traffic.record(
+                    time.time() - process_time, method, route, scope.get("path_params", {}), path,
+                    scope.get("query_string", b""),
+                    status_code, process_time, query_stats.count,
+                    any(name == b"authorization" for name, _ in scope["headers"])
+                )
+            self._in_flight.dec()
+            query_stats_var.reset(query_stats_token)
+            request_id_var.reset(token)
+
+    def _route_template(self, scope: Scope) -> str:
+        """Plantilla de la ruta atendida; acota la cardinalidad de las etiquetas."""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            app = scope.get("app")
+            for route in getattr(app, "routes", ()):
+                if hasattr(route, "endpoint"):
+                    self._route_paths[route.endpoint] = route.path
+            path = self._route_paths.setdefault(endpoint, "unmatched")
+        return path
+
+    def _metrics_for(self, method: str, route: str, status_code: int) -> tuple:
+        if method not in METRIC_METHODS:
+            method = "OTHER"
+        key = (method, route, status_code)
+        route_metrics = self._route_metrics.get(key)
+        if route_metrics is None:
+            route_metrics = self._route_metrics[key] = (
+                metrics.histogram(
+                    "http_request_duration_seconds", help="Duración de los requests HTTP por ruta",
+                    method=method, route=route
+                ),
+                metrics.counter(
+                    "http_requests_total", help="Requests HTTP por ruta y status",
+                    method=method, route=route, status=str(status_code)
+                ),
+                metrics.histogram(
+                    "http_response_size_bytes", buckets=SIZE_BUCKETS,
+                    help="Bytes enviados en el cuerpo de la respuesta por ruta",
+                    method=method, route=route
+                ),
+            )
+        return route_metrics
+
+    def _error_response(self, exc: Exception, method: str, path: str, client_ip: str) -> JSONResponse:
+        if isinstance(exc, BaseCustomException):
+            # Excepciones personalizadas de la aplicación
+            logger.warning(
+                f"Excepción personalizada capturada: {exc.__class__.__name__}: {exc.message}",
+                extra={
+                    "error_code": exc.error_code,
+                    "details": exc.details,
+                    "path": path,
+                    "method": method,
+                    "client_ip": client_ip
                 }
             )
-            
-            # Re-lanzar la excepción para que sea manejada por el ExceptionHandlerMiddleware
-            raise
+            http_exception = map_exception_to_http(exc)
+            return JSONResponse(status_code=http_exception.status_code, content=http_exception.detail)
+
+        # Excepciones no controladas
+        logger.error(
+            f"Excepción no controlada: {exc.__class__.__name__}: {str(exc)}",
+            exc_info=True,
+            extra={"path": path, "method": method, "client_ip": client_ip}
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "message": "Error interno del servidor",
+                "error_code": "INTERNAL_SERVER_ERROR",
+                "details": {}
+            }
+        )
+
 
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+
+def select_encoding(accept_encoding: Optional[str]) -> Optional[str]:
     """
-    Middleware para agregar headers de seguridad a las respuestas.
+    Elige la codificación de contenido a partir del header Accept-Encoding.
+
+    Se prefiere brotli (si está instalado) frente a gzip a igual peso q.
+
+    Args:
+        accept_encoding: Valor del header enviado por el cliente
+
+    Returns:
+        "br", "gzip" o None si el cliente no acepta ninguna de las dos
     """
-    
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Headers de seguridad básicos
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # Content Security Policy para permitir Swagger UI
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "img-src 'self' data: https:; "
-            "font-src 'self' https://cdn.jsdelivr.net; "
-            "connect-src 'self';"
-        )
-        
-        return response
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
 
 
-class DatabaseConnectionMiddleware(BaseHTTPMiddleware):
+class _StreamCompressor:
+    """Compresor incremental para respuestas enviadas en varios fragmentos."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Se vacía el buffer en cada fragmento para no retener datos del stream
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
     """
-    Middleware para logging de conexiones de base de datos.
+    Middleware ASGI de compresión de respuestas con gzip o brotli.
+
+    - Solo comprime tipos de contenido textuales y cuerpos de al menos
+      ``minimum_size`` bytes (las respuestas pequeñas como /health no se tocan).
+    - Los cuerpos comprimidos de respuestas GET 200 cacheables se guardan en una
+      LRU indexada por el resumen del cuerpo y la codificación, para no volver
+      a comprimir el mismo listado en cada petición.
+    - El ETag de una respuesta comprimida pasa a ser débil, ya que los bytes
+      enviados dependen de la codificación negociada.
     """
-    
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Solo loggear para endpoints que modifican datos
-        if request.method in ["POST", "PUT", "DELETE", "PATCH"]:
-            logger.debug(
-                f"Operación de base de datos: {request.method} {request.url.path}",
-                extra={
-                    "operation_type": "database",
-                    "method": request.method,
-                    "path": request.url.path
-                }
-            )
-        
-        return await call_next(request)
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+        cache: Optional[LRUCache] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else get_settings().compression_min_size
+        self.gzip_level = gzip_level if gzip_level is not None else get_settings().compression_gzip_level
+        self.brotli_quality = brotli_quality if brotli_quality is not None else get_settings().compression_brotli_quality
+        self.cache = cache if cache is not None else LRUCache(
+            max_entries=get_settings().compression_cache_max_entries,
+            ttl=get_settings().compression_cache_ttl
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, scope["method"], send)
+        await self.app(scope, receive, responder)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Comprime un cuerpo completo con la codificación indicada.
+
+        Args:
+            body: Cuerpo de la respuesta
+            encoding: "br" o "gzip"
+
+        Returns:
+            Cuerpo comprimido
+        """
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_cached(self, body: bytes, encoding: str) -> bytes:
+        """
+        Comprime un cuerpo reutilizando el resultado si ya se comprimió antes.
+
+        Args:
+            body: Cuerpo de la respuesta
+            encoding: "br" o "gzip"
+
+        Returns:
+            Cuerpo comprimido
+        """
+        key = f"{hashlib.blake2b(body, digest_size=16).hexdigest()}:{encoding}"
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self.compress(body, encoding)
+            self.cache.set(key, compressed)
+        return compressed
+
+
+class _CompressionResponder:
+    """Intercepta los mensajes de respuesta de una petición y los comprime si corresponde."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, method: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.method = method
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.stream: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Se retiene hasta conocer el primer fragmento del cuerpo
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            chunk = self.stream.compress(body)
+            if not more_body:
+                chunk += self.stream.finish()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._should_compress(headers, body, more_body):
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        if more_body:
+            # Respuesta en streaming: se comprime fragmento a fragmento
+            del headers["Content-Length"]
+            self.stream = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": self.stream.compress(body), "more_body": True})
+            return
+
+        if self._is_cacheable(headers):
+            compressed = self.middleware.compress_cached(body, self.encoding)
+        else:
+            compressed = self.middleware.compress(body, self.encoding)
+        headers["Content-Length"] = str(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if self.start_message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        if more_body:
+            content_length = headers.get("content-length")
+            return content_length is None or int(content_length) >= self.middleware.minimum_size
+        return len(body) >= self.middleware.minimum_size
+
+    def _is_cacheable(self, headers: MutableHeaders) -> bool:
+        return (
+            self.method == "GET"
+            and self.start_message["status"] == 200
+            and "no-store" not in headers.get("cache-control", "")
+        )
 
 
 def configure_middleware(app):
@@ -226,17 +499,22 @@ def configure_middleware(app):
     # Agregar middlewares en orden inverso de ejecución
     # (el último agregado es el primero en ejecutarse)
     
-    # Middleware de headers de seguridad (se ejecuta al final)
-    app.add_middleware(SecurityHeadersMiddleware)
-    
-    # Middleware de conexiones de base de datos
-    app.add_middleware(DatabaseConnectionMiddleware)
-    
-    # Middleware de manejo de excepciones (se ejecuta antes del logging para capturar errores)
-    app.add_middleware(ExceptionHandlerMiddleware)
-    
-    # Middleware de logging de requests (se ejecuta primero)
-    app.add_middleware(RequestLoggingMiddleware)
+    # Compresión de respuestas (la más interna: comprime el cuerpo que produce la aplicación)
+    settings = get_settings()
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+
+    # Perfilado a pedido (dentro del pipeline, para conocer el ID del request)
+    if settings.admin_token and settings.profiling_enabled:
+        from app.profiling import ProfilingMiddleware
+        app.add_middleware(
+            ProfilingMiddleware,
+            token=settings.admin_token,
+            interval=settings.profile_sample_interval_ms / 1000
+        )
+
+    # Pipeline de requests: ID, tiempos, excepciones y headers de seguridad
+    app.add_middleware(RequestPipelineMiddleware)
     
     logger.info("Middlewares configurados exitosamente")
 
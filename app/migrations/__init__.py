@@ -0,0 +1,103 @@
+"""
+Migraciones versionadas del esquema.
+
+Cada migración es un módulo ``mNNNN_<descripcion>.py`` con VERSION,
+DESCRIPTION y ``upgrade(connection)``, registrado en MIGRATIONS. Se aplican
+una vez, fuera del arranque de la aplicación, con:
+
+    python -m app.migrations upgrade
+
+La tabla ``schema_version`` guarda una fila por migración aplicada. Al
+arrancar, cada worker solo lee la versión de la base (una consulta) y no
+arranca si es anterior a LATEST_VERSION; con DB_AUTO_MIGRATE=true aplica las
+pendientes (pensado para desarrollo local).
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config.logging import get_logger
+from app.exceptions import SchemaVersionError
+from app.migrations import m0001_esquema_inicial, m0002_columna_version
+
+logger = get_logger(__name__)
+
+MIGRATIONS = [
+    m0001_esquema_inicial,
+    m0002_columna_version,
+]
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Clave del advisory lock de PostgreSQL que serializa migraciones concurrentes
+_LOCK_KEY = 7_304_911
+
+
+def get_version(connection: Connection) -> int:
+    """Versión aplicada del esquema (0 si la base no tiene migraciones)."""
+    if not connection.dialect.has_table(connection, schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    Aplica las migraciones pendientes hasta `target` (por defecto, la última)
+    en una transacción. En PostgreSQL toma un advisory lock: si varios procesos
+    migran a la vez, los demás esperan y no encuentran nada pendiente.
+
+    Returns:
+        Versiones aplicadas
+    """
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_LOCK_KEY})")
+        schema_version.create(connection, checkfirst=True)
+        current = get_version(connection)
+        for migration in MIGRATIONS:
+            if current < migration.VERSION <= target:
+                logger.info(f"Aplicando migración {migration.VERSION}: {migration.DESCRIPTION}")
+                migration.upgrade(connection)
+                connection.execute(schema_version.insert().values(
+                    version=migration.VERSION,
+                    description=migration.DESCRIPTION,
+                    applied_at=datetime.utcnow()
+                ))
+                applied.append(migration.VERSION)
+    return applied
+
+
+def check_schema_version(engine: Engine) -> int:
+    """
+    Verifica que la base tenga todas las migraciones de este código, con una
+    sola consulta y sin inspeccionar el catálogo.
+
+    Returns:
+        Versión de la base
+
+    Raises:
+        SchemaVersionError: Si la base tiene una versión anterior a LATEST_VERSION
+    """
+    try:
+        with engine.connect() as connection:
+            version = connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except SQLAlchemyError:
+        # Sin tabla schema_version: la base nunca se migró
+        version = 0
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(version, LATEST_VERSION)
+    if version > LATEST_VERSION:
+        logger.warning(f"La base está en la versión {version}, posterior a la de este código ({LATEST_VERSION})")
+    return version
@@ -0,0 +1,53 @@
+"""
+Migraciones del esquema.
+
+Ejecutar:
+    python -m app.migrations upgrade             # aplica las pendientes
+    python -m app.migrations upgrade --target 1  # hasta una versión
+    python -m app.migrations current             # versión de la base y la de este código
+    python -m app.migrations check               # sale con 1 si faltan migraciones
+
+Usa DATABASE_URL, como la aplicación.
+"""
+
+import argparse
+import sys
+from typing import List
+
+from app.database import engine
+from app.exceptions import SchemaVersionError
+from app.migrations import LATEST_VERSION, MIGRATIONS, check_schema_version, get_version, upgrade
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["upgrade", "current", "check"])
+    parser.add_argument("--target", type=int, help="versión hasta la cual migrar (por defecto, la última)")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        applied = upgrade(engine, args.target)
+        if applied:
+            descriptions = {migration.VERSION: migration.DESCRIPTION for migration in MIGRATIONS}
+            for version in applied:
+                print(f"Aplicada {version}: {descriptions[version]}")
+        else:
+            print("Sin migraciones pendientes")
+        return 0
+
+    if args.command == "current":
+        with engine.connect() as connection:
+            print(f"Base: {get_version(connection)}, código: {LATEST_VERSION}")
+        return 0
+
+    try:
+        version = check_schema_version(engine)
+    except SchemaVersionError as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    print(f"Esquema al día (versión {version})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
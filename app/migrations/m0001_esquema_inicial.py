@@ -0,0 +1,53 @@
+"""
+Esquema inicial: estudiante, pago y bloqueo.
+
+Las tablas se definen acá y no se toman de los modelos, para que esta
+migración siga creando el esquema de la versión 1 aunque los modelos cambien.
+Las tablas que ya existen no se modifican: las columnas que les falten las
+agregan las migraciones siguientes (m0002).
+"""
+
+from sqlalchemy import DECIMAL, Column, Date, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+VERSION = 1
+DESCRIPTION = "Esquema inicial: estudiante, pago y bloqueo"
+
+metadata = MetaData()
+
+Table(
+    "estudiante", metadata,
+    Column("codigo_carrera", String(8)),
+    Column("registro_academico", String(10), primary_key=True),
+    Column("nombre", String(100), nullable=False),
+    Column("apellido", String(100), nullable=False),
+    Column("ci", String(20), unique=True),
+    Column("correo", String(100)),
+    Column("contrasena", Text, nullable=False),
+    Column("telefono", String(20)),
+    Column("direccion", String(150)),
+    Column("estado_academico", String(20)),
+    Column("version", Integer, nullable=False, server_default="1"),
+)
+
+Table(
+    "pago", metadata,
+    Column("codigo_pago", String(10), primary_key=True),
+    Column("registro_academico", String(10), ForeignKey("estudiante.registro_academico")),
+    Column("descripcion", String(100)),
+    Column("monto", DECIMAL(10, 2)),
+    Column("fecha_pago", Date),
+    Column("version", Integer, nullable=False, server_default="1"),
+)
+
+Table(
+    "bloqueo", metadata,
+    Column("codigo_bloqueo", String(10), primary_key=True),
+    Column("registro_academico", String(10), ForeignKey("estudiante.registro_academico")),
+    Column("descripcion", String(100)),
+    Column("version", Integer, nullable=False, server_default="1"),
+)
+
+
+def upgrade(connection: Connection) -> None:
+    metadata.create_all(connection, checkfirst=True)
@@ -0,0 +1,23 @@
+"""
+Columna ``version`` (bloqueo optimista y ETag) en estudiante, pago y bloqueo.
+
+Las bases creadas por ``create_all`` antes de que existiera la columna
+tienen las tablas pero no la columna; la migración 1 no modifica tablas
+existentes, así que se agrega acá donde falte.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+VERSION = 2
+DESCRIPTION = "Columna version en estudiante, pago y bloqueo"
+
+TABLES = ("estudiante", "pago", "bloqueo")
+
+
+def upgrade(connection: Connection) -> None:
+    inspector = inspect(connection)
+    for table in TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "version" not in columns:
+            connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN version INT NOT NULL DEFAULT 1")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -8,6 +8,10 @@ class Bloqueo(Base):
     codigo_bloqueo = Column(String(10), primary_key=True)
     registro_academico = Column(String(10), ForeignKey('estudiante.registro_academico'))
     descripcion = Column(String(100))
+    # Versión de la fila: control de concurrencia optimista y ETags
+    version = Column(Integer, nullable=False, server_default="1")
     
     # Relación con estudiante
-    estudiante = relationship("Estudiante", back_populates="bloqueos")
\ No newline at end of file
+    estudiante = relationship("Estudiante", back_populates="bloqueos")
+    
+    __mapper_args__ = {"version_id_col": version}
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
 class Estudiante(Base):
@@ -12,11 +12,16 @@ class Estudiante(Base):
     apellido = Column(String(100), nullable=False)
     ci = Column(String(20), unique=True)
     correo = Column(String(100))
-    contrasena = Column(Text, nullable=False)
+    # Hash bcrypt: solo se carga cuando se pide explícitamente (undefer)
+    contrasena = deferred(Column(Text, nullable=False))
     telefono = Column(String(20))
     direccion = Column(String(150))
     estado_academico = Column(String(20), default='REGULAR')
+    # Versión de la fila: control de concurrencia optimista y ETags
+    version = Column(Integer, nullable=False, server_default="1")
     
     # Relaciones
     pagos = relationship("Pago", back_populates="estudiante")
-    bloqueos = relationship("Bloqueo", back_populates="estudiante")
\ No newline at end of file
+    bloqueos = relationship("Bloqueo", back_populates="estudiante")
+    
+    __mapper_args__ = {"version_id_col": version}
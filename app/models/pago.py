@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DECIMAL, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DECIMAL, ForeignKey, Date
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -11,6 +11,10 @@ class Pago(Base):
     descripcion = Column(String(100))
     monto = Column(DECIMAL(10,2))
     fecha_pago = Column(Date, default=func.current_date())
+    # Versión de la fila: control de concurrencia optimista y ETags
+    version = Column(Integer, nullable=False, server_default="1")
     
     # Relación con estudiante
-    estudiante = relationship("Estudiante", back_populates="pagos")
\ No newline at end of file
+    estudiante = relationship("Estudiante", back_populates="pagos")
+    
+    __mapper_args__ = {"version_id_col": version}
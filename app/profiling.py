@@ -0,0 +1,426 @@
+"""
+Perfilado estadístico de requests y del proceso completo.
+
+Un hilo muestreador toma la pila de todos los hilos del proceso a intervalos
+fijos (``sys._current_frames``) y acumula las pilas colapsadas (formato
+"folded": ``marco;marco;...;hoja cantidad``), que cualquier herramienta de
+flamegraphs (flamegraph.pl, speedscope, inferno) abre directamente.
+
+Un request se perfila solo si trae el header ``X-Profile`` con el valor de
+ADMIN_TOKEN. El resto de los requests no paga nada más que la búsqueda del
+header. Como se muestrean todos los hilos (el loop de eventos y el threadpool
+donde corren los endpoints síncronos), un perfil puede incluir trabajo de
+requests concurrentes; los hilos inactivos se descartan.
+
+Con CONTINUOUS_PROFILING_ENABLED=true cada worker además muestrea en segundo
+plano a baja frecuencia y vuelca cada CONTINUOUS_PROFILE_FLUSH_INTERVAL
+segundos un archivo colapsado en CONTINUOUS_PROFILE_DIR, para ver en qué se
+va la CPU a lo largo del día (bcrypt, serialización, logging, ...).
+"""
+
+import hmac
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.middleware import get_request_id
+
+logger = get_logger(__name__)
+
+PROFILE_DIR = get_settings().profile_dir
+PROFILE_MAX_FILES = get_settings().profile_max_files
+CONTINUOUS_PROFILE_DIR = get_settings().continuous_profile_dir
+
+# Hojas de pila de un hilo que espera (sin consumir CPU): esas muestras se descartan
+IDLE_LEAVES = frozenset({
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("_threading_local.py", "wait"),
+})
+
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.folded$")
+
+
+def _short_path(filename: str) -> str:
+    """Ruta legible: relativa al proyecto o al paquete instalado."""
+    for marker in ("site-packages/", "dist-packages/"):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    return os.path.basename(filename)
+
+
+class StackSampler:
+    """
+    Muestreador de pilas de todos los hilos, acumuladas en formato colapsado.
+
+    Args:
+        interval: Segundos entre muestras
+        include_idle: Conservar también las pilas de hilos que esperan
+    """
+
+    def __init__(self, interval: float = 0.002, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        # Segundos de CPU consumidos por el hilo muestreador
+        self.cpu_time = 0.0
+        self._labels: Dict[object, str] = {}
+        self._idle_codes: Dict[object, bool] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def drain(self) -> Tuple[Counter, int]:
+        """Retorna las pilas acumuladas y la cantidad de muestras, y reinicia los contadores."""
+        with self._lock:
+            stacks, samples = self.stacks, self.samples
+            self.stacks, self.samples = Counter(), 0
+        return stacks, samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            start = time.thread_time()
+            self.sample()
+            self.cpu_time += time.thread_time() - start
+
+    def sample(self) -> None:
+        """Toma una muestra de la pila de cada hilo (salvo el propio muestreador)."""
+        own = threading.get_ident()
+        collapsed = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            stack = self._collapse(thread_id, frame)
+            if stack is not None:
+                collapsed.append(stack)
+        with self._lock:
+            self.samples += 1
+            for stack in collapsed:
+                self.stacks[stack] += 1
+
+    def _collapse(self, thread_id: int, frame) -> Optional[str]:
+        if not self.include_idle and self._is_idle(frame.f_code):
+            return None
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                qualname = getattr(code, "co_qualname", code.co_name)
+                label = self._labels[code] = f"{qualname} ({_short_path(code.co_filename)})".replace(";", ":")
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(self._thread_name(thread_id))
+        labels.reverse()
+        return ";".join(labels)
+
+    def _is_idle(self, code) -> bool:
+        idle = self._idle_codes.get(code)
+        if idle is None:
+            idle = self._idle_codes[code] = (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+        return idle
+
+    def _thread_name(self, thread_id: int) -> str:
+        name = self._thread_names.get(thread_id)
+        if name is None:
+            self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            name = self._thread_names.get(thread_id, f"thread-{thread_id}")
+        return name.replace(";", ":").replace(" ", "_")
+
+
+def render_folded(stacks: Counter) -> str:
+    """Pilas colapsadas, una por línea, listas para flamegraph.pl o speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def parse_folded(text: str) -> Counter:
+    stacks: Counter = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+def render_tree(stacks: Counter, min_percent: float = 1.0) -> str:
+    """
+    Árbol de llamadas de arriba hacia abajo con el porcentaje de muestras de cada nodo.
+
+    Args:
+        stacks: Pilas colapsadas y su cantidad de muestras
+        min_percent: Nodos por debajo de este porcentaje se omiten
+    """
+    total = sum(stacks.values())
+    if not total:
+        return "(sin muestras)\n"
+    tree: Dict[str, list] = {}
+    for stack, count in stacks.items():
+        node = tree
+        for label in stack.split(";"):
+            entry = node.setdefault(label, [0, {}])
+            entry[0] += count
+            node = entry[1]
+
+    lines: List[str] = [f"{total} muestras"]
+
+    def walk(node: Dict[str, list], depth: int) -> None:
+        for label, (count, children) in sorted(node.items(), key=lambda item: item[1][0], reverse=True):
+            percent = count * 100 / total
+            if percent < min_percent:
+                continue
+            lines.append(f"{'  ' * depth}{percent:5.1f}% {label}")
+            walk(children, depth + 1)
+
+    walk(tree, 0)
+    return "\n".join(lines) + "\n"
+
+
+def save_profile(name: str, stacks: Counter, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES) -> str:
+    """
+    Guarda un perfil en formato colapsado y elimina los más antiguos por encima de `max_files`.
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_folded(stacks))
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".folded")),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in profiles[:-max_files] if max_files > 0 else ():
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    return path
+
+
+def list_profiles(directory: str = PROFILE_DIR) -> List[Dict[str, object]]:
+    """Perfiles guardados, del más reciente al más antiguo."""
+    if not os.path.isdir(directory):
+        return []
+    entries = [entry for entry in os.scandir(directory) if entry.name.endswith(".folded")]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [
+        {"name": entry.name, "size": entry.stat().st_size, "created_at": entry.stat().st_mtime}
+        for entry in entries
+    ]
+
+
+def load_profile(name: str, directory: str = PROFILE_DIR) -> Optional[Counter]:
+    """
+    Lee un perfil guardado.
+
+    Returns:
+        Pilas colapsadas, o None si el nombre no es válido o el archivo no existe
+    """
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = os.path.join(directory, name)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_folded(f.read())
+
+
+class ContinuousProfiler(StackSampler):
+    """
+    Muestreador de fondo que vuelca periódicamente las pilas acumuladas.
+
+    Cada volcado escribe ``<host>_<pid>_<timestamp>.folded`` en `directory` y
+    registra la cantidad de muestras y la CPU que consumió el muestreo en la
+    ventana, de modo que el costo del perfilado continuo queda medido.
+
+    Args:
+        interval: Segundos entre muestras
+        flush_interval: Segundos entre volcados a disco
+        directory: Directorio de los archivos colapsados
+        max_files: Archivos que se conservan en `directory`
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.02,
+        flush_interval: float = 300.0,
+        directory: str = CONTINUOUS_PROFILE_DIR,
+        max_files: int = 288
+    ):
+        super().__init__(interval)
+        self.flush_interval = flush_interval
+        self.directory = directory
+        self.max_files = max_files
+        self._window_start = time.monotonic()
+        self._window_cpu = 0.0
+
+    def start(self) -> None:
+        self._window_start = time.monotonic()
+        self._window_cpu = self.cpu_time
+        super().start()
+        logger.info(
+            f"Perfilado continuo activo: una muestra cada {self.interval * 1000:.0f} ms, "
+            f"volcado cada {self.flush_interval:.0f}s en {self.directory}"
+        )
+
+    def stop(self) -> None:
+        super().stop()
+        self.flush()
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stop.wait(self.interval):
+            start = time.thread_time()
+            self.sample()
+            self.cpu_time += time.thread_time() - start
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def overhead(self) -> float:
+        """Fracción de un núcleo consumida por el muestreo desde el último volcado."""
+        elapsed = time.monotonic() - self._window_start
+        return (self.cpu_time - self._window_cpu) / elapsed if elapsed > 0 else 0.0
+
+    def flush(self) -> Optional[str]:
+        """
+        Escribe las pilas acumuladas desde el último volcado.
+
+        Returns:
+            Ruta del archivo escrito, o None si no había muestras
+        """
+        overhead = self.overhead()
+        stacks, samples = self.drain()
+        self._window_start = time.monotonic()
+        self._window_cpu = self.cpu_time
+        if not stacks:
+            return None
+        name = f"{socket.gethostname()}_{os.getpid()}_{time.strftime('%Y%m%d-%H%M%S')}.folded"
+        try:
+            path = save_profile(name, stacks, self.directory, self.max_files)
+        except OSError as e:
+            logger.error(f"No se pudo volcar el perfil continuo {name}: {str(e)}")
+            return None
+        logger.info(f"Perfil continuo volcado: {name} ({samples} muestras, muestreo {overhead:.3%} de CPU)")
+        return path
+
+
+continuous_profiler = (
+    ContinuousProfiler(
+        interval=get_settings().continuous_profile_interval_ms / 1000,
+        flush_interval=get_settings().continuous_profile_flush_interval,
+        max_files=get_settings().continuous_profile_max_files
+    )
+    if get_settings().continuous_profiling_enabled else None
+)
+
+
+_switch_lock = threading.Lock()
+_active_profiles = 0
+_saved_switch_interval = sys.getswitchinterval()
+
+
+def _begin_profile(interval: float) -> None:
+    """
+    Baja el intervalo de cambio del GIL mientras haya perfiles activos: con el
+    valor por defecto (5 ms) el muestreador no obtendría el GIL más seguido
+    que eso mientras el request ocupa la CPU.
+    """
+    global _active_profiles, _saved_switch_interval
+    with _switch_lock:
+        if _active_profiles == 0:
+            _saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(_saved_switch_interval, interval / 2))
+        _active_profiles += 1
+
+
+def _end_profile() -> None:
+    global _active_profiles
+    with _switch_lock:
+        _active_profiles -= 1
+        if _active_profiles == 0:
+            sys.setswitchinterval(_saved_switch_interval)
+
+
+class ProfilingMiddleware:
+    """
+    Perfila los requests que traen ``X-Profile: <ADMIN_TOKEN>``.
+
+    El perfil se guarda en PROFILE_DIR como ``<timestamp>_<request_id>.folded``
+    y su nombre se devuelve en el header ``X-Profile-Id``
+    (ver ``GET /admin/profiles/{nombre}``).
+    """
+
+    def __init__(self, app: ASGIApp, token: str, interval: float = 0.002, directory: str = PROFILE_DIR):
+        self.app = app
+        self.token = token.encode("latin-1")
+        self.interval = interval
+        self.directory = directory
+
+    def _requested(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = get_request_id() or "sinid"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}_{request_id}.folded"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (b"x-profile-id", name.encode("latin-1"))]
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        start_time = time.perf_counter()
+        _begin_profile(self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _end_profile()
+            stacks, samples = sampler.drain()
+            try:
+                save_profile(name, stacks, self.directory)
+                logger.info(
+                    f"Perfil guardado: {name} ({scope['method']} {scope['path']}, {samples} muestras, "
+                    f"{time.perf_counter() - start_time:.4f}s)"
+                )
+            except OSError as e:
+                logger.error(f"No se pudo guardar el perfil {name}: {str(e)}")
@@ -0,0 +1,148 @@
+"""
+Conteo de sentencias SQL por request.
+
+Los eventos del engine acumulan, en el QueryStats del request en curso
+(``query_stats_var``), cuántas sentencias se ejecutaron, cuánto tiempo tomaron
+y cuántas veces se repitió cada forma de sentencia. RequestPipelineMiddleware
+crea el QueryStats de cada request, publica el resultado en el header
+``Server-Timing`` y advierte cuando una misma sentencia se repite demasiado
+(el patrón típico de N+1).
+
+Los endpoints síncronos corren en el threadpool con una copia del contexto:
+la copia apunta al mismo QueryStats, así que sus sentencias también se cuentan.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.settings import get_settings
+
+# Repeticiones de una misma sentencia en un request a partir de las cuales se advierte (0 = nunca)
+REPEAT_WARN_THRESHOLD = get_settings().query_repeat_warn_threshold
+
+
+class QueryStats:
+    """Sentencias ejecutadas durante un request."""
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        # Texto de la sentencia (con parámetros ligados, sin valores) -> ejecuciones
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Sentencias ejecutadas más de `threshold` veces, de la más repetida a la menos.
+        """
+        return sorted(
+            ((statement, count) for statement, count in self.shapes.items() if count > threshold),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+    def server_timing(self) -> str:
+        """Valor del header Server-Timing para la base de datos."""
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Funciones que reciben cada sentencia ejecutada: (conexión, sentencia, parámetros, executemany, duración)
+StatementObserver = Callable[[Any, str, Any, bool, float], None]
+_observers: List[StatementObserver] = []
+
+
+def add_statement_observer(observer: StatementObserver) -> None:
+    """
+    Registra una función que recibe cada sentencia con su duración ya medida
+    (por ejemplo, el registro de consultas lentas).
+    """
+    _observers.append(observer)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for observer in _observers:
+        observer(conn, statement, parameters, executemany, duration)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Registra los eventos que cuentan y miden las sentencias del engine.
+
+    Args:
+        engine: Engine de SQLAlchemy a instrumentar
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[List[str]]:
+    """
+    Captura todas las sentencias que ejecuta el engine dentro del bloque,
+    en cualquier hilo (sirve con TestClient, que atiende en otro hilo).
+
+    Args:
+        engine: Engine a observar
+
+    Yields:
+        Lista que se va llenando con el texto de cada sentencia
+    """
+    statements: List[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", capture)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, budget: int, label: str = "") -> Iterator[List[str]]:
+    """
+    Falla si el bloque ejecuta más de `budget` sentencias.
+
+    Ejemplo::
+
+        with assert_max_queries(engine, 2, "GET /estudiantes/{id}"):
+            client.get("/estudiantes/201812345")
+
+    Args:
+        engine: Engine a observar
+        budget: Máximo de sentencias permitidas
+        label: Descripción para el mensaje de error
+
+    Raises:
+        AssertionError: Si se supera el presupuesto, con el detalle de las sentencias
+    """
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > budget:
+        detail = "\n".join(f"  {index}. {' '.join(statement.split())[:200]}"
+                           for index, statement in enumerate(statements, 1))
+        raise AssertionError(
+            f"{label or 'El bloque'} ejecutó {len(statements)} sentencias (máximo {budget}):\n{detail}"
+        )
@@ -0,0 +1,356 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import List, Literal, Optional
+from app.auth import require_admin
+from app.schemas.admin import (
+    LogControlStatus,
+    LogOverrideRequest,
+    LoopMonitorStatus,
+    MemoryDiff,
+    MemorySnapshotInfo,
+    MemoryStatus,
+    ProfileInfo,
+    SlowQueryShape
+)
+from app.cache import record_cache
+from app.config.log_control import log_control
+from app.loop_monitor import loop_monitor
+from app.metrics import metrics
+from app.memory import memory_profiler
+from app.profiling import list_profiles, load_profile, render_folded, render_tree
+from app.slow_queries import slow_query_recorder
+from app.exceptions import (
+    ValidationError,
+    NotFoundError,
+    BaseCustomException,
+    map_exception_to_http
+)
+from app.config.logging import get_logger, get_logging_stats
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/logging", response_model=LogControlStatus)
+def read_log_control():
+    """
+    Cambios de logging activos en este worker.
+
+    Returns:
+        Nivel configurado y, por logger, nivel efectivo, muestreo y segundos hasta revertir
+    """
+    return log_control.status()
+
+@router.get("/logging/stats")
+def read_logging_stats():
+    """
+    Estado de la cola de logging de este worker.
+
+    Returns:
+        Tamaño de la cola y registros descartados por nivel
+    """
+    return get_logging_stats()
+
+@router.put("/logging/{logger_name}", response_model=LogControlStatus)
+def update_log_control(logger_name: str, override: LogOverrideRequest):
+    """
+    Cambiar temporalmente el nivel y/o el muestreo de un logger en todos los workers.
+
+    - **level**: Nivel temporal (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    - **sample_rate**: Fracción de los registros bajo WARNING que se escriben (0 a 1)
+    - **ttl_seconds**: Segundos hasta revertir el cambio (por defecto 900)
+
+    El cambio llega al resto de los workers en menos de LOG_CONTROL_POLL_INTERVAL segundos.
+
+    Args:
+        logger_name: Nombre del logger (ej: app.crud, app.routers, sqlalchemy.engine)
+        override: Cambio a aplicar
+
+    Returns:
+        Estado del control de logging luego del cambio
+
+    Raises:
+        HTTPException: Si no se indica ni nivel ni muestreo
+    """
+    try:
+        if override.level is None and override.sample_rate is None:
+            raise ValidationError(
+                "Se requiere level o sample_rate",
+                error_code="INVALID_LOG_OVERRIDE"
+            )
+
+        log_control.set_override(
+            logger_name,
+            level=override.level,
+            sample_rate=override.sample_rate,
+            ttl=override.ttl_seconds
+        )
+        return log_control.status()
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al ajustar logging: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al ajustar logging: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+@router.delete("/logging/{logger_name}", response_model=LogControlStatus)
+def delete_log_control(logger_name: str):
+    """
+    Revertir de inmediato el cambio de logging de un logger en todos los workers.
+
+    Args:
+        logger_name: Nombre del logger
+
+    Returns:
+        Estado del control de logging luego de revertir
+
+    Raises:
+        HTTPException: Si el logger no tiene un cambio activo
+    """
+    try:
+        if not log_control.clear_override(logger_name):
+            raise NotFoundError(
+                f"El logger {logger_name} no tiene cambios activos",
+                error_code="LOG_OVERRIDE_NOT_FOUND"
+            )
+        return log_control.status()
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al restaurar logging: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al restaurar logging: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+@router.get("/slow-queries", response_model=List[SlowQueryShape])
+def read_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: Literal["total_time", "max_time", "count"] = "total_time"
+):
+    """
+    Formas de sentencia más lentas registradas por este worker.
+
+    - **limit**: Cantidad máxima de resultados
+    - **order_by**: total_time (por defecto), max_time o count
+
+    Cada forma incluye la ejecución más lenta (parámetros ocultos, ID del
+    request) y, en PostgreSQL, el plan de su primera ocurrencia.
+
+    Returns:
+        Formas de sentencia ordenadas de forma descendente
+    """
+    return slow_query_recorder.top(limit=limit, order_by=order_by)
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries():
+    """
+    Vaciar el registro de consultas lentas de este worker.
+    """
+    slow_query_recorder.clear()
+
+@router.get("/profiles", response_model=List[ProfileInfo])
+def read_profiles():
+    """
+    Perfiles de requests guardados (del más reciente al más antiguo).
+
+    Un request se perfila enviando el header ``X-Profile: $ADMIN_TOKEN``; el
+    nombre del perfil vuelve en el header ``X-Profile-Id``.
+    """
+    return list_profiles()
+
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+def read_profile(
+    name: str,
+    format: Literal["tree", "folded"] = "tree",
+    min_percent: float = Query(1.0, ge=0, le=100)
+):
+    """
+    Contenido de un perfil guardado.
+
+    - **format**: tree (árbol de llamadas con porcentajes, por defecto) o
+      folded (pilas colapsadas para flamegraph.pl / speedscope)
+    - **min_percent**: En el árbol, omitir nodos por debajo de este porcentaje
+
+    Args:
+        name: Nombre del perfil (header X-Profile-Id)
+
+    Raises:
+        HTTPException: Si el perfil no existe
+    """
+    try:
+        stacks = load_profile(name)
+        if stacks is None:
+            raise NotFoundError(
+                f"Perfil {name} no encontrado",
+                error_code="PROFILE_NOT_FOUND"
+            )
+        if format == "folded":
+            return render_folded(stacks)
+        return render_tree(stacks, min_percent=min_percent)
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al leer perfil: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al leer perfil: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+@router.get("/memory", response_model=MemoryStatus)
+def read_memory(history: int = Query(60, ge=0, le=10000)):
+    """
+    Memoria de este worker: RSS y GC actuales, historial, estado de tracemalloc y snapshots.
+
+    - **history**: Cantidad de muestras recientes del historial (una cada MEMORY_SAMPLE_INTERVAL segundos)
+    """
+    return memory_profiler.status(history=history)
+
+@router.put("/memory/tracing", response_model=MemoryStatus)
+def start_memory_tracing(frames: Optional[int] = Query(None, ge=1, le=100)):
+    """
+    Activar tracemalloc en este worker.
+
+    Mientras está activo cada asignación cuesta más CPU y memoria: desactivarlo
+    al terminar el diagnóstico.
+
+    - **frames**: Marcos guardados por asignación (por defecto MEMORY_TRACE_FRAMES)
+    """
+    memory_profiler.start_tracing(frames)
+    return memory_profiler.status(history=0)
+
+@router.delete("/memory/tracing", response_model=MemoryStatus)
+def stop_memory_tracing():
+    """
+    Desactivar tracemalloc en este worker y descartar sus snapshots.
+    """
+    memory_profiler.stop_tracing()
+    return memory_profiler.status(history=0)
+
+@router.post("/memory/snapshots/{name}", response_model=MemorySnapshotInfo, status_code=status.HTTP_201_CREATED)
+def create_memory_snapshot(name: str = Path(..., regex=r"^[\w.-]{1,64}$")):
+    """
+    Tomar un snapshot de tracemalloc con nombre (reemplaza uno anterior con el mismo nombre).
+
+    Raises:
+        HTTPException: Si tracemalloc no está activo
+    """
+    try:
+        return memory_profiler.take_snapshot(name)
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al tomar snapshot de memoria: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al tomar snapshot de memoria: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+@router.delete("/memory/snapshots/{name}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_memory_snapshot(name: str):
+    """
+    Descartar un snapshot de tracemalloc.
+
+    Raises:
+        HTTPException: Si el snapshot no existe
+    """
+    try:
+        memory_profiler.delete_snapshot(name)
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al descartar snapshot de memoria: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al descartar snapshot de memoria: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+@router.get("/memory/diff", response_model=MemoryDiff)
+def read_memory_diff(
+    base: str,
+    target: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=500)
+):
+    """
+    Crecimiento de memoria entre dos snapshots, agrupado por archivo y línea de app/.
+
+    Las asignaciones hechas dentro de librerías (SQLAlchemy, logging, ...) se
+    atribuyen a la línea de app/ más cercana en su traza.
+
+    - **base**: Snapshot de referencia
+    - **target**: Snapshot a comparar (por defecto, el estado actual)
+    - **limit**: Cantidad de líneas, de mayor a menor crecimiento
+
+    Raises:
+        HTTPException: Si algún snapshot no existe o tracemalloc no está activo
+    """
+    try:
+        return memory_profiler.diff(base, target, limit=limit)
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al comparar snapshots de memoria: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al comparar snapshots de memoria: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+@router.get("/cache/stats")
+def read_cache_stats():
+    """
+    Estadísticas de la cache de registros de este worker (aciertos por nivel y entidad).
+
+    Returns:
+        Contadores y ratios de aciertos por entidad
+    """
+    return record_cache.snapshot()
+
+@router.get("/crud/stats")
+def read_crud_stats():
+    """
+    Duración de las operaciones CRUD de este worker.
+
+    Returns:
+        Histograma y percentiles estimados por función
+    """
+    return metrics.snapshot("crud_duration_seconds")
+
+@router.get("/event-loop", response_model=LoopMonitorStatus)
+def read_event_loop():
+    """
+    Lag del loop de eventos de este worker y bloqueos recientes con la pila que los causó.
+
+    Raises:
+        HTTPException: Si el monitor está deshabilitado (LOOP_MONITOR_ENABLED=false)
+    """
+    try:
+        if loop_monitor is None:
+            raise NotFoundError(
+                "El monitor del loop de eventos está deshabilitado",
+                error_code="LOOP_MONITOR_DISABLED"
+            )
+        return loop_monitor.status()
+
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al consultar el loop de eventos: {e.message}")
+        raise map_exception_to_http(e)
+    except Exception as e:
+        logger.error(f"Error inesperado al consultar el loop de eventos: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models.estudiante import Estudiante
 from app.schemas.bloqueo import BloqueoCreate, BloqueoResponse, BloqueoUpdate
@@ -13,6 +13,15 @@ from app.exceptions import (
     map_exception_to_http
 )
 from app.config.logging import get_logger
+from app.serializers import RawJSONResponse, parse_fields, render_object, render_rows
+from app.etag import (
+    CACHE_CONTROL_PUBLIC,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+    parse_if_match,
+    set_cache_headers
+)
 
 logger = get_logger(__name__)
 
@@ -96,17 +105,27 @@ def read_bloqueos_estudiante(
 @router.get("/{codigo_bloqueo}", response_model=BloqueoResponse)
 def read_bloqueo(
     codigo_bloqueo: str, 
+    response: Response,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Obtener un bloqueo específico por su código.
     
+    Si el header If-None-Match coincide con la versión actual se responde 304
+    consultando solo la versión de la fila, sin cargar ni serializar el bloqueo.
+    Con ``fields`` solo se cargan y serializan los campos pedidos.
+    
     Args:
         codigo_bloqueo: Código único del bloqueo
+        response: Respuesta HTTP (para headers de cache)
+        fields: Campos a incluir separados por comas, por ejemplo "codigo_bloqueo,descripcion"
+        if_none_match: ETag conocido por el cliente
         db: Sesión de base de datos
         
     Returns:
-        Información del bloqueo
+        Información del bloqueo, o 304 si el cliente tiene la versión actual
         
     Raises:
         HTTPException: Si no se encuentra el bloqueo o ocurre un error
@@ -114,12 +133,31 @@ def read_bloqueo(
     try:
         logger.info(f"Obteniendo bloqueo: {codigo_bloqueo}")
         
-        db_bloqueo = crud_bloqueo.get_bloqueo(db, codigo_bloqueo)
+        keys = parse_fields(fields, crud_bloqueo.SCHEMA_KEYS)
+        if if_none_match:
+            version = crud_bloqueo.get_bloqueo_version(db, codigo_bloqueo)
+            if version is None:
+                logger.warning(f"Bloqueo no encontrado: {codigo_bloqueo}")
+                raise BloqueoNotFoundError(bloqueo_id=None)
+            
+            etag = make_etag(version, keys)
+            if etag_matches(if_none_match, etag):
+                logger.info(f"Bloqueo sin cambios: {codigo_bloqueo}")
+                return not_modified_response(etag, CACHE_CONTROL_PUBLIC)
+        
+        db_bloqueo = crud_bloqueo.get_bloqueo(db, codigo_bloqueo, fields=keys)
         if not db_bloqueo:
             logger.warning(f"Bloqueo no encontrado: {codigo_bloqueo}")
             raise BloqueoNotFoundError(bloqueo_id=None)
         
         logger.info(f"Bloqueo obtenido exitosamente: {codigo_bloqueo}")
+        etag = make_etag(db_bloqueo.version, keys)
+        if keys:
+            partial = RawJSONResponse(render_object(keys, db_bloqueo))
+            set_cache_headers(partial, etag, CACHE_CONTROL_PUBLIC)
+            return partial
+        
+        set_cache_headers(response, etag, CACHE_CONTROL_PUBLIC)
         return db_bloqueo
         
     except BaseCustomException as e:
@@ -136,21 +174,28 @@ def read_bloqueo(
 def update_bloqueo(
     codigo_bloqueo: str, 
     bloqueo_update: BloqueoUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Actualizar un bloqueo existente.
     
+    Si se envía el header If-Match con el ETag del bloqueo, la actualización
+    solo se aplica cuando la versión no cambió; en caso contrario se responde 412.
+    
     Args:
         codigo_bloqueo: Código único del bloqueo
         bloqueo_update: Datos a actualizar
+        response: Respuesta HTTP (para el nuevo ETag)
+        if_match: ETag conocido por el cliente
         db: Sesión de base de datos
         
     Returns:
         Bloqueo actualizado
         
     Raises:
-        HTTPException: Si no se encuentra el bloqueo o ocurre un error
+        HTTPException: Si no se encuentra el bloqueo, la versión no coincide o ocurre un error
         
     Note:
         Este endpoint debería estar protegido para administradores.
@@ -159,7 +204,10 @@ def update_bloqueo(
         logger.info(f"Actualizando bloqueo: {codigo_bloqueo}")
         
         # Usar CRUD que maneja las validaciones
-        db_bloqueo = crud_bloqueo.update_bloqueo(db, codigo_bloqueo, bloqueo_update)
+        db_bloqueo = crud_bloqueo.update_bloqueo(
+            db, codigo_bloqueo, bloqueo_update, expected_version=parse_if_match(if_match)
+        )
+        set_cache_headers(response, make_etag(db_bloqueo.version), CACHE_CONTROL_PUBLIC)
         
         logger.info(f"Bloqueo actualizado exitosamente: {codigo_bloqueo}")
         return db_bloqueo
@@ -175,13 +223,19 @@ def update_bloqueo(
         )
 
 @router.get("/", response_model=List[BloqueoResponse])
-def read_bloqueos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_bloqueos(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """
     Obtener lista de bloqueos con paginación.
     
     Args:
         skip: Número de registros a omitir
         limit: Máximo número de registros a retornar
+        fields: Campos a incluir separados por comas (opcional)
         db: Sesión de base de datos
         
     Returns:
@@ -196,10 +250,12 @@ def read_bloqueos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
     try:
         logger.info(f"Obteniendo lista de bloqueos con skip={skip}, limit={limit}")
         
-        bloqueos = crud_bloqueo.get_bloqueos(db, skip, limit)
+        # Camino rápido: filas con solo las columnas de la respuesta, codificadas directamente a JSON
+        keys = parse_fields(fields, crud_bloqueo.SCHEMA_KEYS)
+        rows = crud_bloqueo.get_bloqueos_rows(db, skip, limit, fields=keys)
         
-        logger.info(f"Se obtuvieron {len(bloqueos)} bloqueos")
-        return bloqueos
+        logger.info(f"Se obtuvieron {len(rows)} bloqueos")
+        return RawJSONResponse(render_rows(keys or crud_bloqueo.SCHEMA_KEYS, rows))
         
     except BaseCustomException as e:
         logger.warning(f"Error controlado al obtener bloqueos: {e.message}")
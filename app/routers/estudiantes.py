@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.schemas.estudiante import EstudianteCreate, EstudianteResponse, EstudianteUpdate
 from app.models.estudiante import Estudiante
@@ -14,6 +14,16 @@ from app.exceptions import (
     map_exception_to_http
 )
 from app.config.logging import get_logger
+from app.serializers import RawJSONResponse, parse_fields, render_object, render_rows
+from app.etag import (
+    CACHE_CONTROL_PRIVATE,
+    CACHE_CONTROL_PUBLIC,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+    parse_if_match,
+    set_cache_headers
+)
 
 logger = get_logger(__name__)
 
@@ -54,20 +64,44 @@ def create_estudiante(estudiante: EstudianteCreate, db: Session = Depends(get_db
         )
 
 @router.get("/me", response_model=EstudianteResponse)
-def read_estudiante_me(current_user: Estudiante = Depends(get_current_user)):
+def read_estudiante_me(
+    response: Response,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Estudiante = Depends(get_current_user)
+):
     """
     Obtener información del estudiante autenticado.
     
     Args:
+        response: Respuesta HTTP (para headers de cache)
+        fields: Campos a incluir separados por comas (opcional)
+        if_none_match: ETag conocido por el cliente
         current_user: Usuario autenticado actual
         
     Returns:
-        Información del estudiante autenticado
+        Información del estudiante autenticado, o 304 si el cliente tiene la versión actual
     """
     try:
         logger.info(f"Obteniendo información del estudiante autenticado: {current_user.registro_academico}")
+        
+        keys = parse_fields(fields, crud_estudiante.SCHEMA_KEYS)
+        etag = make_etag(current_user.version, keys)
+        if etag_matches(if_none_match, etag):
+            logger.info(f"Estudiante autenticado sin cambios: {current_user.registro_academico}")
+            return not_modified_response(etag, CACHE_CONTROL_PRIVATE)
+        
+        if keys:
+            partial = RawJSONResponse(render_object(keys, current_user))
+            set_cache_headers(partial, etag, CACHE_CONTROL_PRIVATE)
+            return partial
+        
+        set_cache_headers(response, etag, CACHE_CONTROL_PRIVATE)
         return current_user
         
+    except BaseCustomException as e:
+        logger.warning(f"Error controlado al obtener estudiante autenticado: {e.message}")
+        raise map_exception_to_http(e)
     except Exception as e:
         logger.error(f"Error al obtener información del estudiante autenticado: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -76,16 +110,29 @@ def read_estudiante_me(current_user: Estudiante = Depends(get_current_user)):
         )
 
 @router.get("/{registro_academico}", response_model=EstudianteResponse)
-def read_estudiante(registro_academico: str, db: Session = Depends(get_db)):
+def read_estudiante(
+    registro_academico: str,
+    response: Response,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Obtener un estudiante por su registro académico.
     
+    Si el header If-None-Match coincide con la versión actual se responde 304
+    consultando solo la versión de la fila, sin cargar ni serializar el estudiante.
+    Con ``fields`` solo se cargan y serializan los campos pedidos.
+    
     Args:
         registro_academico: Registro académico del estudiante
+        response: Respuesta HTTP (para headers de cache)
+        fields: Campos a incluir separados por comas, por ejemplo "registro_academico,nombre,correo"
+        if_none_match: ETag conocido por el cliente
         db: Sesión de base de datos
         
     Returns:
-        Información del estudiante
+        Información del estudiante, o 304 si el cliente tiene la versión actual
         
     Raises:
         HTTPException: Si no se encuentra el estudiante o ocurre un error
@@ -93,12 +140,31 @@ def read_estudiante(registro_academico: str, db: Session = Depends(get_db)):
     try:
         logger.info(f"Obteniendo estudiante: {registro_academico}")
         
-        db_estudiante = crud_estudiante.get_estudiante(db, registro_academico)
+        keys = parse_fields(fields, crud_estudiante.SCHEMA_KEYS)
+        if if_none_match:
+            version = crud_estudiante.get_estudiante_version(db, registro_academico)
+            if version is None:
+                logger.warning(f"Estudiante no encontrado: {registro_academico}")
+                raise EstudianteNotFoundError(registro_academico=registro_academico)
+            
+            etag = make_etag(version, keys)
+            if etag_matches(if_none_match, etag):
+                logger.info(f"Estudiante sin cambios: {registro_academico}")
+                return not_modified_response(etag, CACHE_CONTROL_PUBLIC)
+        
+        db_estudiante = crud_estudiante.get_estudiante(db, registro_academico, fields=keys)
         if not db_estudiante:
             logger.warning(f"Estudiante no encontrado: {registro_academico}")
             raise EstudianteNotFoundError(registro_academico=registro_academico)
         
         logger.info(f"Estudiante encontrado: {registro_academico}")
+        etag = make_etag(db_estudiante.version, keys)
+        if keys:
+            partial = RawJSONResponse(render_object(keys, db_estudiante))
+            set_cache_headers(partial, etag, CACHE_CONTROL_PUBLIC)
+            return partial
+        
+        set_cache_headers(response, etag, CACHE_CONTROL_PUBLIC)
         return db_estudiante
         
     except BaseCustomException as e:
@@ -112,13 +178,19 @@ def read_estudiante(registro_academico: str, db: Session = Depends(get_db)):
         )
 
 @router.get("/", response_model=List[EstudianteResponse])
-def read_estudiantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_estudiantes(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """
     Obtener lista de estudiantes con paginación.
     
     Args:
         skip: Número de registros a omitir
         limit: Máximo número de registros a retornar
+        fields: Campos a incluir separados por comas (opcional)
         db: Sesión de base de datos
         
     Returns:
@@ -130,10 +202,12 @@ def read_estudiantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_
     try:
         logger.info(f"Obteniendo lista de estudiantes con skip={skip}, limit={limit}")
         
-        estudiantes = crud_estudiante.get_estudiantes(db, skip, limit)
+        # Camino rápido: filas con solo las columnas de la respuesta, codificadas directamente a JSON
+        keys = parse_fields(fields, crud_estudiante.SCHEMA_KEYS)
+        rows = crud_estudiante.get_estudiantes_rows(db, skip, limit, fields=keys)
         
-        logger.info(f"Se obtuvieron {len(estudiantes)} estudiantes")
-        return estudiantes
+        logger.info(f"Se obtuvieron {len(rows)} estudiantes")
+        return RawJSONResponse(render_rows(keys or crud_estudiante.SCHEMA_KEYS, rows))
         
     except BaseCustomException as e:
         logger.warning(f"Error controlado al obtener estudiantes: {e.message}")
@@ -149,15 +223,22 @@ def read_estudiantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_
 def update_estudiante(
     registro_academico: str, 
     estudiante_update: EstudianteUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Estudiante = Depends(get_current_user)
 ):
     """
     Actualizar información de un estudiante.
     
+    Si se envía el header If-Match con el ETag del estudiante, la actualización
+    solo se aplica cuando la versión no cambió; en caso contrario se responde 412.
+    
     Args:
         registro_academico: Registro académico del estudiante a actualizar
         estudiante_update: Datos a actualizar
+        response: Respuesta HTTP (para el nuevo ETag)
+        if_match: ETag conocido por el cliente
         db: Sesión de base de datos
         current_user: Usuario autenticado actual
         
@@ -165,7 +246,7 @@ def update_estudiante(
         Estudiante actualizado
         
     Raises:
-        HTTPException: Si no se encuentra el estudiante, no tiene permisos o ocurre un error
+        HTTPException: Si no se encuentra el estudiante, no tiene permisos, la versión no coincide o ocurre un error
     """
     try:
         logger.info(f"Actualizando estudiante: {registro_academico} por usuario: {current_user.registro_academico}")
@@ -175,7 +256,10 @@ def update_estudiante(
             logger.warning(f"Usuario {current_user.registro_academico} intentó actualizar estudiante {registro_academico}")
             raise InsufficientPermissionsError("actualizar datos de otro estudiante")
         
-        db_estudiante = crud_estudiante.update_estudiante(db, registro_academico, estudiante_update)
+        db_estudiante = crud_estudiante.update_estudiante(
+            db, registro_academico, estudiante_update, expected_version=parse_if_match(if_match)
+        )
+        set_cache_headers(response, make_etag(db_estudiante.version), CACHE_CONTROL_PRIVATE)
         
         logger.info(f"Estudiante actualizado exitosamente: {registro_academico}")
         return db_estudiante
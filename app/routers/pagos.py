@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models.estudiante import Estudiante
 from app.schemas.pago import PagoCreate, PagoResponse
@@ -14,6 +14,14 @@ from app.exceptions import (
     map_exception_to_http
 )
 from app.config.logging import get_logger
+from app.serializers import RawJSONResponse, parse_fields, render_object, render_rows
+from app.etag import (
+    CACHE_CONTROL_PRIVATE,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+    set_cache_headers
+)
 
 logger = get_logger(__name__)
 
@@ -103,19 +111,29 @@ def read_pagos_estudiante(
 @router.get("/{codigo_pago}", response_model=PagoResponse)
 def read_pago(
     codigo_pago: str, 
+    response: Response,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Estudiante = Depends(get_current_user)
 ):
     """
     Obtener un pago específico por su código.
     
+    Si el header If-None-Match coincide con la versión actual se responde 304
+    consultando solo la versión de la fila, sin cargar ni serializar el pago.
+    Con ``fields`` solo se cargan y serializan los campos pedidos.
+    
     Args:
         codigo_pago: Código único del pago
+        response: Respuesta HTTP (para headers de cache)
+        fields: Campos a incluir separados por comas, por ejemplo "codigo_pago,monto"
+        if_none_match: ETag conocido por el cliente
         db: Sesión de base de datos
         current_user: Usuario autenticado actual
         
     Returns:
-        Información del pago
+        Información del pago, o 304 si el cliente tiene la versión actual
         
     Raises:
         HTTPException: Si no se encuentra el pago, no tiene permisos o ocurre un error
@@ -123,7 +141,24 @@ def read_pago(
     try:
         logger.info(f"Obteniendo pago: {codigo_pago} por usuario: {current_user.registro_academico}")
         
-        db_pago = crud_pago.get_pago(db, codigo_pago)
+        keys = parse_fields(fields, crud_pago.SCHEMA_KEYS)
+        if if_none_match:
+            pago_version = crud_pago.get_pago_version(db, codigo_pago)
+            if pago_version is None:
+                logger.warning(f"Pago no encontrado: {codigo_pago}")
+                raise PagoNotFoundError(pago_id=None)
+            
+            owner, version = pago_version
+            if current_user.registro_academico != owner:
+                logger.warning(f"Usuario {current_user.registro_academico} intentó acceder al pago {codigo_pago} de otro estudiante")
+                raise InsufficientPermissionsError("ver pago de otro estudiante")
+            
+            etag = make_etag(version, keys)
+            if etag_matches(if_none_match, etag):
+                logger.info(f"Pago sin cambios: {codigo_pago}")
+                return not_modified_response(etag, CACHE_CONTROL_PRIVATE)
+        
+        db_pago = crud_pago.get_pago(db, codigo_pago, fields=keys)
         if not db_pago:
             logger.warning(f"Pago no encontrado: {codigo_pago}")
             raise PagoNotFoundError(pago_id=None)
@@ -134,6 +169,13 @@ def read_pago(
             raise InsufficientPermissionsError("ver pago de otro estudiante")
         
         logger.info(f"Pago obtenido exitosamente: {codigo_pago}")
+        etag = make_etag(db_pago.version, keys)
+        if keys:
+            partial = RawJSONResponse(render_object(keys, db_pago))
+            set_cache_headers(partial, etag, CACHE_CONTROL_PRIVATE)
+            return partial
+        
+        set_cache_headers(response, etag, CACHE_CONTROL_PRIVATE)
         return db_pago
         
     except BaseCustomException as e:
@@ -147,13 +189,19 @@ def read_pago(
         )
 
 @router.get("/", response_model=List[PagoResponse])
-def read_pagos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_pagos(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     """
     Obtener lista de pagos con paginación.
     
     Args:
         skip: Número de registros a omitir
         limit: Máximo número de registros a retornar
+        fields: Campos a incluir separados por comas (opcional)
         db: Sesión de base de datos
         
     Returns:
@@ -166,10 +214,12 @@ def read_pagos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
         logger.info(f"Obteniendo lista de pagos con skip={skip}, limit={limit}")
         
         # Endpoint para administradores - por ahora público
-        pagos = crud_pago.get_pagos(db, skip, limit)
+        # Camino rápido: filas con solo las columnas de la respuesta, codificadas directamente a JSON
+        keys = parse_fields(fields, crud_pago.SCHEMA_KEYS)
+        rows = crud_pago.get_pagos_rows(db, skip, limit, fields=keys)
         
-        logger.info(f"Se obtuvieron {len(pagos)} pagos")
-        return pagos
+        logger.info(f"Se obtuvieron {len(rows)} pagos")
+        return RawJSONResponse(render_rows(keys or crud_pago.SCHEMA_KEYS, rows))
         
     except BaseCustomException as e:
         logger.warning(f"Error controlado al obtener pagos: {e.message}")
@@ -0,0 +1,101 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+# Esquemas para administración
+LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+class LogOverrideRequest(BaseModel):
+    level: Optional[LogLevel] = Field(None, description="Nivel temporal del logger")
+    sample_rate: Optional[float] = Field(None, ge=0, le=1, description="Fracción de registros bajo WARNING que se escriben")
+    ttl_seconds: int = Field(900, ge=1, le=86400, description="Segundos hasta revertir el cambio")
+
+class LogOverrideStatus(BaseModel):
+    level: Optional[str] = None
+    effective_level: str
+    sample_rate: Optional[float] = None
+    expires_in: int
+
+class LogControlStatus(BaseModel):
+    configured_level: str
+    overrides: Dict[str, LogOverrideStatus]
+
+class SlowQueryShape(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+    last_seen: Optional[float] = None
+    slowest_request_id: Optional[str] = None
+    slowest_parameters: Optional[Any] = None
+    plan: Optional[str] = None
+
+class ProfileInfo(BaseModel):
+    name: str
+    size: int
+    created_at: float
+
+class GCGenerationStats(BaseModel):
+    generation: int
+    pending: int
+    collections: int
+    collected: int
+    uncollectable: int
+    pause_total_ms: float
+    pause_max_ms: float
+
+class MemorySample(BaseModel):
+    timestamp: float
+    rss_bytes: int
+    traced_bytes: Optional[int] = None
+    gc: List[GCGenerationStats]
+
+class TracingStatus(BaseModel):
+    enabled: bool
+    frames: Optional[int] = None
+    traced_bytes: int
+    peak_bytes: int
+    overhead_bytes: int
+
+class MemorySnapshotInfo(BaseModel):
+    name: str
+    taken_at: float
+    traces: int
+    size_bytes: int
+
+class MemoryStatus(BaseModel):
+    pid: int
+    current: MemorySample
+    history: List[MemorySample]
+    tracing: TracingStatus
+    snapshots: List[MemorySnapshotInfo]
+
+class MemoryDiffLine(BaseModel):
+    file: str
+    line: int
+    size_diff_bytes: int
+    size_bytes: int
+    count_diff: int
+    count: int
+
+class MemoryDiff(BaseModel):
+    base: str
+    target: str
+    size_diff_bytes: int
+    lines: List[MemoryDiffLine]
+
+class LoopBlockEvent(BaseModel):
+    detected_at: float
+    blocked_ms: float
+    duration_ms: Optional[float] = None
+    stack: List[str]
+
+class LoopMonitorStatus(BaseModel):
+    pid: int
+    running: bool
+    interval_ms: float
+    threshold_ms: float
+    lag_p50_ms: Optional[float] = None
+    lag_p99_ms: Optional[float] = None
+    blocked_total: int
+    recent_blocks: List[LoopBlockEvent]
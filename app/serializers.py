@@ -0,0 +1,107 @@
+"""
+Serialización rápida de listados: filas de columnas a JSON sin pasar por ORM ni Pydantic.
+"""
+
+import json
+from decimal import Decimal
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Response
+
+from app.exceptions import ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Convierte los tipos que el codificador JSON no soporta de forma nativa."""
+    # Igual que jsonable_encoder de FastAPI: Decimal se emite como número
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Codifica un valor a JSON en bytes, usando orjson si está disponible.
+
+    Args:
+        content: Valor a codificar
+
+    Returns:
+        JSON codificado en UTF-8
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_rows(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Codifica una lista de filas como un arreglo JSON de objetos.
+
+    Args:
+        keys: Nombres de los campos, en el mismo orden que las columnas de cada fila
+        rows: Filas (tuplas) obtenidas de la base de datos
+
+    Returns:
+        Arreglo JSON codificado en UTF-8
+    """
+    return dumps([dict(zip(keys, row)) for row in rows])
+
+
+def render_object(keys: Sequence[str], obj: Any) -> bytes:
+    """
+    Codifica los atributos indicados de un objeto como un objeto JSON.
+
+    Args:
+        keys: Nombres de los atributos a incluir, en orden
+        obj: Instancia ORM o fila con esos atributos
+
+    Returns:
+        Objeto JSON codificado en UTF-8
+    """
+    return dumps({key: getattr(obj, key) for key in keys})
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Interpreta el parámetro ``fields`` (lista separada por comas) de un endpoint de lectura.
+
+    Args:
+        fields: Valor del parámetro, por ejemplo "registro_academico,nombre"
+        allowed: Campos que expone el esquema de respuesta, en su orden
+
+    Returns:
+        Campos pedidos en el orden del esquema, o None si no se pidió un subconjunto
+
+    Raises:
+        ValidationError: Si se pide un campo que el esquema no expone
+    """
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        return None
+
+    invalid = sorted(requested.difference(allowed))
+    if invalid:
+        raise ValidationError(
+            message=f"Campos no válidos: {', '.join(invalid)}",
+            error_code="INVALID_FIELDS",
+            details={"invalid_fields": invalid, "allowed_fields": list(allowed)}
+        )
+    return tuple(name for name in allowed if name in requested)
+
+
+class RawJSONResponse(Response):
+    """Respuesta JSON cuyo cuerpo ya viene codificado en bytes."""
+
+    media_type = "application/json"
@@ -0,0 +1,250 @@
+"""
+Lanzador de producción.
+
+    python -m app.server
+
+- Abre el socket de escucha y carga la aplicación en el proceso padre, hace
+  ``gc.freeze()`` y recién entonces crea los workers con ``fork``. El código y
+  los objetos importados quedan compartidos copy-on-write, y el GC de los
+  workers no los recorre (recorrerlos tocaría sus páginas y las duplicaría).
+- Un worker por CPU disponible (afinidad y cuota del cgroup del contenedor),
+  o WEB_CONCURRENCY.
+- uvloop y httptools si están instalados; si no, asyncio y h11.
+- Con SIGTERM o SIGINT los workers dejan de aceptar conexiones y terminan los
+  requests en curso (hasta SERVER_GRACEFUL_TIMEOUT segundos) antes de salir.
+  Un worker que muere inesperadamente se reemplaza por otro.
+
+Variables: HOST, PORT, WEB_CONCURRENCY, SERVER_BACKLOG,
+SERVER_KEEPALIVE_TIMEOUT, SERVER_GRACEFUL_TIMEOUT.
+"""
+
+import gc
+import glob
+import importlib.util
+import math
+import os
+import signal
+import socket
+import tempfile
+import time
+from typing import Dict, Optional
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.metrics import enable_multiprocess
+
+logger = get_logger(__name__)
+
+settings = get_settings()
+
+HOST = settings.host
+PORT = settings.port
+# Conexiones pendientes de accept() que el kernel encola antes de rechazar
+BACKLOG = settings.server_backlog
+# Mayor que el tiempo de inactividad del balanceador (60 s en los más comunes),
+# para que nunca sea el servidor el que cierra una conexión que el balanceador reutiliza
+KEEPALIVE_TIMEOUT = settings.server_keepalive_timeout
+GRACEFUL_TIMEOUT = settings.server_graceful_timeout
+# Un worker que muere antes de este tiempo se reemplaza con una pausa, para no reiniciar en bucle
+MIN_WORKER_LIFETIME = 1.0
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPUs permitidas por la cuota del cgroup (contenedores), o None sin cuota."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r") as f:
+            quota, period = f.read().split()
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs que el proceso puede usar de verdad: afinidad y cuota del cgroup."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def best_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def best_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def prepare_metrics_dir(workers: int) -> None:
+    """
+    Con varios workers, /metrics tiene que sumar los de todos: usa
+    METRICS_MULTIPROC_DIR (o un directorio temporal) y lo vacía de los
+    archivos de un despliegue anterior. Debe llamarse antes de importar la app.
+    """
+    directory = settings.metrics_multiproc_dir
+    if directory is None:
+        if workers == 1:
+            return
+        directory = os.path.join(tempfile.gettempdir(), "estudiantil-metrics")
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "metrics_*.json*")):
+        os.remove(path)
+    # app.metrics ya se importó junto con el logging: el directorio se le pasa explícitamente
+    enable_multiprocess(directory)
+
+
+class PreforkServer:
+    """
+    Proceso padre: comparte el socket con los workers, los reemplaza si
+    mueren y coordina el apagado ordenado.
+
+    Args:
+        config: Configuración de uvicorn con la app ya importada
+        sock: Socket de escucha compartido
+        workers: Cantidad de workers
+    """
+
+    def __init__(self, config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self._children: Dict[int, float] = {}  # pid -> momento de inicio
+        self._stopping = False
+
+    def spawn_worker(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self._children[pid] = time.monotonic()
+        logger.info(f"Worker {pid} iniciado")
+
+    def _run_worker(self) -> None:
+        import uvicorn
+        from app.database import engine
+
+        # Grupo de procesos propio: Ctrl+C en la terminal le llega solo al padre, que
+        # reenvía un único SIGTERM (un segundo SIGTERM haría que uvicorn corte sin esperar)
+        os.setpgid(0, 0)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        # Las conexiones que abrió el padre al importar la app no se comparten entre procesos
+        engine.dispose(close=False)
+        exit_code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[self.sock])
+        except BaseException:
+            logger.error(f"Worker {os.getpid()} terminó con error", exc_info=True)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _reap(self) -> None:
+        """Recoge los workers terminados y reemplaza los que murieron fuera del apagado."""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if pid == 0:
+                return
+            started = self._children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            logger.error(f"Worker {pid} terminó inesperadamente (estado {os.waitstatus_to_exitcode(status)}); se reemplaza")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            self.spawn_worker()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for _ in range(self.workers):
+            self.spawn_worker()
+
+        while not self._stopping:
+            self._reap()
+            time.sleep(0.5)
+
+        logger.info(f"Apagando: esperando hasta {GRACEFUL_TIMEOUT}s a que terminen los requests en curso")
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._children):
+            logger.warning(f"Worker {pid} no terminó a tiempo; se fuerza la salida")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.sock.close()
+        logger.info("Servidor detenido")
+
+
+def main() -> None:
+    workers = settings.web_concurrency or available_cpus()
+    if workers > 1 and settings.log_file and settings.log_rotation == "size":
+        logger.warning(
+            "LOG_ROTATION=size con varios workers: cada uno rota los mismos archivos y se pierden registros; "
+            "usar LOG_ROTATION=external con logrotate"
+        )
+    prepare_metrics_dir(workers)
+    sock = bind_socket(HOST, PORT, BACKLOG)
+
+    import uvicorn
+    from app.main import app
+
+    config = uvicorn.Config(
+        app,
+        loop=best_loop(),
+        http=best_http(),
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        # RequestPipelineMiddleware ya registra cada request
+        access_log=False,
+    )
+    # Todo lo importado hasta acá queda fuera del GC en los workers
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        f"Escuchando en {HOST}:{PORT} con {workers} workers "
+        f"(loop {config.loop}, http {config.http}, backlog {BACKLOG}, keep-alive {KEEPALIVE_TIMEOUT}s)"
+    )
+    PreforkServer(config, sock, workers).run()
+
+
+if __name__ == "__main__":
+    main()
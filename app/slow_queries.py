@@ -0,0 +1,227 @@
+"""
+Registro de consultas lentas.
+
+Cada sentencia que supera SLOW_QUERY_THRESHOLD_MS se escribe en database.log
+con su duración, sus parámetros (con los valores sensibles ocultos) y el ID
+del request, y se acumula por forma de sentencia para consultar las más
+lentas en ``GET /admin/slow-queries``.
+
+En PostgreSQL, la primera vez que una forma de sentencia resulta lenta se
+pide su plan con ``EXPLAIN (ANALYZE off)`` desde un hilo de fondo (el request
+no espera) y el plan también se escribe en database.log.
+"""
+
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.metrics import metrics
+from app.middleware import get_request_id
+
+# Hijo de app.database: sus registros llegan al handler de database.log
+logger = get_logger("app.database.slow_queries")
+
+# Nombres de parámetros cuyos valores nunca se registran
+SENSITIVE_PARAM_PATTERN = re.compile(r"contrasena|password|passwd|secret|token|hash", re.IGNORECASE)
+# Valores que son hashes bcrypt aunque el parámetro sea posicional
+BCRYPT_HASH_PATTERN = re.compile(r"^\$2[abxy]?\$\d{2}\$")
+MAX_PARAM_LENGTH = 100
+
+
+def _redact_value(value: Any) -> Any:
+    if isinstance(value, str):
+        if BCRYPT_HASH_PATTERN.match(value):
+            return "***"
+        return value if len(value) <= MAX_PARAM_LENGTH else f"{value[:MAX_PARAM_LENGTH]}..."
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Copia de los parámetros de una sentencia apta para el log.
+
+    Args:
+        parameters: Parámetros DBAPI (dict, tupla, o lista de ellos en executemany)
+        executemany: Si la sentencia se ejecutó para varias filas
+
+    Returns:
+        Parámetros con valores sensibles reemplazados por ``***`` y textos largos truncados
+    """
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": redact_parameters(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {
+            key: "***" if SENSITIVE_PARAM_PATTERN.search(str(key)) else _redact_value(value)
+            for key, value in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return parameters
+
+
+def statement_shape(statement: str) -> str:
+    """Sentencia con los espacios normalizados (los valores ya son parámetros ligados)."""
+    return " ".join(statement.split())
+
+
+class SlowQueryRecorder:
+    """Consultas lentas agrupadas por forma de sentencia, con EXPLAIN opcional."""
+
+    def __init__(
+        self,
+        threshold: float = 0.2,
+        max_shapes: int = 500,
+        explain: bool = True,
+        explain_queue_size: int = 100
+    ):
+        self.threshold = threshold
+        self.max_shapes = max_shapes
+        self.explain = explain
+        self._shapes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._explain_queue: "queue.Queue" = queue.Queue(maxsize=explain_queue_size)
+        self._explain_thread: Optional[threading.Thread] = None
+        self._engine = None
+        self._slow_total = metrics.counter("db_slow_queries_total", help="Sentencias que superaron SLOW_QUERY_THRESHOLD_MS")
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def attach(self, engine) -> None:
+        """
+        Activa el registro para el engine (requiere instrument_engine).
+
+        Args:
+            engine: Engine de SQLAlchemy instrumentado
+        """
+        from app.query_stats import add_statement_observer
+
+        self._engine = engine
+        if self.enabled:
+            add_statement_observer(self.observe)
+
+    def observe(self, conn, statement: str, parameters: Any, executemany: bool, duration: float) -> None:
+        if duration < self.threshold:
+            return
+        if conn.info.get("explaining"):
+            return
+        shape = statement_shape(statement)
+        request_id = get_request_id()
+        redacted = redact_parameters(parameters, executemany)
+        self._slow_total.inc()
+
+        with self._lock:
+            entry = self._shapes.get(shape)
+            first_occurrence = entry is None
+            if first_occurrence:
+                entry = self._shapes[shape] = {
+                    "count": 0, "total_time": 0.0, "max_time": 0.0,
+                    "last_seen": None, "slowest_request_id": None, "slowest_parameters": None,
+                    "plan": None,
+                }
+                while len(self._shapes) > self.max_shapes:
+                    self._shapes.popitem(last=False)
+            self._shapes.move_to_end(shape)
+            entry["count"] += 1
+            entry["total_time"] += duration
+            entry["last_seen"] = time.time()
+            if duration >= entry["max_time"]:
+                entry["max_time"] = duration
+                entry["slowest_request_id"] = request_id
+                entry["slowest_parameters"] = redacted
+
+        logger.warning(
+            f"Consulta lenta ({duration * 1000:.1f} ms): {shape[:1000]} - parámetros: {redacted}",
+            extra={"request_id": request_id, "duration": duration}
+        )
+
+        if first_occurrence and self.explain and conn.dialect.name == "postgresql" and not executemany:
+            try:
+                self._explain_queue.put_nowait((shape, statement, parameters))
+            except queue.Full:
+                logger.debug(f"Cola de EXPLAIN llena, se omite: {shape[:200]}")
+            else:
+                self._ensure_explain_thread()
+
+    def top(self, limit: int = 20, order_by: str = "total_time") -> List[Dict[str, Any]]:
+        """
+        Formas de sentencia más lentas de este worker.
+
+        Args:
+            limit: Cantidad máxima de resultados
+            order_by: total_time, max_time o count
+
+        Returns:
+            Lista ordenada de forma descendente por `order_by`
+        """
+        with self._lock:
+            items = [(shape, dict(entry)) for shape, entry in self._shapes.items()]
+        items.sort(key=lambda item: item[1][order_by], reverse=True)
+        return [
+            {
+                "statement": shape,
+                "count": entry["count"],
+                "total_ms": round(entry["total_time"] * 1000, 1),
+                "avg_ms": round(entry["total_time"] / entry["count"] * 1000, 1),
+                "max_ms": round(entry["max_time"] * 1000, 1),
+                "last_seen": entry["last_seen"],
+                "slowest_request_id": entry["slowest_request_id"],
+                "slowest_parameters": entry["slowest_parameters"],
+                "plan": entry["plan"],
+            }
+            for shape, entry in items[:limit]
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+    def _ensure_explain_thread(self) -> None:
+        if self._explain_thread is not None and self._explain_thread.is_alive():
+            return
+        with self._lock:
+            if self._explain_thread is None or not self._explain_thread.is_alive():
+                self._explain_thread = threading.Thread(target=self._explain_worker, name="slow-query-explain", daemon=True)
+                self._explain_thread.start()
+
+    def _explain_worker(self) -> None:
+        while True:
+            shape, statement, parameters = self._explain_queue.get()
+            try:
+                plan = self._run_explain(statement, parameters)
+            except Exception as e:
+                logger.warning(f"No se pudo obtener el plan de: {shape[:200]} - {str(e)}")
+                continue
+            with self._lock:
+                entry = self._shapes.get(shape)
+                if entry is not None:
+                    entry["plan"] = plan
+            logger.info(f"Plan de ejecución de consulta lenta: {shape[:1000]}\n{plan}")
+
+    def _run_explain(self, statement: str, parameters: Any) -> str:
+        with self._engine.connect() as conn:
+            # Las sentencias EXPLAIN no se vuelven a registrar como lentas
+            conn.info["explaining"] = True
+            try:
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE off) {statement}", parameters).fetchall()
+            finally:
+                conn.info.pop("explaining", None)
+        return "\n".join(row[0] for row in rows)
+
+
+slow_query_recorder = SlowQueryRecorder(
+    threshold=get_settings().slow_query_threshold_ms / 1000,
+    max_shapes=get_settings().slow_query_max_shapes,
+    explain=get_settings().slow_query_explain
+)
@@ -0,0 +1,145 @@
+"""
+Grabación de tráfico real.
+
+Con TRAFFIC_RECORD_FILE definido, RequestPipelineMiddleware agrega una línea
+JSON por request (o por una fracción TRAFFIC_RECORD_SAMPLE_RATE de ellos) con
+el momento de inicio, método, plantilla de ruta, parámetros de ruta y de
+consulta con los valores sensibles ocultos, status, duración, sentencias SQL
+y si el request venía autenticado. No se graban headers ni cuerpos.
+
+La ruta concreta (``/estudiantes/RA000001``) no se graba: lleva los mismos
+identificadores que se ocultan en los parámetros. ``benchmarks.replay`` la
+reconstruye con la plantilla y los parámetros. TRAFFIC_RECORD_RAW_PATH=true
+la agrega tal cual, solo para grabaciones sobre datos de prueba.
+
+Cada línea se escribe con un único ``os.write`` sobre un descriptor abierto
+con O_APPEND, así varios workers pueden compartir el archivo sin mezclar
+líneas. ``python -m benchmarks.replay`` reproduce una grabación.
+"""
+
+import json
+import os
+import random
+import re
+from typing import Dict, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from app.config.logging import get_logger
+from app.config.settings import get_settings
+from app.slow_queries import MAX_PARAM_LENGTH, SENSITIVE_PARAM_PATTERN
+
+logger = get_logger(__name__)
+
+# Datos personales del estudiante: no son secretos, pero tampoco van a la grabación
+PERSONAL_PARAM_PATTERN = re.compile(r"registro_academico|^ci$|correo|telefono|direccion|nombre|apellido", re.IGNORECASE)
+REDACTED = "***"
+
+
+def _sanitize_value(key: str, value: str) -> str:
+    if SENSITIVE_PARAM_PATTERN.search(key) or PERSONAL_PARAM_PATTERN.search(key):
+        return REDACTED
+    return value[:MAX_PARAM_LENGTH]
+
+
+def sanitize_query(query_string: bytes) -> str:
+    """
+    Parámetros de consulta aptos para grabar.
+
+    Returns:
+        Query string con los valores de parámetros sensibles o personales
+        reemplazados por ``***`` y los valores largos truncados
+    """
+    if not query_string:
+        return ""
+    pairs = [
+        (key, _sanitize_value(key, value))
+        for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    ]
+    return urlencode(pairs, safe="*")
+
+
+def sanitize_path_params(path_params: Mapping[str, object]) -> Dict[str, str]:
+    """
+    Parámetros de ruta aptos para grabar, con el mismo criterio que ``sanitize_query``.
+
+    Returns:
+        Parámetros con los valores sensibles o personales reemplazados por ``***``
+        y los valores largos truncados
+    """
+    return {key: _sanitize_value(key, str(value)) for key, value in path_params.items()}
+
+
+class TrafficRecorder:
+    """
+    Escritor de líneas de tráfico en un archivo JSONL de solo agregado.
+
+    Args:
+        path: Archivo de destino (se crea si no existe)
+        sample_rate: Fracción de requests que se graban (0 a 1)
+        record_raw_path: Grabar también la ruta concreta, sin ocultar nada
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, record_raw_path: bool = False):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.record_raw_path = record_raw_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+
+    def record(
+        self,
+        started_at: float,
+        method: str,
+        route: str,
+        path_params: Mapping[str, object],
+        path: str,
+        query_string: bytes,
+        status_code: int,
+        duration: float,
+        db_queries: int,
+        authenticated: bool
+    ) -> None:
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        entry = {
+            "ts": round(started_at, 4),
+            "method": method,
+            "route": route,
+            "params": sanitize_path_params(path_params),
+            "query": sanitize_query(query_string),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "db_queries": db_queries,
+            "auth": authenticated,
+        }
+        if self.record_raw_path:
+            entry["path"] = path
+        line = json.dumps(
+            entry,
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+        try:
+            os.write(self._fd, (line + "\n").encode("utf-8"))
+        except OSError as e:
+            logger.error(f"No se pudo grabar el tráfico en {self.path}: {str(e)}")
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _recorder_from_env() -> Optional[TrafficRecorder]:
+    settings = get_settings()
+    path = settings.traffic_record_file
+    if not path:
+        return None
+    recorder = TrafficRecorder(path, settings.traffic_record_sample_rate, settings.traffic_record_raw_path)
+    logger.info(f"Grabación de tráfico activa en {path} (muestreo {recorder.sample_rate:.0%})")
+    if recorder.record_raw_path:
+        logger.warning("TRAFFIC_RECORD_RAW_PATH activo: la grabación incluye identificadores de las rutas")
+    return recorder
+
+
+traffic_recorder = _recorder_from_env()
@@ -0,0 +1,122 @@
+"""
+Benchmark de compresión de respuestas de listados.
+
+Mide, para páginas de /estudiantes/, /pagos/ y /bloqueos/ y para /health:
+- tamaño en el cable sin comprimir, con gzip y con brotli (varios niveles)
+- CPU por compresión
+- CPU por petición a través de CompressionMiddleware con la LRU de cuerpos
+  comprimidos fría (cada petición comprime) y caliente (reutiliza los bytes)
+
+Ejecutar: python -m benchmarks.bench_compression [--rows 1000] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from benchmarks.bench_list_serialization import seed  # configura el entorno antes de importar la app
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.cache import LRUCache  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.crud import estudiante as crud_estudiante  # noqa: E402
+from app.crud import pago as crud_pago  # noqa: E402
+from app.crud import bloqueo as crud_bloqueo  # noqa: E402
+from app.middleware import CompressionMiddleware, brotli  # noqa: E402
+from app.serializers import RawJSONResponse, dumps, render_rows  # noqa: E402
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 11)
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    fn()  # calentamiento
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def make_app(body: bytes):
+    async def app(scope, receive, send):
+        await RawJSONResponse(body)(scope, receive, send)
+    return app
+
+
+def request(loop, middleware, encoding: str) -> int:
+    """Ejecuta una petición GET a través del middleware y retorna los bytes enviados."""
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(b"accept-encoding", encoding.encode("latin-1"))],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sent.append(message.get("body", b""))
+
+    loop.run_until_complete(middleware(scope, receive, send))
+    return sum(len(chunk) for chunk in sent)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="filas por página (máx. 1000)")
+    parser.add_argument("--repeat", type=int, default=50, help="repeticiones por medición")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        seed(session, args.rows)
+        payloads = {
+            "estudiantes": render_rows(crud_estudiante.SCHEMA_KEYS, crud_estudiante.get_estudiantes_rows(session, 0, args.rows)),
+            "pagos": render_rows(crud_pago.SCHEMA_KEYS, crud_pago.get_pagos_rows(session, 0, args.rows)),
+            "bloqueos": render_rows(crud_bloqueo.SCHEMA_KEYS, crud_bloqueo.get_bloqueos_rows(session, 0, args.rows)),
+            "health": dumps({"status": "healthy", "service": "microservicio_estudiantil", "version": "1.0.0"}),
+        }
+
+    encodings = [("gzip", level) for level in GZIP_LEVELS]
+    if brotli is not None:
+        encodings += [("br", quality) for quality in BROTLI_QUALITIES]
+    else:
+        print("brotli no está instalado: solo se mide gzip")
+
+    print(f"Compresión por nivel ({args.rows} filas, {args.repeat} repeticiones)")
+    print(f"{'respuesta':<12} {'codificación':<10} {'bytes':>9} {'ratio':>7} {'ms CPU':>8}")
+    for name, body in payloads.items():
+        print(f"{name:<12} {'identity':<10} {len(body):>9} {1:>7.2f} {0:>8.3f}")
+        for encoding, level in encodings:
+            middleware = CompressionMiddleware(None, gzip_level=level, brotli_quality=level)
+            compressed = middleware.compress(body, encoding)
+            elapsed = cpu_ms(lambda: middleware.compress(body, encoding), args.repeat)
+            label = f"{encoding}-{level}"
+            print(f"{'':<12} {label:<10} {len(compressed):>9} {len(body) / len(compressed):>7.2f} {elapsed:>8.3f}")
+
+    loop = asyncio.new_event_loop()
+    print()
+    print("Middleware con configuración por defecto (CPU por petición)")
+    print(f"{'respuesta':<12} {'codificación':<10} {'bytes':>9} {'identity':>9} {'fría':>8} {'caliente':>9}")
+    for name, body in payloads.items():
+        for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+            inner = make_app(body)
+            identity = cpu_ms(lambda: request(loop, CompressionMiddleware(inner), "identity"), args.repeat)
+            cold = cpu_ms(
+                lambda: request(loop, CompressionMiddleware(inner, cache=LRUCache(max_entries=0)), encoding),
+                args.repeat
+            )
+            warm_middleware = CompressionMiddleware(inner)
+            wire = request(loop, warm_middleware, encoding)
+            warm = cpu_ms(lambda: request(loop, warm_middleware, encoding), args.repeat)
+            print(f"{name:<12} {encoding:<10} {wire:>9} {identity:>9.3f} {cold:>8.3f} {warm:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark de serialización de listados (páginas de 1000 filas).
+
+Compara el camino anterior (instancias ORM + Pydantic orm_mode + jsonable_encoder
++ json estándar) con el camino rápido (tuplas de columnas + render_rows).
+
+Ejecutar: python -m benchmarks.bench_list_serialization [--rows 1000] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+# Base de datos en memoria y sin handlers de logging antes de importar la app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("LOG_CONSOLE", "false")
+os.environ.setdefault("LOG_FILE", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import Estudiante, Pago, Bloqueo  # noqa: E402
+from app.schemas.estudiante import EstudianteResponse  # noqa: E402
+from app.schemas.pago import PagoResponse  # noqa: E402
+from app.schemas.bloqueo import BloqueoResponse  # noqa: E402
+from app.crud import estudiante as crud_estudiante  # noqa: E402
+from app.crud import pago as crud_pago  # noqa: E402
+from app.crud import bloqueo as crud_bloqueo  # noqa: E402
+from app.serializers import render_rows  # noqa: E402
+
+# Hash bcrypt de ejemplo: el camino ORM lo carga aunque la respuesta no lo exponga
+FAKE_HASH = "$2b$12$" + "x" * 53
+
+
+def seed(session, rows: int) -> None:
+    for i in range(rows):
+        ra = f"RA{i:06d}"
+        session.add(Estudiante(
+            codigo_carrera="INF187", registro_academico=ra, nombre=f"Nombre {i}",
+            apellido=f"Apellido {i}", ci=f"{1000000 + i}", correo=f"{ra.lower()}@uagrm.edu.bo",
+            contrasena=FAKE_HASH, telefono="70000000", direccion=f"Calle {i} #123",
+            estado_academico="REGULAR"
+        ))
+        session.add(Pago(
+            codigo_pago=f"P{i:05d}", registro_academico=ra, descripcion="Matrícula semestral",
+            monto=Decimal("350.50"), fecha_pago=date(2024, 1, 1) + timedelta(days=i % 365)
+        ))
+        session.add(Bloqueo(codigo_bloqueo=f"B{i:05d}", registro_academico=ra, descripcion="Deuda pendiente"))
+    session.commit()
+
+
+def measure(label: str, fn, repeat: int) -> float:
+    fn()  # calentamiento
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    cpu_ms = (time.process_time() - start) / repeat * 1000
+    print(f"  {label:<10} {cpu_ms:8.2f} ms CPU/página")
+    return cpu_ms
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="filas por página (máx. 1000)")
+    parser.add_argument("--repeat", type=int, default=50, help="repeticiones por medición")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        seed(session, args.rows)
+
+    loop = asyncio.new_event_loop()
+    cases = [
+        ("estudiantes", EstudianteResponse, crud_estudiante.get_estudiantes, crud_estudiante.get_estudiantes_rows, crud_estudiante.SCHEMA_KEYS),
+        ("pagos", PagoResponse, crud_pago.get_pagos, crud_pago.get_pagos_rows, crud_pago.SCHEMA_KEYS),
+        ("bloqueos", BloqueoResponse, crud_bloqueo.get_bloqueos, crud_bloqueo.get_bloqueos_rows, crud_bloqueo.SCHEMA_KEYS),
+    ]
+
+    print(f"Serialización de una página de {args.rows} filas ({args.repeat} repeticiones)")
+    for name, schema, orm_fn, rows_fn, keys in cases:
+        field = create_response_field(name=f"Response_{name}", type_=List[schema])
+
+        def orm_path():
+            with Session() as session:
+                items = orm_fn(session, 0, args.rows)
+                content = loop.run_until_complete(
+                    serialize_response(field=field, response_content=items, is_coroutine=True)
+                )
+                return JSONResponse(content).body
+
+        def fast_path():
+            with Session() as session:
+                return render_rows(keys, rows_fn(session, 0, args.rows))
+
+        assert len(orm_path()) > 0 and len(fast_path()) > 0
+        print(f"{name}:")
+        before = measure("ORM", orm_path, args.repeat)
+        after = measure("rápido", fast_path, args.repeat)
+        print(f"  mejora     {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
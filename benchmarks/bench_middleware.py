@@ -0,0 +1,167 @@
+"""
+Benchmark del overhead por request de la pila de middlewares.
+
+Compara la pila anterior (cuatro capas BaseHTTPMiddleware: logging de requests,
+manejo de excepciones, logging de escrituras y headers de seguridad) con
+RequestPipelineMiddleware, sobre un endpoint trivial y sin red de por medio.
+La pila anterior se reproduce aquí porque ya no forma parte de la aplicación.
+
+Ejecutar: python -m benchmarks.bench_middleware [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("LOG_CONSOLE", "false")
+os.environ.setdefault("LOG_FILE", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.config.logging import get_logger  # noqa: E402
+from app.exceptions import BaseCustomException, map_exception_to_http  # noqa: E402
+from app.middleware import RequestPipelineMiddleware  # noqa: E402
+
+logger = get_logger("app.middleware")
+
+
+class LegacyExceptionHandlerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except BaseCustomException as e:
+            http_exception = map_exception_to_http(e)
+            return JSONResponse(status_code=http_exception.status_code, content=http_exception.detail)
+        except Exception:
+            return JSONResponse(status_code=500, content={"message": "Error interno del servidor"})
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(uuid.uuid4())[:8]
+        start_time = time.time()
+        logger.info(
+            f"Request iniciado: {request.method} {request.url.path}",
+            extra={
+                "request_id": request_id,
+                "client_ip": request.client.host if request.client else "unknown",
+                "user_agent": request.headers.get("user-agent", "unknown"),
+                "query_params": dict(request.query_params),
+            }
+        )
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(
+            f"Request completado: {request.method} {request.url.path} - "
+            f"Status: {response.status_code} - Tiempo: {process_time:.4f}s",
+            extra={"request_id": request_id, "status_code": response.status_code, "process_time": process_time}
+        )
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Process-Time"] = f"{process_time:.4f}"
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Content-Security-Policy"] = (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+            "img-src 'self' data: https:; "
+            "font-src 'self' https://cdn.jsdelivr.net; "
+            "connect-src 'self';"
+        )
+        return response
+
+
+class LegacyDatabaseConnectionMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if request.method in ["POST", "PUT", "DELETE", "PATCH"]:
+            logger.debug(f"Operación de base de datos: {request.method} {request.url.path}")
+        return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if stack == "legacy":
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyDatabaseConnectionMiddleware)
+        app.add_middleware(LegacyExceptionHandlerMiddleware)
+        app.add_middleware(LegacyRequestLoggingMiddleware)
+    elif stack == "pipeline":
+        app.add_middleware(RequestPipelineMiddleware)
+    return app
+
+
+async def run_requests(app, count: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping", "raw_path": b"/ping", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), make_receive(), send)
+    return time.perf_counter() - start
+
+
+def make_receive():
+    """Canal de entrada de un request sin cuerpo: luego del cuerpo solo queda esperar la desconexión."""
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    return receive
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="requests por pila")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    results = {}
+    for stack in ("none", "legacy", "pipeline"):
+        app = build_app(stack)
+        loop.run_until_complete(run_requests(app, 200))  # calentamiento
+        elapsed = loop.run_until_complete(run_requests(app, args.requests))
+        results[stack] = elapsed / args.requests * 1e6
+
+    print(f"Overhead por request ({args.requests} requests, nivel de log {os.environ['LOG_LEVEL']})")
+    print(f"  {'pila':<10} {'µs/request':>11} {'overhead':>10}")
+    for stack, per_request in results.items():
+        print(f"  {stack:<10} {per_request:>11.1f} {per_request - results['none']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Arranque en frío: tiempo hasta el primer request.
+
+Lanza intérpretes nuevos que importan app.main, ejecutan el evento startup
+y atienden GET /health llamando a la aplicación ASGI directamente (sin
+servidor ni cliente HTTP, para no medir su importación). Reporta la mediana
+de cada fase y el tiempo total desde que se lanza el proceso, y perfila una
+corrida con ``-X importtime``: paquetes por tiempo propio de importación y
+los módulos de la aplicación más costosos.
+
+Sale con código 1 si la mediana del tiempo hasta el primer request supera
+el presupuesto. tests/test_cold_start.py comprueba el mismo presupuesto con
+una sola corrida.
+
+Ejecutar: python -m benchmarks.cold_start [--runs 5] [--budget-ms 1500] [--top 15]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 1500
+
+
+def child() -> None:
+    """Proceso medido: importa la app, la arranca y atiende un request."""
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def first_request() -> Tuple[float, float, int]:
+        await app.router.startup()
+        ready = time.perf_counter()
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/health", "raw_path": b"/health", "query_string": b"",
+            "root_path": "", "headers": [(b"host", b"localhost")],
+            "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+        }
+        await app(scope, receive, send)
+        served = time.perf_counter()
+        await app.router.shutdown()
+        return ready, served, messages[0]["status"]
+
+    ready, served, status = asyncio.run(first_request())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "request_ms": (served - ready) * 1000,
+        "status": status,
+    }), flush=True)
+
+
+def child_env(database_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("LOG_CONSOLE", "false")
+    env.setdefault("LOG_FILE", "false")
+    env["DATABASE_URL"] = database_url
+    return env
+
+
+def prepare_env(database_url: Optional[str] = None) -> Dict[str, str]:
+    """
+    Entorno de los procesos medidos, con la base ya migrada.
+
+    Args:
+        database_url: Base a usar, o None para una SQLite temporal
+    """
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp(prefix='cold_start_')}/cold_start.db?check_same_thread=false"
+    env = child_env(database_url)
+    subprocess.run([sys.executable, "-m", "app.migrations", "upgrade"], cwd=ROOT, env=env, check=True, capture_output=True)
+    return env
+
+
+def measure(env: Dict[str, str]) -> Dict[str, float]:
+    """Una corrida en un intérprete nuevo; agrega el tiempo total desde el lanzamiento."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    if timings["status"] != 200:
+        raise RuntimeError(f"GET /health respondió {timings['status']}")
+    timings["total_ms"] = total_ms
+    return timings
+
+
+def import_profile(env: Dict[str, str]) -> List[Tuple[str, int, int]]:
+    """
+    (módulo, µs propios, µs acumulados) de los módulos importados por app.main,
+    según ``-X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def print_profile(modules: List[Tuple[str, int, int]], top: int) -> None:
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    total_us = sum(by_package.values())
+    print(f"\nImportación por paquete (tiempo propio, -X importtime; total {total_us / 1000:.0f} ms):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<28} {self_us / 1000:8.1f} ms {self_us / total_us:6.1%}")
+
+    print("\nMódulos de la aplicación (acumulado, incluye lo que importan):")
+    app_modules = [module for module in modules if module[0].startswith("app.")]
+    for name, self_us, cumulative_us in sorted(app_modules, key=lambda item: -item[2])[:top]:
+        print(f"  {name:<28} {cumulative_us / 1000:8.1f} ms (propio {self_us / 1000:.1f} ms)")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="arranques medidos")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="presupuesto del tiempo hasta el primer request")
+    parser.add_argument("--top", type=int, default=15, help="filas de cada tabla del perfil de importación")
+    parser.add_argument("--database-url", help="base ya migrada (por defecto, SQLite temporal)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child()
+        return 0
+
+    env = prepare_env(args.database_url)
+
+    measure(env)  # calentamiento: .pyc y caché de páginas del sistema de archivos
+    runs = [measure(env) for _ in range(args.runs)]
+    print(f"Arranque en frío ({args.runs} procesos, mediana):")
+    for key, label in (
+        ("import_ms", "importar app.main"),
+        ("startup_ms", "evento startup"),
+        ("request_ms", "primer request"),
+        ("total_ms", "total desde el lanzamiento"),
+    ):
+        values = [run[key] for run in runs]
+        print(f"  {label:<28} {statistics.median(values):8.1f} ms (mín {min(values):.1f}, máx {max(values):.1f})")
+
+    print_profile(import_profile(env), args.top)
+
+    total = statistics.median(run["total_ms"] for run in runs)
+    within = total <= args.budget_ms
+    print(f"\nTiempo hasta el primer request: {total:.0f} ms, presupuesto {args.budget_ms:.0f} ms: "
+          f"{'OK' if within else 'EXCEDIDO'}")
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Costo del perfilado continuo.
+
+Atiende requests reales (TestClient sobre una base SQLite temporal) en rondas
+alternadas sin y con ContinuousProfiler, y reporta la diferencia de
+throughput y la CPU que consumió el hilo muestreador respecto del tiempo de
+pared. Sale con código 1 si el muestreo consume 1% o más.
+
+Ejecutar: python -m benchmarks.profile_overhead [--interval-ms 20] [--rounds 6] [--requests 300]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+_db_dir = tempfile.mkdtemp(prefix="profile_overhead_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/overhead.db?check_same_thread=false")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("SECRET_KEY", "profile-overhead")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.bench_list_serialization import seed  # noqa: E402  (configura el logging antes de importar la app)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.migrations import upgrade  # noqa: E402
+from app.profiling import ContinuousProfiler, StackSampler  # noqa: E402
+
+PATHS = ["/estudiantes/?limit=100", "/pagos/?limit=100", "/estudiantes/RA000001", "/bloqueos/?limit=100"]
+
+
+def run_round(client: TestClient, requests: int) -> float:
+    """Requests por segundo de una ronda."""
+    start = time.perf_counter()
+    for index in range(requests):
+        client.get(PATHS[index % len(PATHS)])
+    return requests / (time.perf_counter() - start)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval-ms", type=float, default=20, help="intervalo de muestreo")
+    parser.add_argument("--rounds", type=int, default=6, help="rondas por configuración")
+    parser.add_argument("--requests", type=int, default=300, help="requests por ronda")
+    parser.add_argument("--rows", type=int, default=500, help="estudiantes de ejemplo")
+    args = parser.parse_args(argv)
+
+    upgrade(engine)
+    with SessionLocal() as session:
+        seed(session, args.rows)
+
+    baseline, profiled = [], []
+    cpu_time = wall_time = 0.0
+    samples = 0
+    with TestClient(app) as client:
+        run_round(client, args.requests)  # calentamiento
+        for _ in range(args.rounds):
+            baseline.append(run_round(client, args.requests))
+
+            profiler = ContinuousProfiler(args.interval_ms / 1000, flush_interval=3600, directory=_db_dir)
+            start = time.perf_counter()
+            profiler.start()
+            profiled.append(run_round(client, args.requests))
+            StackSampler.stop(profiler)  # detener sin volcar a disco
+            wall_time += time.perf_counter() - start
+            cpu_time += profiler.cpu_time
+            samples += profiler.drain()[1]
+
+    base, prof = statistics.median(baseline), statistics.median(profiled)
+    sampler_share = cpu_time / wall_time
+    print(f"sin perfilado:      {base:8.1f} req/s (mediana de {args.rounds} rondas)")
+    print(f"con perfilado:      {prof:8.1f} req/s ({(base - prof) / base:+.2%} de throughput perdido)")
+    print(f"muestras:           {samples} ({samples / wall_time:.1f}/s, "
+          f"{cpu_time / samples * 1e6 if samples else 0:.0f} µs cada una)")
+    print(f"CPU del muestreo:   {sampler_share:.3%} de un núcleo")
+    return 0 if sampler_share < 0.01 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
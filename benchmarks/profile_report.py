@@ -0,0 +1,74 @@
+"""
+Resumen de perfiles colapsados.
+
+Suma uno o más archivos ``.folded`` (por ejemplo los volcados del perfilado
+continuo de todos los workers) y lista las funciones con más muestras: total
+(la función o algo que llamó está en la pila) y propio (la función es la hoja).
+Con ``--match`` se reporta la fracción de muestras cuyas pilas contienen cada
+texto, útil para preguntas como "¿cuánta CPU se va en bcrypt?".
+
+Ejecutar:
+    python -m benchmarks.profile_report logs/profiles/continuous/*.folded
+    python -m benchmarks.profile_report logs/profiles/continuous/*.folded --match bcrypt --match json --match logging/__init__.py
+    python -m benchmarks.profile_report logs/profiles/continuous/*.folded --merge flota.folded
+"""
+
+import argparse
+import sys
+from collections import Counter
+from typing import List
+
+from app.profiling import parse_folded, render_folded
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="archivos .folded")
+    parser.add_argument("--top", type=int, default=25, help="funciones a listar")
+    parser.add_argument("--match", action="append", default=[], help="texto a buscar en las pilas (repetible)")
+    parser.add_argument("--merge", help="escribir la suma de todos los archivos en este .folded")
+    args = parser.parse_args(argv)
+
+    stacks: Counter = Counter()
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            stacks.update(parse_folded(f.read()))
+    total = sum(stacks.values())
+    if not total:
+        print("Sin muestras")
+        return 1
+
+    inclusive: Counter = Counter()
+    exclusive: Counter = Counter()
+    for stack, count in stacks.items():
+        # El primer marco es el nombre del hilo
+        frames = stack.split(";")[1:]
+        for frame in set(frames):
+            inclusive[frame] += count
+        if frames:
+            exclusive[frames[-1]] += count
+
+    print(f"{total} muestras en {len(args.files)} archivo(s)\n")
+    print(f"{'total':>7} {'propio':>7}  función")
+    for frame, count in inclusive.most_common(args.top):
+        print(f"{count / total:7.1%} {exclusive[frame] / total:7.1%}  {frame}")
+
+    print(f"\n{'propio':>7}  función (por tiempo propio)")
+    for frame, count in exclusive.most_common(args.top):
+        print(f"{count / total:7.1%}  {frame}")
+
+    if args.match:
+        print()
+        for text in args.match:
+            matched = sum(count for stack, count in stacks.items() if text in stack)
+            print(f"{matched / total:7.1%}  pilas que contienen {text!r}")
+
+    if args.merge:
+        with open(args.merge, "w", encoding="utf-8") as f:
+            f.write(render_folded(stacks))
+        print(f"\nPerfil combinado escrito en {args.merge}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Presupuesto de sentencias SQL por endpoint.
+
+Levanta la aplicación sobre una base SQLite temporal con datos de ejemplo,
+llama a cada endpoint y falla (código de salida 1) si alguno ejecuta más
+sentencias que su presupuesto. Sirve para detectar regresiones N+1 antes de
+desplegar; la cache de registros se desactiva para que los conteos sean
+deterministas.
+
+Ejecutar: python -m benchmarks.query_budgets [--rows 50]
+
+tests/test_query_budgets.py comprueba los mismos presupuestos en la suite de pruebas.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+_db_dir = tempfile.mkdtemp(prefix="query_budgets_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/budgets.db?check_same_thread=false")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("SECRET_KEY", "query-budgets")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from benchmarks.bench_list_serialization import seed  # noqa: E402  (configura el logging antes de importar la app)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.auth import create_access_token, get_password_hash  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.migrations import upgrade  # noqa: E402
+from app.models import Estudiante  # noqa: E402
+from app.query_stats import assert_max_queries  # noqa: E402
+
+# (método, ruta, requiere token, presupuesto de sentencias)
+BUDGETS = [
+    ("GET", "/estudiantes/RA000001", False, 1),
+    ("GET", "/estudiantes/RA000001?fields=nombre", False, 1),
+    ("GET", "/estudiantes/?limit=100", False, 1),
+    ("GET", "/estudiantes/me", True, 1),
+    ("GET", "/pagos/P00001", True, 2),
+    ("GET", "/pagos/?limit=100", False, 1),
+    ("GET", "/pagos/estudiante/RA000001", False, 1),
+    ("GET", "/bloqueos/B00001", False, 1),
+    ("GET", "/bloqueos/?limit=100", False, 1),
+    ("GET", "/bloqueos/estudiante/RA000001", False, 1),
+]
+
+
+def prepare(rows: int) -> str:
+    """
+    Migra la base y carga `rows` estudiantes con un pago y un bloqueo cada uno.
+
+    Returns:
+        Token de RA000001, para los endpoints que requieren autenticación
+    """
+    upgrade(engine)
+    with SessionLocal() as session:
+        seed(session, rows)
+        session.get(Estudiante, "RA000001").contrasena = get_password_hash("budget")
+        session.commit()
+    return create_access_token({"sub": "RA000001"})
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50, help="estudiantes (con un pago y un bloqueo cada uno)")
+    args = parser.parse_args(argv)
+
+    token = prepare(args.rows)
+
+    failures = 0
+    print(f"{'endpoint':<45} {'status':>6} {'queries':>8} {'máx':>4}  Server-Timing")
+    with TestClient(app) as client:
+        for method, path, auth, budget in BUDGETS:
+            headers = {"Authorization": f"Bearer {token}"} if auth else {}
+            label = f"{method} {path}"
+            try:
+                with assert_max_queries(engine, budget, label) as statements:
+                    response = client.request(method, path, headers=headers)
+                error = None
+            except AssertionError as e:
+                error = e
+                failures += 1
+            print(f"{label:<45} {response.status_code:>6} {len(statements):>8} {budget:>4}  "
+                  f"{response.headers.get('server-timing', '-')}")
+            if error is not None:
+                print(error, file=sys.stderr)
+
+    print(f"\n{len(BUDGETS) - failures}/{len(BUDGETS)} endpoints dentro del presupuesto")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
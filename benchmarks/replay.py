@@ -0,0 +1,289 @@
+"""
+Reproducción de tráfico grabado.
+
+Lee una grabación de TRAFFIC_RECORD_FILE (ver app/traffic.py) y vuelve a
+enviar los requests contra una instancia de prueba respetando los intervalos
+originales divididos por --speed (1x, 5x, 10x, ...). La carga es de lazo
+abierto: cada request sale a su hora aunque los anteriores no hayan
+respondido, como el tráfico real. Compara por ruta las latencias p50/p95/p99
+de la reproducción con las grabadas y cuenta los status distintos.
+
+Solo se reproducen GET y HEAD por defecto: la grabación no guarda cuerpos,
+así que las escrituras no se pueden repetir con fidelidad. Los requests que
+venían autenticados se envían con --token (o con un token obtenido con
+--login RA:contraseña) y los parámetros de consulta ocultos (``***``) se
+envían tal cual.
+
+La ruta de cada request se reconstruye con la plantilla y los parámetros de
+ruta grabados. Los parámetros ocultos se completan con --fill NOMBRE=VALOR
+(por ejemplo, el registro académico de --login); los requests con parámetros
+ocultos sin valor no se pueden reproducir y se omiten. Las grabaciones con
+TRAFFIC_RECORD_RAW_PATH usan la ruta grabada.
+
+Ejecutar:
+    python -m benchmarks.replay logs/traffic.jsonl --target http://localhost:8001 --speed 1,5,10 --login RA000001:carga1234 \
+        --fill registro_academico=RA000001
+    python -m benchmarks.replay logs/traffic.jsonl --target http://localhost:8001 --speed 5 --output replay.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx solo hace falta para la reproducción
+    httpx = None
+
+ROUTE_PARAM_PATTERN = re.compile(r"\{(\w+)(?::\w+)?\}")
+REDACTED = "***"
+
+
+def build_path(entry: Dict[str, Any], fill: Dict[str, str]) -> Optional[str]:
+    """
+    Ruta concreta de un request grabado.
+
+    Returns:
+        La ruta grabada si la hay; si no, la plantilla con los parámetros de ruta.
+        None si falta algún parámetro o está oculto y no se indicó en `fill`
+    """
+    if entry.get("path"):
+        return entry["path"]
+    params = entry.get("params", {})
+    missing = False
+
+    def value_for(match: re.Match) -> str:
+        nonlocal missing
+        name = match.group(1)
+        value = params.get(name)
+        if value == REDACTED:
+            value = fill.get(name)
+        if value is None:
+            missing = True
+            return ""
+        return quote(value, safe="")
+
+    path = ROUTE_PARAM_PATTERN.sub(value_for, entry["route"])
+    return None if missing else path
+
+
+def load_capture(
+    path: str,
+    methods: List[str],
+    limit: Optional[int],
+    fill: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """
+    Líneas de la grabación con los métodos indicados, ordenadas por inicio,
+    con la ruta concreta de cada una en ``url_path``.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # una línea truncada al final de un archivo en uso
+            entries.append(entry)
+    entries.sort(key=lambda entry: entry["ts"])
+    selected = [entry for entry in entries if entry["method"] in methods]
+    skipped = Counter(entry["method"] for entry in entries if entry["method"] not in methods)
+    if skipped:
+        print(f"Se omiten {sum(skipped.values())} requests con otros métodos: {dict(skipped)}")
+    replayable = []
+    unresolved = Counter()
+    for entry in selected:
+        entry["url_path"] = build_path(entry, fill)
+        if entry["url_path"] is None:
+            unresolved[entry["route"]] += 1
+        else:
+            replayable.append(entry)
+    if unresolved:
+        print(f"Se omiten {sum(unresolved.values())} requests con parámetros de ruta ocultos "
+              f"(completarlos con --fill): {dict(unresolved)}")
+    return replayable[:limit] if limit else replayable
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "requests": len(values),
+        "p50_ms": round(percentile(values, 0.50), 2),
+        "p95_ms": round(percentile(values, 0.95), 2),
+        "p99_ms": round(percentile(values, 0.99), 2),
+    }
+
+
+async def obtain_token(client, login: str) -> str:
+    registro_academico, _, contrasena = login.partition(":")
+    response = await client.post(
+        "/auth/login-estudiante", json={"registro_academico": registro_academico, "contrasena": contrasena}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def replay(
+    entries: List[Dict[str, Any]],
+    target: str,
+    speed: float,
+    token: Optional[str],
+    max_in_flight: int
+) -> Dict[str, Any]:
+    """
+    Reproduce la grabación a `speed` veces su ritmo original.
+
+    Returns:
+        Por ruta, latencias grabadas y reproducidas, status distintos y errores
+    """
+    results: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"replayed": [], "mismatches": 0, "errors": Counter()})
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    late = 0
+
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=60.0) as client:
+        async def send(entry: Dict[str, Any]) -> None:
+            headers = {"Authorization": f"Bearer {token}"} if entry.get("auth") and token else {}
+            url = entry["url_path"] + (f"?{entry['query']}" if entry.get("query") else "")
+            route = results[f"{entry['method']} {entry['route']}"]
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(entry["method"], url, headers=headers)
+                except httpx.HTTPError as e:
+                    route["errors"][type(e).__name__] += 1
+                    return
+            route["replayed"].append((time.perf_counter() - start) * 1000)
+            if response.status_code != entry["status"]:
+                route["mismatches"] += 1
+
+        first_ts = entries[0]["ts"]
+        start = time.monotonic()
+        tasks = []
+        for entry in entries:
+            delay = (entry["ts"] - first_ts) / speed - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.05:
+                late += 1
+            tasks.append(asyncio.create_task(send(entry)))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+
+    original: Dict[str, List[float]] = defaultdict(list)
+    for entry in entries:
+        original[f"{entry['method']} {entry['route']}"].append(entry["duration_ms"])
+
+    routes = {}
+    for label in sorted(original, key=lambda label: -len(original[label])):
+        route = results[label]
+        routes[label] = {
+            "original": distribution(original[label]),
+            "replay": distribution(route["replayed"]),
+            "status_mismatches": route["mismatches"],
+            "errors": dict(route["errors"]),
+        }
+    all_replayed = [value for route in results.values() for value in route["replayed"]]
+    return {
+        "speed": speed,
+        "requests": len(entries),
+        "elapsed_s": round(elapsed, 2),
+        "capture_span_s": round(entries[-1]["ts"] - first_ts, 2),
+        "sent_late": late,
+        "total": {
+            "original": distribution([entry["duration_ms"] for entry in entries]),
+            "replay": distribution(all_replayed),
+        },
+        "routes": routes,
+    }
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"\n== {result['speed']}x: {result['requests']} requests en {result['elapsed_s']}s "
+          f"(grabación de {result['capture_span_s']}s, {result['sent_late']} enviados con retraso) ==")
+    print(f"{'ruta':<44} {'req':>6} {'p50 orig':>9} {'p50 rep':>9} {'p95 orig':>9} {'p95 rep':>9} "
+          f"{'p99 orig':>9} {'p99 rep':>9} {'status≠':>8}")
+    rows = [*result["routes"].items(), ("total", {**result["total"], "status_mismatches": sum(
+        route["status_mismatches"] for route in result["routes"].values())})]
+    for label, route in rows:
+        original, replayed = route["original"], route["replay"]
+        print(f"{label[:44]:<44} {original['requests']:>6} {original['p50_ms']:>9.2f} {replayed['p50_ms']:>9.2f} "
+              f"{original['p95_ms']:>9.2f} {replayed['p95_ms']:>9.2f} {original['p99_ms']:>9.2f} "
+              f"{replayed['p99_ms']:>9.2f} {route['status_mismatches']:>8}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="archivo JSONL grabado con TRAFFIC_RECORD_FILE")
+    parser.add_argument("--target", required=True, help="URL de la instancia de prueba")
+    parser.add_argument("--speed", default="1", help="velocidades a reproducir, separadas por comas (ej: 1,5,10)")
+    parser.add_argument("--methods", default="GET,HEAD", help="métodos a reproducir")
+    parser.add_argument("--limit", type=int, help="reproducir solo los primeros N requests")
+    parser.add_argument("--token", help="token Bearer para los requests que venían autenticados")
+    parser.add_argument("--login", help="RA:contraseña para obtener el token en la instancia de prueba")
+    parser.add_argument("--fill", action="append", default=[], metavar="NOMBRE=VALOR",
+                        help="valor para un parámetro de ruta oculto (se puede repetir)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="requests simultáneos como máximo")
+    parser.add_argument("--output", help="escribir los resultados JSON en este archivo")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        print("La reproducción requiere httpx: pip install -r requirements-dev.txt", file=sys.stderr)
+        return 2
+
+    fill = {}
+    for item in args.fill:
+        name, separator, value = item.partition("=")
+        if not separator:
+            parser.error(f"--fill espera NOMBRE=VALOR: {item}")
+        fill[name] = value
+
+    entries = load_capture(
+        args.capture, [method.strip().upper() for method in args.methods.split(",")], args.limit, fill
+    )
+    if not entries:
+        print("La grabación no tiene requests para reproducir", file=sys.stderr)
+        return 1
+
+    token = args.token
+    if token is None and args.login:
+        async def login() -> str:
+            async with httpx.AsyncClient(base_url=args.target) as client:
+                return await obtain_token(client, args.login)
+        token = asyncio.run(login())
+    if token is None and any(entry.get("auth") for entry in entries):
+        print("Aviso: hay requests autenticados y no se indicó --token ni --login; se enviarán sin token")
+
+    results = []
+    for speed in [float(value) for value in args.speed.split(",") if value.strip()]:
+        result = asyncio.run(replay(entries, args.target, speed, token, args.max_in_flight))
+        print_result(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"capture": args.capture, "target": args.target, "runs": results}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados escritos en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+-- ============================================================
+-- Esquema del microservicio estudiantil
+-- Idempotente: solo crea lo que falta. Lo ejecuta seeder_completo.py.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS carrera (
+    codigo_carrera VARCHAR(20) PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS plan_estudio (
+    codigo_plan VARCHAR(20) PRIMARY KEY,
+    plan VARCHAR(20),
+    cant_semestre INT NOT NULL,
+    codigo_carrera VARCHAR(20) REFERENCES carrera(codigo_carrera)
+);
+
+CREATE TABLE IF NOT EXISTS nivel (
+    nivel INT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS materia (
+    sigla VARCHAR(20) PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    creditos INT NOT NULL,
+    es_electiva BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS prerequisito (
+    sigla_prerequisito VARCHAR(20) REFERENCES materia(sigla),
+    sigla_materia VARCHAR(20) REFERENCES materia(sigla),
+    PRIMARY KEY (sigla_prerequisito, sigla_materia)
+);
+
+CREATE TABLE IF NOT EXISTS plan_materia (
+    codigo_plan VARCHAR(20) REFERENCES plan_estudio(codigo_plan),
+    sigla_materia VARCHAR(20) REFERENCES materia(sigla),
+    nivel INT REFERENCES nivel(nivel),
+    PRIMARY KEY (codigo_plan, sigla_materia)
+);
+
+CREATE TABLE IF NOT EXISTS docente (
+    codigo_docente VARCHAR(20) PRIMARY KEY,
+    nombre VARCHAR(50),
+    apellido VARCHAR(50),
+    ci VARCHAR(20),
+    correo VARCHAR(100),
+    telefono VARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS aula (
+    codigo_aula VARCHAR(20) PRIMARY KEY,
+    modulo VARCHAR(10),
+    aula VARCHAR(10),
+    capacidad INT,
+    ubicacion VARCHAR(100)
+);
+
+CREATE TABLE IF NOT EXISTS horario (
+    codigo_horario VARCHAR(20) PRIMARY KEY,
+    dias_semana TEXT[] NOT NULL,
+    hora_inicio TIME NOT NULL,
+    hora_fin TIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS grupo (
+    codigo_grupo VARCHAR(20) PRIMARY KEY,
+    sigla_materia VARCHAR(20) REFERENCES materia(sigla),
+    codigo_docente VARCHAR(20) REFERENCES docente(codigo_docente),
+    codigo_aula VARCHAR(20) REFERENCES aula(codigo_aula),
+    codigo_horario VARCHAR(20) REFERENCES horario(codigo_horario),
+    descripcion VARCHAR(150),
+    cupo INT DEFAULT 40,
+    inscritos_actuales INT DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS periodo_academico (
+    codigo_periodo VARCHAR(20) PRIMARY KEY,
+    semestre VARCHAR(20),
+    fecha_inicio DATE,
+    fecha_fin DATE,
+    estado VARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS estudiante (
+    codigo_carrera VARCHAR(20) REFERENCES carrera(codigo_carrera),
+    registro_academico VARCHAR(20) PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    apellido VARCHAR(100) NOT NULL,
+    ci VARCHAR(20) UNIQUE,
+    correo VARCHAR(100),
+    contrasena TEXT NOT NULL,
+    telefono VARCHAR(20),
+    direccion VARCHAR(150),
+    estado_academico VARCHAR(20) DEFAULT 'REGULAR',
+    version INT NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS inscripcion (
+    codigo_inscripcion VARCHAR(20) PRIMARY KEY,
+    registro_academico VARCHAR(20) REFERENCES estudiante(registro_academico),
+    codigo_periodo VARCHAR(20) REFERENCES periodo_academico(codigo_periodo),
+    fecha_inscripcion DATE DEFAULT CURRENT_DATE
+);
+
+CREATE TABLE IF NOT EXISTS detalle_inscripcion (
+    codigo_detalle VARCHAR(20) PRIMARY KEY,
+    codigo_inscripcion VARCHAR(20) REFERENCES inscripcion(codigo_inscripcion),
+    codigo_grupo VARCHAR(20) REFERENCES grupo(codigo_grupo)
+);
+
+CREATE TABLE IF NOT EXISTS pago (
+    codigo_pago VARCHAR(20) PRIMARY KEY,
+    registro_academico VARCHAR(20) REFERENCES estudiante(registro_academico),
+    descripcion VARCHAR(100),
+    monto NUMERIC(10,2),
+    fecha_pago DATE DEFAULT CURRENT_DATE,
+    version INT NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS bloqueo (
+    codigo_bloqueo VARCHAR(20) PRIMARY KEY,
+    registro_academico VARCHAR(20) REFERENCES estudiante(registro_academico),
+    descripcion VARCHAR(100),
+    version INT NOT NULL DEFAULT 1
+);
+
+-- ============================================================
+-- 🧾 HISTORIAL ACADÉMICO
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS historial_academico (
+    id_historial SERIAL PRIMARY KEY,
+    registro_academico VARCHAR(20) REFERENCES estudiante(registro_academico),
+    sigla_materia VARCHAR(20) REFERENCES materia(sigla),
+    codigo_periodo VARCHAR(20) REFERENCES periodo_academico(codigo_periodo),
+    nota_final NUMERIC(5,2) CHECK (nota_final BETWEEN 0 AND 100),
+    estado VARCHAR(20) CHECK (estado IN ('APROBADA','REPROBADA','RETIRADA')),
+    observacion VARCHAR(200),
+    fecha_registro DATE DEFAULT CURRENT_DATE
+);
+
+-- ============================================================
+-- 📘 VISTAS DE APOYO
+-- ============================================================
+
+CREATE OR REPLACE VIEW vista_materias_aprobadas AS
+SELECT * FROM historial_academico WHERE estado = 'APROBADA';
+
+CREATE OR REPLACE VIEW vista_materias_reprobadas AS
+SELECT * FROM historial_academico WHERE estado = 'REPROBADA';
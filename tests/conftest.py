@@ -0,0 +1,44 @@
+"""
+Configuración común de las pruebas: base SQLite temporal y sin handlers de
+logging, antes de que se importe cualquier módulo de la aplicación.
+
+Las pruebas de endpoints comparten una base sembrada por sesión con
+``benchmarks.query_budgets.prepare`` (50 estudiantes, RA000000 a RA000049,
+con un pago y un bloqueo cada uno).
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Archivo y no ":memory:": TestClient atiende los requests en otros hilos
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='tests_')}/tests.db?check_same_thread=false"
+)
+os.environ.setdefault("LOG_CONSOLE", "false")
+os.environ.setdefault("LOG_FILE", "false")
+os.environ.setdefault("SECRET_KEY", "tests")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SEED_ROWS = 50
+
+
+@pytest.fixture(scope="session")
+def token() -> str:
+    """Token de RA000001 sobre la base ya migrada y sembrada."""
+    from benchmarks.query_budgets import prepare
+    return prepare(SEED_ROWS)
+
+
+@pytest.fixture(scope="session")
+def client(token):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,160 @@
+"""
+Pruebas de la cache de registros (app/cache.py) contra un servidor Redis
+falso (fakeredis): aciertos, fallos y vencimiento en ambos niveles,
+invalidación entre instancias por pub/sub y la carrera de un lector que
+guarda un valor viejo después de una escritura.
+"""
+
+import time
+
+import fakeredis
+import pytest
+
+from app import cache as cache_module
+from app.cache import LRUCache, RecordCache
+from app.config.settings import get_settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_cache(server=None, **kwargs) -> RecordCache:
+    l2 = fakeredis.FakeRedis(server=server) if server is not None else None
+    return RecordCache(l1=LRUCache(max_entries=16, ttl=kwargs.pop("l1_ttl", 30)), l2_client=l2, **kwargs)
+
+
+def row(version: int, nombre: str = "Ana") -> dict:
+    return {"registro_academico": "RA000001", "nombre": nombre, "version": version}
+
+
+def wait_until(condition, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_l1_hit_miss_and_expiry(clock):
+    cache = make_cache(l1_ttl=10)
+    assert cache.get("estudiante", "RA000001") is None
+    cache.set("estudiante", "RA000001", row(1))
+    assert cache.get("estudiante", "RA000001") == row(1)
+
+    clock.now += 11
+    assert cache.get("estudiante", "RA000001") is None
+    counters = cache.stats.snapshot()["estudiante"]
+    assert (counters["l1_hits"], counters["misses"]) == (1, 2)
+
+
+def test_l2_hit_from_another_instance(server):
+    writer, reader = make_cache(server), make_cache(server)
+    writer.set("estudiante", "RA000001", row(1))
+
+    assert reader.get("estudiante", "RA000001") == row(1)
+    assert reader.get("estudiante", "RA000001") == row(1)
+    counters = reader.stats.snapshot()["estudiante"]
+    assert (counters["l2_hits"], counters["l1_hits"]) == (1, 1)
+
+
+def test_l2_expiry(server):
+    writer, reader = make_cache(server, l2_ttl=1), make_cache(server)
+    writer.set("estudiante", "RA000001", row(1))
+    assert fakeredis.FakeRedis(server=server).ttl(writer.prefix + "estudiante:RA000001") <= 1
+
+    time.sleep(1.1)
+    assert reader.get("estudiante", "RA000001") is None
+
+
+def test_l2_values_keep_types(server):
+    from decimal import Decimal
+    from datetime import date
+
+    writer, reader = make_cache(server), make_cache(server)
+    value = {"codigo_pago": "P00001", "monto": Decimal("12.50"), "fecha_pago": date(2024, 3, 1), "version": 1}
+    writer.set("pago", "P00001", value)
+    assert reader.get("pago", "P00001") == value
+
+
+def test_invalidation_reaches_other_instances(server):
+    writer, other = make_cache(server), make_cache(server)
+    other.set("estudiante", "RA000001", row(1))
+    other.start()
+    try:
+        assert other.l1.get("estudiante:RA000001") is not None
+        writer.invalidate("estudiante", "RA000001")
+        assert wait_until(lambda: other.l1.get("estudiante:RA000001") is None)
+        assert other.get("estudiante", "RA000001") is None
+    finally:
+        other.stop()
+
+
+def test_stale_set_after_invalidation_is_discarded(server):
+    """Un lector cargó la versión 1, otra petición escribió e invalidó, y el lector guarda tarde."""
+    reader, writer = make_cache(server), make_cache(server)
+    stale = row(1)
+
+    writer.invalidate("estudiante", "RA000001")
+    reader.set("estudiante", "RA000001", stale)  # mismo worker que el lector: tombstone en L2
+    writer.set("estudiante", "RA000001", stale)  # worker que escribió: tombstone en L1 y L2
+
+    assert reader.get("estudiante", "RA000001") is None
+    assert writer.get("estudiante", "RA000001") is None
+    assert reader.stats.snapshot()["estudiante"]["stale_sets"] == 1
+    assert writer.stats.snapshot()["estudiante"]["stale_sets"] == 1
+
+
+def test_older_version_never_replaces_newer(server):
+    fresh, late = make_cache(server), make_cache(server)
+    fresh.set("estudiante", "RA000001", row(2, "Ana María"))
+
+    late.set("estudiante", "RA000001", row(1))
+    assert make_cache(server).get("estudiante", "RA000001") == row(2, "Ana María")
+
+    fresh.set("estudiante", "RA000001", row(1))
+    assert fresh.get("estudiante", "RA000001") == row(2, "Ana María")
+
+
+def test_tombstone_expires(server):
+    cache = make_cache(server, tombstone_ttl=0.05)
+    cache.invalidate("estudiante", "RA000001")
+    cache.set("estudiante", "RA000001", row(1))
+    assert cache.get("estudiante", "RA000001") is None
+
+    time.sleep(0.1)
+    cache.set("estudiante", "RA000001", row(2))
+    assert cache.get("estudiante", "RA000001") == row(2)
+    assert make_cache(server).get("estudiante", "RA000001") == row(2)
+
+
+def test_l1_only_cache_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("CACHE_L2_URL", raising=False)
+    monkeypatch.delenv("CACHE_L1_ENABLED", raising=False)
+    # benchmarks.query_budgets (importado por las pruebas de endpoints) desactiva la cache
+    monkeypatch.setenv("CACHE_ENABLED", "true")
+    get_settings.cache_clear()
+    try:
+        assert not RecordCache.from_env().enabled
+        monkeypatch.setenv("CACHE_L1_ENABLED", "true")
+        get_settings.cache_clear()
+        assert RecordCache.from_env().enabled
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,29 @@
+"""
+Presupuesto de arranque en frío (medición de benchmarks/cold_start.py).
+
+Lanza un intérprete nuevo que importa app.main, ejecuta el evento startup y
+atiende GET /health; falla si el tiempo hasta el primer request supera el
+presupuesto. COLD_START_BUDGET_MS cambia el presupuesto en máquinas más
+lentas (por ejemplo, runners de CI chicos) y COLD_START_BUDGET_MS=0 omite
+la prueba.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.cold_start import DEFAULT_BUDGET_MS, measure, prepare_env
+
+BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+
+@pytest.mark.skipif(BUDGET_MS <= 0, reason="COLD_START_BUDGET_MS=0: presupuesto de arranque desactivado")
+def test_time_to_first_request_within_budget(tmp_path):
+    env = prepare_env(f"sqlite:///{tmp_path}/cold_start.db?check_same_thread=false")
+    measure(env)  # calentamiento: .pyc y caché de páginas del sistema de archivos
+    timings = measure(env)
+    assert timings["total_ms"] <= BUDGET_MS, (
+        f"Tiempo hasta el primer request {timings['total_ms']:.0f} ms, presupuesto {BUDGET_MS:.0f} ms "
+        f"(importación {timings['import_ms']:.0f} ms, startup {timings['startup_ms']:.0f} ms, "
+        f"primer request {timings['request_ms']:.0f} ms)"
+    )
@@ -0,0 +1,82 @@
+"""
+Peticiones condicionales: If-Match en las actualizaciones (concurrencia
+optimista, 412 con una versión vieja) e If-None-Match en las lecturas (304
+consultando solo la versión, sin cargar la fila).
+"""
+
+import pytest
+
+from app.crud import bloqueo as crud_bloqueo
+from app.crud import estudiante as crud_estudiante
+from app.crud import pago as crud_pago
+
+
+def auth_headers(token: str, **headers) -> dict:
+    return {"Authorization": f"Bearer {token}", **headers}
+
+
+@pytest.mark.parametrize(
+    "path, field, auth",
+    [
+        ("/estudiantes/RA000001", "nombre", True),
+        ("/bloqueos/B00002", "descripcion", False),
+    ],
+)
+def test_stale_if_match_returns_412_and_keeps_row(client, token, path, field, auth):
+    headers = auth_headers(token) if auth else {}
+    stale_etag = client.get(path, headers=headers).headers["ETag"]
+
+    updated = client.put(path, json={field: "Primera edición"}, headers={**headers, "If-Match": stale_etag})
+    assert updated.status_code == 200
+    current_etag = updated.headers["ETag"]
+    assert current_etag != stale_etag
+
+    conflict = client.put(path, json={field: "Edición perdida"}, headers={**headers, "If-Match": stale_etag})
+    assert conflict.status_code == 412
+    assert "VERSION_CONFLICT" in conflict.text
+
+    current = client.get(path, headers=headers)
+    assert current.json()[field] == "Primera edición"
+    assert current.headers["ETag"] == current_etag
+
+
+def test_invalid_if_match_returns_412(client):
+    response = client.put("/bloqueos/B00003", json={"descripcion": "x"}, headers={"If-Match": '"abc"'})
+    assert response.status_code == 412
+    assert "INVALID_IF_MATCH" in response.text
+    assert client.get("/bloqueos/B00003").json()["descripcion"] == "Deuda pendiente"
+
+
+@pytest.mark.parametrize(
+    "path, module, loader, auth",
+    [
+        ("/estudiantes/RA000002", crud_estudiante, "get_estudiante", False),
+        ("/estudiantes/RA000002?fields=nombre", crud_estudiante, "get_estudiante", False),
+        ("/pagos/P00001", crud_pago, "get_pago", True),
+        ("/bloqueos/B00004", crud_bloqueo, "get_bloqueo", False),
+    ],
+)
+def test_matching_if_none_match_returns_304_without_loading_row(client, token, monkeypatch, path, module, loader, auth):
+    headers = auth_headers(token) if auth else {}
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    calls = []
+    original = getattr(module, loader)
+
+    def tracking_loader(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, loader, tracking_loader)
+
+    not_modified = client.get(path, headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+    assert calls == []
+
+    changed = client.get(path, headers={**headers, "If-None-Match": '"0"'})
+    assert changed.status_code == 200
+    assert len(calls) == 1
@@ -0,0 +1,22 @@
+"""
+Presupuesto de sentencias SQL por endpoint (tabla de benchmarks/query_budgets.py).
+
+Cada endpoint se llama dentro de ``assert_max_queries``: una regresión N+1
+hace fallar la prueba con el detalle de las sentencias ejecutadas.
+"""
+
+import pytest
+
+from app.database import engine
+from app.query_stats import assert_max_queries
+from benchmarks.query_budgets import BUDGETS
+
+
+@pytest.mark.parametrize(
+    "method, path, auth, budget", BUDGETS, ids=[f"{method} {path}" for method, path, _, _ in BUDGETS]
+)
+def test_endpoint_within_query_budget(client, token, method, path, auth, budget):
+    headers = {"Authorization": f"Bearer {token}"} if auth else {}
+    with assert_max_queries(engine, budget, f"{method} {path}"):
+        response = client.request(method, path, headers=headers)
+    assert response.status_code == 200